@@ -15,6 +15,10 @@ class UserAdmin(DjangoUserAdmin):
 class TemplateItemInline(admin.TabularInline):
     model = TemplateItem
     extra = 0
+    # item text lives in the shared ItemContent rows; pick one by hash rather than listing them all
+    fields = ("task", "content", "aiUseScaleLevel", "useAcknowledgement")
+    readonly_fields = ("task",)
+    raw_id_fields = ("content",)
 
 @admin.register(Template)
 class TemplateAdmin(admin.ModelAdmin):
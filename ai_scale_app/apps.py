@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AiScaleAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ai_scale_app"
+
+    def ready(self):
+        # Registers the model signal receivers
+        from . import signals  # noqa: F401
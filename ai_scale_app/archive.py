@@ -0,0 +1,188 @@
+"""
+Retention and cold archival for AuditLog.
+
+Entries older than settings.AUDIT_RETENTION_DAYS are moved out of the database into
+gzip-compressed JSON Lines files partitioned by UTC day:
+
+    <YYYY>/<MM>/auditlog-<YYYY-MM-DD>.<first id>.jsonl.gz
+
+The files go to the storage the database snapshots use (S3_BUCKET_NAME, or SNAPSHOT_DIR,
+see snapshots.py), under audit_archive/, so they survive the app's disk being replaced on
+deploy or restart. Without either, they are kept under settings.AUDIT_ARCHIVE_DIR.
+
+archive_before() walks the expired rows oldest first in batches of AUDIT_ARCHIVE_BATCH and
+writes each batch as one new part file per day, named after the batch's first id on that day.
+Parts are written whole (a temporary file renamed into place, or a single S3 PUT) and never
+appended to, and only then is the batch deleted. A crash can leave a row in both places but
+never in neither, and never damages a part that is already stored. read() drops the
+duplicates a re-run may leave.
+
+read() is the read path for archived entries: it lists the parts of the months the requested
+time range overlaps, then opens only those of its days.
+"""
+import gzip
+import json
+from contextlib import closing
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from . import snapshots
+from .models import AuditLog
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_BATCH_SIZE = 5000
+# Longest time range read() serves in one call, in days
+MAX_READ_DAYS = 366
+# Folder of the snapshot storage the archive is kept in
+STORAGE_FOLDER = "audit_archive"
+
+# Columns written for each archived entry (user__username keeps entries readable after the user is gone)
+ARCHIVED_FIELDS = ("id", "timestamp", "user_id", "user__username", "action", "model_name", "object_id", "details")
+
+
+def archive_dir() -> Path:
+    return Path(getattr(settings, "AUDIT_ARCHIVE_DIR", Path(settings.BASE_DIR) / "audit_archive"))
+
+
+def archive_backend():
+    """
+    The snapshot storage's audit_archive/ folder when one is configured, otherwise AUDIT_ARCHIVE_DIR
+    """
+    return snapshots.backend_from_env(STORAGE_FOLDER) or snapshots.LocalDirBackend(archive_dir())
+
+
+def retention_cutoff(days: int = None) -> datetime:
+    """
+    Entries logged before this instant are due for archiving
+    """
+    if days is None:
+        days = getattr(settings, "AUDIT_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+    return timezone.now() - timedelta(days=days)
+
+
+def partition_key(day, first_id: int) -> str:
+    return f"{day:%Y}/{day:%m}/auditlog-{day:%Y-%m-%d}.{first_id}.jsonl.gz"
+
+
+def _key_day(key: str):
+    # "auditlog-YYYY-MM-DD..." -> the date; keys of files this module did not write give None
+    name = key.rpartition("/")[2]
+    try:
+        return datetime.strptime(name[len("auditlog-"):len("auditlog-YYYY-MM-DD")], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _entry(row: dict) -> dict:
+    entry = dict(row)
+    entry["username"] = entry.pop("user__username")
+    entry["timestamp"] = row["timestamp"].isoformat()
+    return entry
+
+
+def _write_parts(batch: list, backend) -> None:
+    by_day = {}
+    for row in batch:
+        by_day.setdefault(row["timestamp"].astimezone(dt_timezone.utc).date(), []).append(row)
+    for day, rows in by_day.items():
+        lines = "".join(json.dumps(_entry(row), separators=(",", ":")) + "\n" for row in rows)
+        # mtime=0: a re-run archiving the same rows writes the same bytes
+        backend.put_bytes(partition_key(day, rows[0]["id"]), gzip.compress(lines.encode("utf-8"), mtime=0))
+
+
+def archive_before(cutoff: datetime, batch_size: int = None, backend=None) -> int:
+    """
+    Exports every entry logged before cutoff to the archive and deletes it from the database,
+    one bounded batch (one SELECT and one DELETE) at a time. Returns the number archived.
+    """
+    batch_size = batch_size or getattr(settings, "AUDIT_ARCHIVE_BATCH", DEFAULT_BATCH_SIZE)
+    backend = backend or archive_backend()
+    archived = 0
+    while True:
+        batch = list(
+            AuditLog.objects.filter(timestamp__lt=cutoff)
+            .order_by("timestamp", "id")
+            .values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not batch:
+            return archived
+        _write_parts(batch, backend)
+        AuditLog.objects.filter(pk__in=[row["id"] for row in batch]).delete()
+        archived += len(batch)
+
+
+def vacuum() -> bool:
+    """
+    Returns the space freed by deleted rows to the file system (SQLite only). Rewrites the
+    whole database file, so run it off-peak. Returns False on other backends.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("VACUUM")
+    return True
+
+
+def _month_prefixes(first_day, last_day) -> list:
+    prefixes = []
+    year, month = first_day.year, first_day.month
+    while (year, month) <= (last_day.year, last_day.month):
+        prefixes.append(f"{year:04d}/{month:02d}/")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return prefixes
+
+
+def read(start: datetime, end: datetime, model_name: str = None, action: str = None,
+         username: str = None, backend=None):
+    """
+    Yields archived entries (dicts, timestamp as ISO string) logged in [start, end), oldest
+    first, optionally filtered. Lists the stored parts month by month and opens only those of
+    days overlapping the range. Ranges longer than MAX_READ_DAYS raise ValueError.
+    """
+    if end - start > timedelta(days=MAX_READ_DAYS):
+        raise ValueError(f"Archive reads span at most {MAX_READ_DAYS} days")
+    backend = backend or archive_backend()
+    first_day = start.astimezone(dt_timezone.utc).date()
+    last_day = end.astimezone(dt_timezone.utc).date()
+    parts_by_day = {}
+    for prefix in _month_prefixes(first_day, last_day):
+        for key in backend.list(prefix):
+            day = _key_day(key)
+            if day is not None and first_day <= day <= last_day:
+                parts_by_day.setdefault(day, []).append(key)
+
+    for day in sorted(parts_by_day):
+        seen = set()
+        entries = []
+        for key in parts_by_day[day]:
+            with closing(backend.open(key)) as stream, gzip.open(stream, "rt", encoding="utf-8") as fh:
+                for line in fh:
+                    entry = json.loads(line)
+                    if entry["id"] in seen:
+                        continue
+                    seen.add(entry["id"])
+                    logged = datetime.fromisoformat(entry["timestamp"])
+                    if not start <= logged < end:
+                        continue
+                    if model_name and entry["model_name"] != model_name:
+                        continue
+                    if action and entry["action"] != action:
+                        continue
+                    if username and entry["username"] != username:
+                        continue
+                    entries.append((logged, entry["id"], entry))
+        entries.sort(key=lambda e: (e[0], e[1]))
+        for _, _, entry in entries:
+            yield entry
+
+
+def day_start(day) -> datetime:
+    """
+    Midnight UTC at the start of a date, for building read() ranges from dates
+    """
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
@@ -0,0 +1,159 @@
+"""
+Buffered audit log writer.
+
+record() does not write an AuditLog row inside the request. Entries are queued in-process
+(once the surrounding transaction commits, so rolled-back work is never audited) and written
+by flush() with one bulk_create per batch. A flush happens:
+
+  * at the end of a request (the request_finished receiver in signals.py, i.e. after the
+    response has been sent) once AUDIT_FLUSH_SIZE entries are queued or the oldest queued
+    entry is AUDIT_FLUSH_INTERVAL seconds old;
+  * when the worker process exits (atexit);
+  * whenever flush() is called directly (tests, management commands).
+
+Entries whose user was deleted while they were queued are written without a user, as
+AuditLog.user's SET_NULL would have left them. A batch that fails to write is retried one entry
+at a time, and entries that still fail (e.g. "database is locked") go back in the queue for the
+next flush.
+
+If the queue already holds AUDIT_QUEUE_SIZE entries, record() writes the entry synchronously
+instead. An idle worker keeps its queue until its next request or its exit; entries still
+queued when a worker is killed without a clean shutdown (SIGKILL, OOM) are lost.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AuditLog, User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_QUEUE_SIZE = 10_000
+
+_queue = queue.Queue(maxsize=getattr(settings, "AUDIT_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+_flush_lock = threading.Lock()
+# monotonic time the oldest entry still queued was added, None when the queue was last seen empty
+_oldest = None
+
+
+def _flush_size() -> int:
+    return getattr(settings, "AUDIT_FLUSH_SIZE", DEFAULT_FLUSH_SIZE)
+
+
+def _flush_interval() -> float:
+    return getattr(settings, "AUDIT_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+
+
+def _enqueue(entry: AuditLog) -> None:
+    global _oldest
+    try:
+        _queue.put_nowait(entry)
+    except queue.Full:
+        logger.warning("Audit queue full; writing entry synchronously")
+        _write([entry])
+        return
+    if _oldest is None:
+        _oldest = time.monotonic()
+
+
+def _write(entries) -> None:
+    """
+    Inserts entries in one transaction, clearing the user of entries whose user no longer exists
+    """
+    with transaction.atomic():
+        user_ids = {e.user_id for e in entries if e.user_id is not None}
+        if user_ids:
+            existing = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+            for entry in entries:
+                if entry.user_id not in existing:
+                    entry.user_id = None
+        AuditLog.objects.bulk_create(entries)
+
+
+def record(user, action: str, model_name: str, object_id: int, details=None) -> None:
+    """
+    Queues an audit entry. user may be None (anonymous); the timestamp is taken now, not at flush time.
+    """
+    entry = AuditLog(
+        user_id=user.pk if user is not None else None,
+        action=action,
+        model_name=model_name,
+        object_id=object_id,
+        details=details,
+        timestamp=timezone.now(),
+    )
+    transaction.on_commit(lambda: _enqueue(entry))
+
+
+def pending() -> int:
+    return _queue.qsize()
+
+
+def flush() -> int:
+    """
+    Writes every queued entry, in batches of AUDIT_FLUSH_SIZE. Returns the number written;
+    entries that could not be written are queued again.
+    """
+    global _oldest
+    written = 0
+    failed = []
+    with _flush_lock:
+        while True:
+            batch = []
+            try:
+                while len(batch) < _flush_size():
+                    batch.append(_queue.get_nowait())
+            except queue.Empty:
+                pass
+            if not batch:
+                break
+            try:
+                _write(batch)
+                written += len(batch)
+                continue
+            except Exception:
+                logger.exception("Failed to write %d audit entries; retrying one at a time", len(batch))
+            for entry in batch:
+                entry.pk = None  # may have been set before the batch rolled back
+                try:
+                    _write([entry])
+                    written += 1
+                except Exception:
+                    failed.append(entry)
+        if failed:
+            logger.error("Putting %d unwritten audit entries back in the queue", len(failed))
+        for entry in failed:
+            try:
+                _queue.put_nowait(entry)
+            except queue.Full:
+                logger.error("Audit queue full; dropping entry %s %s %s", entry.action, entry.model_name, entry.object_id)
+        _oldest = None if _queue.empty() else time.monotonic()
+    return written
+
+
+def flush_due() -> bool:
+    """
+    Whether the size or time trigger has fired
+    """
+    if _queue.qsize() >= _flush_size():
+        return True
+    return _oldest is not None and time.monotonic() - _oldest >= _flush_interval()
+
+
+def _flush_at_exit():
+    if not _queue.empty():
+        try:
+            flush()
+        except Exception:
+            logger.exception("Failed to flush audit entries at exit")
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,34 @@
+"""
+Keys and helpers for server-side cached responses.
+
+Views read through these keys and the receivers in signals.py invalidate them. The cache
+backend is the project's default cache (settings.CACHES); with the default per-process
+LocMemCache, invalidation only reaches the worker that made the change, so the timeouts
+below bound staleness elsewhere. Point CACHE_BACKEND at a shared backend when running
+several workers.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+# Newest publishable templates shown in the homepage 'Community Templates' widget
+COMMUNITY_WIDGET_KEY = "ai_scale_app:community_widget"
+COMMUNITY_WIDGET_SIZE = 20  # rows kept in cache; larger limits go to the database
+COMMUNITY_WIDGET_TIMEOUT = 5 * 60
+
+
+def invalidate_community_widget():
+    # once the change is committed: a request reading the widget before then would cache the
+    # old rows again, and a rollback leaves nothing to invalidate (runs at once outside a transaction)
+    transaction.on_commit(lambda: cache.delete(COMMUNITY_WIDGET_KEY))
+
+
+# Version diffs (template_version_diff). The key embeds both templates' updatedAt, so editing
+# either version simply stops the old entry being read; nothing needs invalidating.
+TEMPLATE_DIFF_TIMEOUT = 24 * 60 * 60
+
+
+def template_diff_key(old, new) -> str:
+    return (
+        f"ai_scale_app:template_diff:{old.pk}:{old.updatedAt.timestamp()}"
+        f":{new.pk}:{new.updatedAt.timestamp()}"
+    )
@@ -0,0 +1,76 @@
+"""
+Maintained counters for the system overview dashboard.
+
+Each counter is a SystemCounter row. Model saves and deletes adjust the rows through the
+receivers in signals.py (an F() increment, in the same transaction as the change), so
+the dashboard reads all of them with one primary-key lookup instead of a COUNT(*) per table.
+
+Writes that skip signals (bulk_create, queryset.update/delete, raw SQL, other tools writing
+to the database) make the counters drift, and so do role and activation changes on existing
+users: the User receivers only adjust on create and delete, so that ordinary saves (logins,
+profile edits) cost no counter query. reconcile() recounts every counter from its source
+query; `python manage.py reconcile_counters` runs it and can be scheduled, and read() runs it
+itself when the last reconciliation is older than settings.SYSTEM_COUNTERS_MAX_AGE seconds.
+So the numbers served are exact up to those writes, and those are never reflected more than
+SYSTEM_COUNTERS_MAX_AGE late.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Subject, SystemCounter, Template, User
+
+USERS = "totalUsers"
+SUBJECTS = "subjects"
+TEMPLATES = "templates"
+ACTIVE_COORDINATORS = "activeCoordinators"
+
+# counter name -> queryset whose count is the true value
+SOURCES = {
+    USERS: lambda: User.objects.all(),
+    SUBJECTS: lambda: Subject.objects.all(),
+    TEMPLATES: lambda: Template.objects.all(),
+    ACTIVE_COORDINATORS: lambda: User.objects.filter(role=User.Role.COORDINATOR, is_active=True),
+}
+
+DEFAULT_MAX_AGE = 15 * 60
+
+
+def max_age() -> timedelta:
+    return timedelta(seconds=getattr(settings, "SYSTEM_COUNTERS_MAX_AGE", DEFAULT_MAX_AGE))
+
+
+def adjust(name: str, delta: int) -> None:
+    """
+    Adds delta to a counter. A counter that has never been reconciled has no row yet and is
+    left alone; the first read() counts it from scratch.
+    """
+    SystemCounter.objects.filter(pk=name).update(value=F("value") + delta)
+
+
+def reconcile() -> dict:
+    """
+    Recounts every counter from its source query and returns {name: value}
+    """
+    stamp = timezone.now()
+    values = {name: source().count() for name, source in SOURCES.items()}
+    SystemCounter.objects.bulk_create(
+        [SystemCounter(name=name, value=value, reconciledAt=stamp) for name, value in values.items()],
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=["value", "reconciledAt"],
+    )
+    return values
+
+
+def read() -> dict:
+    """
+    {name: value} for every counter, in one query when the counters are complete and
+    were reconciled within max_age()
+    """
+    rows = list(SystemCounter.objects.filter(pk__in=SOURCES))
+    if len(rows) < len(SOURCES) or min(r.reconciledAt for r in rows) < timezone.now() - max_age():
+        return reconcile()
+    return {r.name: r.value for r in rows}
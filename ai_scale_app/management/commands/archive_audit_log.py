@@ -0,0 +1,28 @@
+# Run python manage.py archive_audit_log [--days 90] [--batch-size 5000] [--vacuum]
+from django.core.management.base import BaseCommand
+
+from ai_scale_app import archive
+
+
+# Moves audit entries older than the retention window into the gzipped, day-partitioned
+# JSONL archive in the snapshot storage (see archive.py) and deletes them from the database in bounded batches.
+# Schedule it daily; --vacuum also shrinks the SQLite file afterwards (rewrites it, so off-peak only).
+class Command(BaseCommand):
+    help = "Archives and deletes audit log entries older than the retention window"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Retention window in days (default settings.AUDIT_RETENTION_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=None,
+                            help="Entries exported and deleted per batch (default settings.AUDIT_ARCHIVE_BATCH)")
+        parser.add_argument("--vacuum", action="store_true", help="VACUUM the SQLite database afterwards")
+
+    def handle(self, *args, **options):
+        cutoff = archive.retention_cutoff(options["days"])
+        count = archive.archive_before(cutoff, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {count} audit entries logged before {cutoff:%Y-%m-%d %H:%M}."
+        ))
+        if options["vacuum"] and count:
+            if archive.vacuum():
+                self.stdout.write("Database vacuumed.")
@@ -0,0 +1,15 @@
+# Run python manage.py collect_item_content
+from django.core.management.base import BaseCommand
+
+from ai_scale_app.models import ItemContent
+
+
+# Deletes the item text (ItemContent) no template item references any more: text replaced by an
+# edit or left behind by deleted items stays until this runs. Safe alongside live traffic;
+# schedule it (e.g. daily cron).
+class Command(BaseCommand):
+    help = "Deletes item contents no template item references"
+
+    def handle(self, *args, **options):
+        deleted = ItemContent.collect_garbage()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unreferenced item contents."))
@@ -0,0 +1,300 @@
+# Run python manage.py generate_dataset --rows 100000 [--seed 1] [--chunk-size 2000] [--prefix gen] [--now 2026-01-31]
+import argparse
+import random
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ai_scale_app import caches, counters, scales, search, summaries
+from ai_scale_app.models import (
+    AcknowledgementForm, AcknowledgementFormItem, AuditLog, Enrolment, ItemContent, Subject, Template,
+    TemplateItem, TemplateOwnership, TemplateSummary, User,
+)
+
+# Shape of the generated data, per template unless stated otherwise
+COORDINATORS_PER_TEMPLATE = 1 / 25
+STAFF_PER_COORDINATOR = 0.5
+ADMINS_PER_COORDINATOR = 0.02
+STUDENTS_PER_TEMPLATE = 0.5
+ENROLMENTS_PER_STUDENT = 4
+TEMPLATES_PER_SUBJECT_CODE = 50
+SUBJECT_OFFERINGS = [(year, semester) for year in (2022, 2023, 2024, 2025) for semester in (1, 2)]
+MAX_VERSIONS = 5          # each version chain has 1..MAX_VERSIONS templates
+ITEMS_PER_TEMPLATE = (2, 8)
+PUBLISHABLE_FRACTION = 0.6
+SHARED_FRACTION = 0.1     # templates also shared with a second coordinator
+ACK_FORM_FRACTION = 0.3
+ACK_ITEMS_PER_FORM = 2
+AUDIT_SPAN = timedelta(days=365)  # audit entries spread over the year up to --now, so with the
+                                  # default retention about a quarter are recent and the rest archivable
+
+# Rows written per template with the ratios above, counting users, enrolments, item contents and
+# summaries (not the search index); --rows is divided by this to get the number of templates
+ROWS_PER_TEMPLATE = 16
+
+LEVEL_NAMES = ("No AI use allowed", "Minimal AI use allowed", "Moderate AI use allowed", "Broad AI use allowed")
+FIRST_NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn")
+LAST_NAMES = ("Nguyen", "Smith", "Chen", "Patel", "Brown", "Garcia", "Wilson", "Kim", "Singh", "Taylor")
+TOPICS = ("Essay", "Lab report", "Group project", "Exam", "Reflection", "Presentation", "Code review", "Case study")
+SCOPES = ("Assessment", "Tutorial", "Workshop", "General")
+TASKS = ("Research", "Outline", "Drafting", "Editing", "Referencing", "Data analysis", "Code", "Slides")
+INSTRUCTIONS = (
+    "Use AI only to brainstorm ideas",
+    "AI may be used to check grammar and spelling",
+    "Do not use AI for this task",
+    "AI-generated drafts must be cited and revised",
+    "AI may suggest structure but not content",
+)
+AI_TOOLS = ("ChatGPT", "Copilot", "Gemini", "Grammarly", "Claude")
+
+# Tables reported at the end, in insertion order
+REPORTED_MODELS = (
+    User, Subject, Enrolment, Template, TemplateOwnership, ItemContent, TemplateItem,
+    AcknowledgementForm, AcknowledgementFormItem, AuditLog, TemplateSummary,
+)
+
+
+def _day(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date as YYYY-MM-DD, got {value!r}")
+
+
+# Generates a reproducible synthetic dataset for load testing: users of every role, subject
+# offerings per year and semester, student enrolments, templates in version chains with their
+# items (sharing ItemContent across versions), ownership shares, acknowledgement forms and audit
+# entries. Rows go in with bulk_create, chunk by chunk in their own transactions, and the read
+# models that saves would maintain (summaries, search index, counters) are rebuilt at the end.
+# The same --seed, --rows and --now always give the same rows; --prefix keeps runs apart.
+class Command(BaseCommand):
+    help = "Generates a seeded synthetic dataset of roughly --rows rows for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000,
+                            help="Approximate number of rows to write (e.g. 10000 to 10000000)")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows per bulk insert")
+        parser.add_argument("--prefix", default="gen",
+                            help="Prefix of generated usernames and subject codes (a letter, then up to 3 letters/digits)")
+        parser.add_argument("--password", default="password", help="Password of every generated user")
+        parser.add_argument("--now", type=_day, default=None,
+                            help="Day (YYYY-MM-DD, UTC) the audit entries count back from (default today)")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if not re.fullmatch(r"[a-z][a-z0-9]{0,3}", prefix):
+            raise CommandError("--prefix must be a lowercase letter followed by up to 3 letters or digits")
+        if options["rows"] < ROWS_PER_TEMPLATE or options["chunk_size"] < 1:
+            raise CommandError(f"--rows must be at least {ROWS_PER_TEMPLATE} and --chunk-size at least 1")
+        if User.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Users prefixed '{prefix}-' already exist; pick another --prefix")
+
+        self.prefix = prefix
+        self.rng = random.Random(options["seed"])
+        self.chunk_size = options["chunk_size"]
+        # midnight, so reruns on the same day give the same timestamps too
+        self.audit_end = datetime.combine(options["now"] or datetime.now(timezone.utc).date(), datetime.min.time(), timezone.utc)
+        self.inserted = 0
+        self.started = time.perf_counter()
+        before = {model: model.objects.count() for model in REPORTED_MODELS}
+
+        templates = max(1, options["rows"] // ROWS_PER_TEMPLATE)
+        coordinators = max(1, round(templates * COORDINATORS_PER_TEMPLATE))
+        self.stdout.write(f"Generating ~{options['rows']} rows: {templates} templates, {coordinators} coordinators "
+                          f"(seed {options['seed']}, chunks of {self.chunk_size})")
+
+        levels = list(scales.resolve(LEVEL_NAMES).values())
+        password = make_password(options["password"])  # hashed once, shared by every generated user
+        coordinator_ids = self._users(User.Role.COORDINATOR, coordinators, password)
+        self._users(User.Role.STAFF, round(coordinators * STAFF_PER_COORDINATOR), password)
+        self._users(User.Role.ADMIN, max(1, round(coordinators * ADMINS_PER_COORDINATOR)), password)
+        student_ids = self._users(User.Role.STUDENT, round(templates * STUDENTS_PER_TEMPLATE), password)
+        subject_ids = self._subjects(max(1, templates // TEMPLATES_PER_SUBJECT_CODE))
+        self._enrolments(student_ids, subject_ids)
+        self._templates(templates, coordinator_ids, subject_ids, [level.id for level in levels])
+
+        # bulk_create skipped the receivers that maintain these
+        self._step("search index", search.rebuild_index)
+        self._step("summaries", lambda: summaries.rebuild_summaries(batch_size=self.chunk_size))
+        self._step("counters", counters.reconcile)
+        caches.invalidate_community_widget()
+
+        elapsed = time.perf_counter() - self.started
+        total = 0
+        for model in REPORTED_MODELS:
+            added = model.objects.count() - before[model]
+            total += added
+            self.stdout.write(f"  {model.__name__:<24} {added:>10}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {total} rows (plus the search index) in {elapsed:.1f}s, {total / elapsed:.0f} rows/s."
+        ))
+
+    # ---- helpers ---- #
+    def _progress(self, label, done, total):
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(f"  {label:<12} {done:>9}/{total:<9} {self.inserted:>10} rows  "
+                          f"{self.inserted / elapsed:>8.0f} rows/s")
+
+    def _insert(self, model, objs) -> list:
+        """
+        bulk_create in chunk_size slices (TemplateItem stores its ItemContent per slice too)
+        """
+        created = []
+        for start in range(0, len(objs), self.chunk_size):
+            created += model.objects.bulk_create(objs[start:start + self.chunk_size])
+        self.inserted += len(objs)
+        return created
+
+    def _step(self, label, func):
+        started = time.perf_counter()
+        func()
+        self.stdout.write(f"  {label:<12} rebuilt in {time.perf_counter() - started:.1f}s")
+
+    def _users(self, role, count, password) -> list:
+        ids = []
+        for start in range(0, count, self.chunk_size):
+            users = [
+                User(
+                    username=f"{self.prefix}-{role.lower()}-{n}",
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    email=f"{self.prefix}-{role.lower()}-{n}@example.com",
+                    role=role,
+                    password=password,
+                    is_staff=role == User.Role.ADMIN,
+                )
+                for n in range(start, min(start + self.chunk_size, count))
+            ]
+            with transaction.atomic():
+                ids += [u.id for u in self._insert(User, users)]
+            self._progress(role.label.lower(), len(ids), count)
+        return ids
+
+    def _subjects(self, codes) -> list:
+        subjects = [
+            Subject(
+                subjectCode=f"{self.prefix.upper()}{code:05d}",
+                name=f"{self.rng.choice(TOPICS)} studies {code}",
+                year=year,
+                semester=semester,
+            )
+            for code in range(codes)
+            for year, semester in SUBJECT_OFFERINGS
+        ]
+        with transaction.atomic():
+            ids = [s.id for s in self._insert(Subject, subjects)]
+        self._progress("subjects", len(ids), len(ids))
+        return ids
+
+    def _enrolments(self, student_ids, subject_ids):
+        per_student = min(ENROLMENTS_PER_STUDENT, len(subject_ids))
+        for start in range(0, len(student_ids), self.chunk_size):
+            enrolments = [
+                Enrolment(studentId_id=student_id, subjectId_id=subject_id)
+                for student_id in student_ids[start:start + self.chunk_size]
+                for subject_id in self.rng.sample(subject_ids, per_student)
+            ]
+            with transaction.atomic():
+                self._insert(Enrolment, enrolments)
+            self._progress("enrolments", min(start + self.chunk_size, len(student_ids)), len(student_ids))
+
+    def _templates(self, count, coordinator_ids, subject_ids, level_ids):
+        """
+        Writes version chains until count templates exist, a chunk of about chunk_size templates at a time
+        """
+        done = 0
+        chain = 0
+        while done < count:
+            batch = []
+            while len(batch) < self.chunk_size and done + len(batch) < count:
+                length = min(self.rng.randint(1, MAX_VERSIONS), count - done - len(batch))
+                batch += self._version_chain(chain, length, coordinator_ids, subject_ids, level_ids)
+                chain += 1
+            with transaction.atomic():
+                self._write_templates(batch, coordinator_ids)
+            done += len(batch)
+            self._progress("templates", done, count)
+
+    def _version_chain(self, chain, length, coordinator_ids, subject_ids, level_ids) -> list:
+        """
+        (Template, item field dicts) for versions 0..length-1 of one template. Each version
+        revises the instructions of one item of the previous one, so most item text is shared.
+        """
+        owner_id = self.rng.choice(coordinator_ids)
+        subject_id = self.rng.choice(subject_ids)
+        topic = self.rng.choice(TOPICS)
+        items = [
+            {
+                "task": f"{self.rng.choice(TASKS)} {k + 1}",
+                "instructionsToStudents": f"{self.rng.choice(INSTRUCTIONS)} (template {chain}, item {k + 1})",
+                "aiUseScaleLevel_id": self.rng.choice(level_ids),
+                "useAcknowledgement": self.rng.random() < 0.5,
+            }
+            for k in range(self.rng.randint(*ITEMS_PER_TEMPLATE))
+        ]
+        versions = []
+        for version in range(length):
+            if version:
+                items = [dict(item) for item in items]
+                revised = self.rng.choice(items)
+                revised["instructionsToStudents"] = f"{self.rng.choice(INSTRUCTIONS)} (template {chain}, revision {version})"
+            template = Template(
+                ownerId_id=owner_id,
+                name=f"{topic} {chain}",
+                version=version,
+                subject_id=subject_id,
+                scope=self.rng.choice(SCOPES),
+                description=f"{topic} guidelines, version {version}",
+                isPublishable=self.rng.random() < PUBLISHABLE_FRACTION,
+                isTemplate=True,
+            )
+            versions.append((template, items))
+        return versions
+
+    def _write_templates(self, batch, coordinator_ids):
+        templates = self._insert(Template, [template for template, _ in batch])
+
+        owners = [TemplateOwnership(templateId_id=t.id, ownerId_id=t.ownerId_id) for t in templates]
+        for t in templates:
+            if len(coordinator_ids) > 1 and self.rng.random() < SHARED_FRACTION:
+                other = self.rng.choice([c for c in self.rng.sample(coordinator_ids, 2) if c != t.ownerId_id])
+                owners.append(TemplateOwnership(templateId_id=t.id, ownerId_id=other))
+        self._insert(TemplateOwnership, owners)
+
+        self._insert(TemplateItem, [
+            TemplateItem(templateId_id=t.id, **fields)
+            for t, (_, items) in zip(templates, batch)
+            for fields in items
+        ])
+
+        forms = self._insert(AcknowledgementForm, [
+            AcknowledgementForm(templateId_id=t.id, name=f"{t.name} acknowledgement", subject_id=t.subject_id)
+            for t in templates
+            if self.rng.random() < ACK_FORM_FRACTION
+        ])
+        self._insert(AcknowledgementFormItem, [
+            AcknowledgementFormItem(
+                ackFormId_id=form.id,
+                aiToolsUsed=self.rng.choice(AI_TOOLS),
+                purposeUsage=self.rng.choice(INSTRUCTIONS),
+                keyPromptsUsed=f"Prompt {n + 1}",
+            )
+            for form in forms
+            for n in range(ACK_ITEMS_PER_FORM)
+        ])
+
+        audit = []
+        for t in templates:
+            created = self.audit_end - timedelta(seconds=self.rng.randrange(int(AUDIT_SPAN.total_seconds())))
+            details = {"name": t.name, "version": t.version}
+            audit.append(AuditLog(user_id=t.ownerId_id, action="CREATE", model_name="Template",
+                                  object_id=t.id, details=details, timestamp=created))
+            audit.append(AuditLog(user_id=t.ownerId_id, action="UPDATE", model_name="Template",
+                                  object_id=t.id, details=details,
+                                  timestamp=min(created + timedelta(seconds=self.rng.randrange(7 * 86400)), self.audit_end)))
+        self._insert(AuditLog, audit)
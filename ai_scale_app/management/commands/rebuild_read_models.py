@@ -0,0 +1,22 @@
+# Run python manage.py rebuild_read_models
+from django.core.management.base import BaseCommand
+
+from ai_scale_app import caches, counters, search, summaries
+
+
+# Rebuilds everything the signal receivers keep in step with the source tables: the full-text
+# search index, the TemplateSummary rows and the dashboard counters, then drops the cached
+# community widget. Run it after loaddata (raw fixture saves skip the receivers) or any other
+# import that bypasses the ORM.
+class Command(BaseCommand):
+    help = "Rebuilds the search index, template summaries and dashboard counters"
+
+    def handle(self, *args, **options):
+        indexed = search.rebuild_index()
+        if indexed is not None:
+            self.stdout.write(f"Indexed {indexed} templates.")
+        self.stdout.write(f"Summarised {summaries.rebuild_summaries()} templates.")
+        for name, value in counters.reconcile().items():
+            self.stdout.write(f"{name}: {value}")
+        caches.invalidate_community_widget()
+        self.stdout.write(self.style.SUCCESS("Read models rebuilt."))
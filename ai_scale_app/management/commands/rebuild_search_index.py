@@ -0,0 +1,16 @@
+# Run python manage.py rebuild_search_index
+from django.core.management.base import BaseCommand
+
+from ai_scale_app import search
+
+
+# Rebuilds the community template full-text index from scratch (e.g. after bulk imports or loaddata)
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index for templates"
+
+    def handle(self, *args, **options):
+        count = search.rebuild_index()
+        if count is None:
+            self.stdout.write("Full-text index is only used on SQLite and on PostgreSQL with pg_trgm; nothing to rebuild.")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} templates."))
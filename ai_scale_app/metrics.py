@@ -0,0 +1,150 @@
+"""
+Per-endpoint request metrics in Prometheus text format.
+
+MetricsMiddleware times every request and records, per URL name (the `name=` of the matched
+route, "unmatched" for 404s) and method (METHODS, anything else as "other"):
+
+  * ai_scale_request_seconds       request latency through the whole middleware stack
+  * ai_scale_request_queries       number of SQL statements the request ran
+  * ai_scale_request_sql_seconds   time spent executing them
+  * ai_scale_response_bytes        response body size (not observed for streaming responses)
+  * ai_scale_responses_total       responses by status code
+
+SQL is counted by sql_wrapper(), which the connection_created receiver in signals.py installs
+on every database connection. It adds to the statistics of the request running in the current
+context (a contextvar, so under ASGI it follows the views into the threads Django runs them in) and
+costs a perf_counter() pair per statement. Queries run while a streaming body is being sent
+happen after the response left the middleware and are not attributed to the request.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (scripts/start.sh does) so each worker writes its
+samples to its own mmap'd file there and /metrics/ adds all workers up (prometheus_client's
+multiprocess mode; gunicorn.conf.py tidies up after workers that exit). Without it the
+figures are those of the serving process only.
+"""
+import contextvars
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import StreamingHttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+SQL_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+RESPONSE_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+LABELS = ("view", "method")
+
+# Methods labelled by name; any other method string a client sends is recorded as "other",
+# so requests cannot add label sets (and multiprocess files) at will
+METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+REQUEST_SECONDS = Histogram(
+    "ai_scale_request_seconds", "Request latency in seconds", LABELS, buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "ai_scale_request_queries", "SQL statements executed per request", LABELS, buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_SQL_SECONDS = Histogram(
+    "ai_scale_request_sql_seconds", "Time spent executing SQL per request, in seconds", LABELS,
+    buckets=SQL_TIME_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    "ai_scale_response_bytes", "Response body size in bytes", LABELS, buckets=RESPONSE_BYTES_BUCKETS,
+)
+RESPONSES = Counter("ai_scale_responses", "Responses by status code", (*LABELS, "status"))
+
+# [statement count, seconds] of the request being handled in this context, or None outside requests
+_request_sql = contextvars.ContextVar("ai_scale_request_sql", default=None)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    """
+    Database execute wrapper (see connection.execute_wrappers) timing each statement for the current request
+    """
+    stats = _request_sql.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+
+
+def install(connection) -> None:
+    # connection_created fires again whenever the same DatabaseWrapper reconnects. Outermost, so
+    # the pop() ending a connection.execute_wrapper() block open at the time still removes its own.
+    if sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, sql_wrapper)
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return "unmatched" if match is None else match.view_name
+
+
+def _method(request) -> str:
+    return request.method if request.method in METHODS else "other"
+
+
+def _record(request, response, stats, started):
+    elapsed = time.perf_counter() - started
+    labels = (_view_name(request), _method(request))
+    REQUEST_SECONDS.labels(*labels).observe(elapsed)
+    REQUEST_QUERIES.labels(*labels).observe(stats[0])
+    REQUEST_SQL_SECONDS.labels(*labels).observe(stats[1])
+    if not isinstance(response, StreamingHttpResponse) and hasattr(response, "content"):
+        RESPONSE_BYTES.labels(*labels).observe(len(response.content))
+    RESPONSES.labels(*labels, str(response.status_code)).inc()
+
+
+class MetricsMiddleware:
+    """
+    Records the metrics above for every request. Goes first in MIDDLEWARE so the latency
+    covers the rest of the stack; works in both sync (WSGI) and async (ASGI) handlers.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = [0, 0.0]
+        token = _request_sql.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_sql.reset(token)
+        _record(request, response, stats, started)
+        return response
+
+    async def __acall__(self, request):
+        stats = [0, 0.0]
+        token = _request_sql.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_sql.reset(token)
+        _record(request, response, stats, started)
+        return response
+
+
+def render() -> bytes:
+    """
+    Every metric in Prometheus text format, summed over all workers in multiprocess mode
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
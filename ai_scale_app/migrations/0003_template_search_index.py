@@ -0,0 +1,66 @@
+import sqlite3
+
+from django.db import migrations
+
+# Frozen copy of the schema in ai_scale_app/search.py at the time of this migration
+SEARCH_TABLE = "ai_scale_app_template_search"
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "name, description, scope, subject_code, owner, items, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+POPULATE_SQL = f"""
+    INSERT INTO {SEARCH_TABLE} (rowid, name, description, scope, subject_code, owner, items)
+    SELECT t.id,
+           t.name,
+           COALESCE(t.description, ''),
+           COALESCE(t.scope, ''),
+           COALESCE(s."subjectCode", ''),
+           u.username || ' ' || u.first_name || ' ' || u.last_name,
+           COALESCE((
+               SELECT group_concat(i.task || ' ' || COALESCE(i."instructionsToStudents", ''), ' ')
+               FROM ai_scale_app_templateitem i
+               WHERE i."templateId_id" = t.id
+           ), '')
+    FROM ai_scale_app_template t
+    JOIN ai_scale_app_user u ON u.id = t."ownerId_id"
+    LEFT JOIN ai_scale_app_subject s ON s.id = t.subject_id
+"""
+
+
+def _fts5_supported(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return False
+    try:
+        probe = sqlite3.connect(":memory:")
+        probe.execute("CREATE VIRTUAL TABLE probe USING fts5(x)")
+        probe.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def create_search_table(apps, schema_editor):
+    # Other backends (and SQLite builds without FTS5) fall back to icontains search
+    if not _fts5_supported(schema_editor):
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(POPULATE_SQL)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_scale_app', '0002_template_updatedat_auditlog'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
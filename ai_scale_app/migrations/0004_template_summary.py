@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_summaries(apps, schema_editor):
+    Template = apps.get_model("ai_scale_app", "Template")
+    TemplateSummary = apps.get_model("ai_scale_app", "TemplateSummary")
+    batch = []
+    for t in Template.objects.select_related("subject", "ownerId").order_by("pk").iterator(chunk_size=500):
+        subject, owner = t.subject, t.ownerId
+        batch.append(TemplateSummary(
+            templateId_id=t.pk,
+            ownerId_id=owner.pk,
+            ownerUsername=owner.username,
+            ownerName=f"{owner.first_name} {owner.last_name}".strip(),
+            name=t.name,
+            version=t.version,
+            subjectId_id=t.subject_id,
+            subjectCode=subject.subjectCode if subject else None,
+            subjectName=subject.name if subject else None,
+            year=subject.year if subject else None,
+            semester=subject.semester if subject else None,
+            isPublishable=bool(t.isPublishable),
+            isTemplate=bool(t.isTemplate),
+        ))
+        if len(batch) >= 500:
+            TemplateSummary.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        TemplateSummary.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_scale_app', '0003_template_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TemplateSummary',
+            fields=[
+                ('templateId', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='ai_scale_app.template')),
+                ('ownerUsername', models.CharField(max_length=150)),
+                ('ownerName', models.CharField(blank=True, max_length=301)),
+                ('name', models.CharField(max_length=120)),
+                ('version', models.PositiveSmallIntegerField(default=0)),
+                ('subjectCode', models.CharField(blank=True, max_length=10, null=True)),
+                ('subjectName', models.CharField(blank=True, max_length=100, null=True)),
+                ('year', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('semester', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('isPublishable', models.BooleanField(default=True)),
+                ('isTemplate', models.BooleanField(default=True)),
+                ('ownerId', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('subjectId', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ai_scale_app.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ownerUsername', 'name', 'version'], name='ai_scale_ap_ownerUs_a5dc43_idx'), models.Index(fields=['ownerUsername', 'subjectCode', 'year', 'semester'], name='ai_scale_ap_ownerUs_cec625_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
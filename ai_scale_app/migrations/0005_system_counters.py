@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_scale_app', '0004_template_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('reconciledAt', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:40
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TEXT_FIELDS = ("task", "instructionsToStudents", "examples", "aiGeneratedContent")
+BATCH_SIZE = 500
+
+
+# Frozen copy of ItemContent.hash_of
+def content_hash(texts: dict) -> str:
+    payload = json.dumps([texts.get(f) for f in TEXT_FIELDS], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def deduplicate_item_text(apps, schema_editor):
+    """
+    Moves each item's text into ItemContent, one row per distinct text, and points the item at it
+    """
+    TemplateItem = apps.get_model("ai_scale_app", "TemplateItem")
+    ItemContent = apps.get_model("ai_scale_app", "ItemContent")
+
+    def flush(items):
+        contents = {}
+        for item in items:
+            texts = {f: getattr(item, f) for f in TEXT_FIELDS}
+            item.content_id = content_hash(texts)
+            contents.setdefault(item.content_id, ItemContent(hash=item.content_id, **texts))
+        ItemContent.objects.bulk_create(contents.values(), ignore_conflicts=True)
+        TemplateItem.objects.bulk_update(items, ["content"])
+
+    batch = []
+    for item in TemplateItem.objects.order_by("pk").only("pk", *TEXT_FIELDS).iterator(chunk_size=BATCH_SIZE):
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+def restore_item_text(apps, schema_editor):
+    TemplateItem = apps.get_model("ai_scale_app", "TemplateItem")
+    batch = []
+    for item in TemplateItem.objects.select_related("content").order_by("pk").iterator(chunk_size=BATCH_SIZE):
+        for f in TEXT_FIELDS:
+            setattr(item, f, getattr(item.content, f))
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            TemplateItem.objects.bulk_update(batch, list(TEXT_FIELDS))
+            batch = []
+    if batch:
+        TemplateItem.objects.bulk_update(batch, list(TEXT_FIELDS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_scale_app', '0007_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemContent',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('task', models.TextField()),
+                ('instructionsToStudents', models.TextField(blank=True, null=True)),
+                ('examples', models.TextField(blank=True, null=True)),
+                ('aiGeneratedContent', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='templateitem',
+            name='content',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='ai_scale_app.itemcontent'),
+        ),
+        migrations.RunPython(deduplicate_item_text, restore_item_text),
+    ]
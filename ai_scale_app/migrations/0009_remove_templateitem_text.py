@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Separate from 0008 so the data copy is committed before the table is altered
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_scale_app', '0008_item_content'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='templateitem',
+            name='task',
+        ),
+        migrations.RemoveField(
+            model_name='templateitem',
+            name='instructionsToStudents',
+        ),
+        migrations.RemoveField(
+            model_name='templateitem',
+            name='examples',
+        ),
+        migrations.RemoveField(
+            model_name='templateitem',
+            name='aiGeneratedContent',
+        ),
+        migrations.AlterField(
+            model_name='templateitem',
+            name='content',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='ai_scale_app.itemcontent'),
+        ),
+    ]
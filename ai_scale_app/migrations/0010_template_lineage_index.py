@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_scale_app', '0009_remove_templateitem_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='template',
+            index=models.Index(fields=['name', 'subject', 'version'], name='ai_scale_ap_name_39c468_idx'),
+        ),
+    ]
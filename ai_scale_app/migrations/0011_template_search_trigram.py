@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# Frozen copy of the PostgreSQL schema in ai_scale_app/search.py at the time of this migration
+SEARCH_TABLE = "ai_scale_app_template_search"
+
+CREATE_SQL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    "template_id bigint PRIMARY KEY REFERENCES ai_scale_app_template (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "name text NOT NULL, description text NOT NULL, scope text NOT NULL, "
+    "subject_code text NOT NULL, owner text NOT NULL, items text NOT NULL, "
+    "document text GENERATED ALWAYS AS "
+    "(name || ' ' || description || ' ' || scope || ' ' || subject_code || ' ' || owner || ' ' || items) STORED)",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_trgm ON {SEARCH_TABLE} USING gin (document gin_trgm_ops)",
+)
+
+POPULATE_SQL = f"""
+    INSERT INTO {SEARCH_TABLE} (template_id, name, description, scope, subject_code, owner, items)
+    SELECT t.id,
+           t.name,
+           COALESCE(t.description, ''),
+           COALESCE(t.scope, ''),
+           COALESCE(s."subjectCode", ''),
+           u.username || ' ' || u.first_name || ' ' || u.last_name,
+           COALESCE((
+               SELECT string_agg(c.task || ' ' || COALESCE(c."instructionsToStudents", ''), ' ')
+               FROM ai_scale_app_templateitem i
+               JOIN ai_scale_app_itemcontent c ON c.hash = i.content_id
+               WHERE i."templateId_id" = t.id
+           ), '')
+    FROM ai_scale_app_template t
+    JOIN ai_scale_app_user u ON u.id = t."ownerId_id"
+    LEFT JOIN ai_scale_app_subject s ON s.id = t.subject_id
+"""
+
+
+def create_search_table(apps, schema_editor):
+    # SQLite has its FTS5 table from 0003; other backends fall back to icontains search
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            # without the contrib module search falls back to icontains;
+            # `manage.py rebuild_search_index` creates the table once it is installed
+            return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(POPULATE_SQL)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_scale_app', '0010_template_lineage_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:41
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_sort_keys(apps, schema_editor):
+    Subject = apps.get_model("ai_scale_app", "Subject")
+    TemplateSummary = apps.get_model("ai_scale_app", "TemplateSummary")
+    subject = Subject.objects.filter(pk=OuterRef("subjectId"))
+    TemplateSummary.objects.filter(subjectId__isnull=False).update(
+        sortCode=Subquery(subject.values("subjectCode")[:1]),
+        sortYear=Subquery(subject.values("year")[:1]),
+        sortSemester=Subquery(subject.values("semester")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_scale_app', '0011_template_search_trigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='templatesummary',
+            name='sortCode',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='templatesummary',
+            name='sortSemester',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='templatesummary',
+            name='sortYear',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_sort_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='templatesummary',
+            index=models.Index(condition=models.Q(('isPublishable', True), ('isTemplate', True)), fields=['-sortYear', '-sortSemester', 'name', '-version', '-templateId'], name='summary_community_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='templatesummary',
+            index=models.Index(condition=models.Q(('isPublishable', True), ('isTemplate', True)), fields=['name', '-version', '-templateId'], name='summary_community_name'),
+        ),
+        migrations.AddIndex(
+            model_name='templatesummary',
+            index=models.Index(condition=models.Q(('isPublishable', True), ('isTemplate', True)), fields=['sortCode', '-sortYear', '-sortSemester', 'name', '-version', '-templateId'], name='summary_community_subject'),
+        ),
+        migrations.AddIndex(
+            model_name='templatesummary',
+            index=models.Index(condition=models.Q(('isPublishable', True), ('isTemplate', True)), fields=['sortYear', 'sortSemester', 'name', 'version', 'templateId'], name='summary_community_oldest'),
+        ),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+import hashlib
+import json
+
+from django.db import IntegrityError, connection, connections, models, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 
@@ -57,14 +62,82 @@ class Template(models.Model):
     version = models.PositiveSmallIntegerField(default=0)  
     isPublishable = models.BooleanField(default=True,blank=True, null=True)
     isTemplate = models.BooleanField(default=True,blank=True, null=True)
+    # bumped whenever the template, its items or anything shown alongside it changes (used for ETags)
+    updatedAt = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = [("ownerId", "name", "version")]  # avoid duplicate templates names per user
-        indexes = [models.Index(fields=["ownerId", "name", "version"])]
+        indexes = [
+            models.Index(fields=["ownerId", "name", "version"]),
+            # version listing by name: same-named templates of a subject, windowed by version
+            models.Index(fields=["name", "subject", "version"]),
+        ]
 
     def __str__(self):
         return self.name + " for subject " + self.subject.name
 
+    @classmethod
+    def touch(cls, template_ids):
+        """
+        Bumps updatedAt on the given templates without loading them
+        """
+        return cls.objects.filter(pk__in=template_ids).update(updatedAt=timezone.now())
+
+
+# Templates shown in the community listing; the listing filters on exactly this
+COMMUNITY_LISTED = models.Q(isPublishable=True, isTemplate=True)
+
+
+class TemplateSummary(models.Model):
+    """
+    Denormalised read model of a template joined with its subject and owner, used by the
+    "my templates" views. Rows are maintained by summaries.py (through signals.py), not by views.
+    """
+    templateId = models.OneToOneField(Template, on_delete=models.CASCADE, primary_key=True, related_name="summary")
+    ownerId = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    ownerUsername = models.CharField(max_length=150)
+    ownerName = models.CharField(max_length=301, blank=True)
+    name = models.CharField(max_length=120)
+    version = models.PositiveSmallIntegerField(default=0)
+    subjectId = models.ForeignKey(Subject, on_delete=models.CASCADE, blank=True, null=True, related_name="+")
+    subjectCode = models.CharField(max_length=10, blank=True, null=True)
+    subjectName = models.CharField(max_length=100, blank=True, null=True)
+    year = models.PositiveSmallIntegerField(blank=True, null=True)
+    semester = models.PositiveSmallIntegerField(blank=True, null=True)
+    isPublishable = models.BooleanField(default=True)
+    isTemplate = models.BooleanField(default=True)
+    # subjectCode/year/semester with "" and 0 for templates without a subject, so every row
+    # compares; the community listing sorts and pages on these (views.COMMUNITY_ORDERINGS)
+    sortCode = models.CharField(max_length=10, default="", blank=True)
+    sortYear = models.PositiveSmallIntegerField(default=0)
+    sortSemester = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ownerUsername", "name", "version"]),
+            models.Index(fields=["ownerUsername", "subjectCode", "year", "semester"]),
+            # community listing: listed templates in each of its orders (partial, over the listing's filter)
+            models.Index(
+                fields=["-sortYear", "-sortSemester", "name", "-version", "-templateId"],
+                condition=COMMUNITY_LISTED, name="summary_community_recent",
+            ),
+            models.Index(
+                fields=["name", "-version", "-templateId"],
+                condition=COMMUNITY_LISTED, name="summary_community_name",
+            ),
+            models.Index(
+                fields=["sortCode", "-sortYear", "-sortSemester", "name", "-version", "-templateId"],
+                condition=COMMUNITY_LISTED, name="summary_community_subject",
+            ),
+            models.Index(
+                fields=["sortYear", "sortSemester", "name", "version", "templateId"],
+                condition=COMMUNITY_LISTED, name="summary_community_oldest",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Summary of {self.name} v{self.version} ({self.ownerUsername})"
+
 
 class TemplateOwnership(models.Model):
     templateId = models.ForeignKey(Template, on_delete=models.CASCADE)
@@ -89,23 +162,181 @@ class AIUseScale(models.Model):
 
 
 
+# Text fields of a template item; their values live in ItemContent, shared between items
+ITEM_TEXT_FIELDS = ("task", "instructionsToStudents", "examples", "aiGeneratedContent")
+
+
+class ItemContent(models.Model):
+    """
+    The text of a template item, stored once per distinct content and shared by every item
+    with that text (so new versions and duplicates add no text rows for unchanged items).
+    Keyed by a SHA-256 of the text fields. Rows are written through TemplateItem and deleted
+    by collect_garbage() once no item references them.
+    """
+    hash = models.CharField(max_length=64, primary_key=True)
+    task = models.TextField()
+    instructionsToStudents = models.TextField(blank=True, null=True)
+    examples = models.TextField(blank=True, null=True)
+    aiGeneratedContent = models.TextField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Content {self.hash[:12]}: {self.task[:40]}"
+
+    @staticmethod
+    def hash_of(texts: dict) -> str:
+        payload = json.dumps([texts.get(f) for f in ITEM_TEXT_FIELDS], ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def store(cls, texts_list) -> list:
+        """
+        Returns an ItemContent for each {field: text} dict, in order, inserting only the
+        contents not stored yet: one SELECT plus at most one INSERT however many are given.
+        """
+        wanted = {}
+        contents = []
+        for texts in texts_list:
+            # checked here because the INSERT below ignores conflicts, which on SQLite includes NOT NULL
+            if texts.get("task") is None:
+                raise IntegrityError("NOT NULL constraint failed: ai_scale_app_itemcontent.task")
+            content = cls(**{f: texts.get(f) for f in ITEM_TEXT_FIELDS})
+            content.hash = cls.hash_of(texts)
+            contents.append(wanted.setdefault(content.hash, content))
+        if wanted:
+            stored = cls.objects.filter(pk__in=wanted).values_list("pk", flat=True)
+            if connection.vendor == "postgresql":
+                # lock the reused rows until the caller commits, so collect_garbage() (which skips
+                # locked rows) cannot delete one before the item pointing at it is saved. KEY SHARE,
+                # unlike select_for_update(), does not block other writers reusing the same text.
+                # On SQLite the caller's write transaction already keeps collect_garbage() out.
+                sql, params = stored.query.sql_with_params()
+                with connection.cursor() as cursor:
+                    cursor.execute(f"{sql} FOR KEY SHARE", params)
+                    stored = [row[0] for row in cursor.fetchall()]
+            stored = set(stored)
+            new = [c for h, c in wanted.items() if h not in stored]
+            if new:
+                cls.objects.bulk_create(new, ignore_conflicts=True)
+        return contents
+
+    @classmethod
+    def collect_garbage(cls) -> int:
+        """
+        Deletes every content no item references. Returns the number deleted.
+        Run by `manage.py collect_item_content`: items never delete their old content themselves,
+        as a concurrent save may be reusing it between the check and the delete.
+        """
+        unreferenced = ~Exists(TemplateItem.objects.filter(content=OuterRef("pk")))
+        with transaction.atomic():
+            orphans = cls.objects.filter(unreferenced)
+            if connection.features.has_select_for_update_skip_locked:
+                # rows a save is reusing right now are locked by store(): leave them for the next run,
+                # and check the locked ones again in case an item using one committed in between
+                locked = list(orphans.select_for_update(skip_locked=True).values_list("pk", flat=True))
+                orphans = cls.objects.filter(unreferenced, pk__in=locked)
+            deleted, _ = orphans.delete()
+        return deleted
+
+
+def _item_text(field):
+    """
+    Property standing in for one of the item's text fields: reads the shared ItemContent,
+    and writes are held on the item until save()/bulk_create()/bulk_update() stores them.
+    """
+    def get(self):
+        pending = self.__dict__.get("_texts")
+        if pending is not None and field in pending:
+            return pending[field]
+        if self.content_id is None:
+            return "" if field == "task" else None
+        return getattr(self.content, field)
+
+    def set(self, value):
+        self.__dict__.setdefault("_texts", {})[field] = value
+
+    return property(get, set)
+
+
+class TemplateItemQuerySet(models.QuerySet):
+    """
+    Stores item text in ItemContent on the bulk paths too, so callers can keep passing
+    task=..., examples=... and listing text fields in bulk_update()
+    """
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        # contents and items in one transaction (see ItemContent.store)
+        with transaction.atomic(using=self.db, savepoint=False):
+            self.model.attach_contents(objs)
+            return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            if any(f in ITEM_TEXT_FIELDS for f in fields):
+                self.model.attach_contents(objs)
+                fields = [f for f in fields if f not in ITEM_TEXT_FIELDS] + ["content"]
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def delete_without_signals(self) -> int:
+        """
+        Deletes the selected items with one DELETE, built around this queryset's own SELECT, instead
+        of through the deletion collector. Items have no dependents, so the collector would only load
+        every row to send pre/post_delete for it; callers refresh what those receivers would
+        (Template.touch, search.index_templates) once for the whole set. Returns the number deleted.
+        """
+        conn = connections[self.db]
+        ids_sql, params = self.order_by().values("pk").query.sql_with_params()
+        table = conn.ops.quote_name(self.model._meta.db_table)
+        pk = conn.ops.quote_name(self.model._meta.pk.column)
+        with conn.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({ids_sql})", params)
+            return cursor.rowcount
+
+
 class TemplateItem(models.Model):
     templateId = models.ForeignKey(Template, on_delete=models.CASCADE)
-    task = models.TextField()
+    # task, instructionsToStudents, examples and aiGeneratedContent (properties below)
+    content = models.ForeignKey(ItemContent, on_delete=models.PROTECT, related_name="+")
     aiUseScaleLevel = models.ForeignKey(
         AIUseScale, on_delete=models.SET_NULL, blank=True, null=True
     )
-    instructionsToStudents = models.TextField(blank=True, null=True)
-    examples = models.TextField(blank=True, null=True)
-    aiGeneratedContent = models.TextField(blank=True, null=True)
     useAcknowledgement = models.BooleanField(default=False)
 
+    task = _item_text("task")
+    instructionsToStudents = _item_text("instructionsToStudents")
+    examples = _item_text("examples")
+    aiGeneratedContent = _item_text("aiGeneratedContent")
+
+    objects = TemplateItemQuerySet.as_manager()
+
     class Meta:
         indexes = [models.Index(fields=["templateId"])]
 
     def __str__(self):
         return f"Item {self.id} in {self.templateId}"
 
+    @classmethod
+    def attach_contents(cls, items) -> None:
+        """
+        Points each item with unsaved text at the ItemContent for that text (stored if new).
+        The content an item referenced before is left to ItemContent.collect_garbage().
+        """
+        pending = [i for i in items if "_texts" in i.__dict__ or i.content_id is None]
+        if not pending:
+            return
+        contents = ItemContent.store({f: getattr(i, f) for f in ITEM_TEXT_FIELDS} for i in pending)
+        for item, content in zip(pending, contents):
+            item.__dict__.pop("_texts", None)
+            item.content = content
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and any(f in ITEM_TEXT_FIELDS for f in update_fields):
+            kwargs["update_fields"] = [f for f in update_fields if f not in ITEM_TEXT_FIELDS] + ["content"]
+        # contents and item in one transaction (see ItemContent.store)
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            type(self).attach_contents([self])
+            super().save(*args, **kwargs)
 
 
 class AcknowledgementForm(models.Model):
@@ -151,7 +382,31 @@ class AuditLog(models.Model):
     model_name = models.CharField(max_length=100)
     object_id = models.PositiveIntegerField()
     details = models.JSONField(blank=True, null=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # set when the entry is recorded, which may be a little before audit.py writes it
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # (filter, timestamp, id) indexes serve the activity feed newest-first for each filter;
+        # (model_name, object_id) serves the history of one object
+        indexes = [
+            models.Index(fields=["timestamp", "id"]),
+            models.Index(fields=["user", "timestamp", "id"]),
+            models.Index(fields=["model_name", "timestamp", "id"]),
+            models.Index(fields=["action", "timestamp", "id"]),
+            models.Index(fields=["model_name", "object_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.action} {self.model_name}({self.object_id})"
+
+class SystemCounter(models.Model):
+    """
+    Running row counts behind the system overview dashboard, one row per counter.
+    Adjusted by the receivers in signals.py and recounted from the source tables by counters.reconcile().
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    reconciledAt = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
-        return f"{self.user} {self.action} {self.model_name}({self.object_id})"
\ No newline at end of file
+        return f"{self.name} = {self.value}"
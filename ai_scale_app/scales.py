@@ -0,0 +1,97 @@
+"""
+Process-local catalogue of AI use scale levels (name <-> id).
+
+The catalogue is a handful of rows that almost never change, but every template item
+save needs to turn a level name into an AIUseScale id. Rather than a get_or_create per
+item, names are resolved against an in-memory copy loaded on first use. Names that are
+not in memory trigger one reload (another worker may have created them) and are only
+then created.
+
+Only reads made outside a transaction are kept in memory: rows seen inside one may still
+be rolled back. Lookups inside a transaction use the in-memory copy when it has every
+name and otherwise query just the names they need.
+
+The receivers in signals.py call invalidate() whenever a scale is saved or deleted in
+this process (update_ai_use_scale, the admin). Other worker processes do not see those
+signals, so their copy is also reloaded once it is CATALOGUE_TTL seconds old; that is
+the longest a rename made elsewhere can go unnoticed.
+"""
+import threading
+import time
+
+from django.db import connection
+
+from .models import AIUseScale
+
+CATALOGUE_TTL = 10 * 60
+
+_lock = threading.RLock()
+_ids_by_name = {}
+_loaded_at = None
+
+
+def _can_keep() -> bool:
+    return not connection.in_atomic_block
+
+
+def _fresh_locked() -> bool:
+    return _loaded_at is not None and time.monotonic() - _loaded_at < CATALOGUE_TTL
+
+
+def _load_locked() -> None:
+    global _ids_by_name, _loaded_at
+    _ids_by_name = dict(AIUseScale.objects.values_list("name", "id"))
+    _loaded_at = time.monotonic()
+
+
+def invalidate() -> None:
+    """
+    Drops the in-memory catalogue; the next lookup reloads it
+    """
+    global _loaded_at
+    with _lock:
+        _loaded_at = None
+
+
+def catalogue() -> list:
+    """
+    All scale levels as [{"id", "name"}], ordered by id
+    """
+    with _lock:
+        if _fresh_locked():
+            ids_by_name = _ids_by_name
+        elif _can_keep():
+            _load_locked()
+            ids_by_name = _ids_by_name
+        else:
+            ids_by_name = dict(AIUseScale.objects.values_list("name", "id"))
+    return sorted(({"id": pk, "name": name} for name, pk in ids_by_name.items()), key=lambda s: s["id"])
+
+
+def resolve(names) -> dict:
+    """
+    Maps each name to an AIUseScale, creating the missing ones. Served from memory when every
+    name is already known; otherwise reloads once and creates whatever is still missing.
+    The returned instances only carry id and name.
+    """
+    names = set(names)
+    if not names:
+        return {}
+    with _lock:
+        keep = _can_keep()
+        if _fresh_locked() and names <= _ids_by_name.keys():
+            known = _ids_by_name
+        elif keep:
+            _load_locked()
+            known = _ids_by_name
+        else:
+            known = dict(AIUseScale.objects.filter(name__in=names).values_list("name", "id"))
+
+        missing = names - known.keys()
+        if missing:
+            AIUseScale.objects.bulk_create([AIUseScale(name=n) for n in missing], ignore_conflicts=True)
+            created = dict(AIUseScale.objects.filter(name__in=missing).values_list("name", "id"))
+            if keep:
+                _ids_by_name.update(created)
+            known = {**known, **created}
+        return {n: AIUseScale(id=known[n], name=n) for n in names}
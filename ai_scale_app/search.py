@@ -0,0 +1,256 @@
+"""
+Full-text search over community templates.
+
+The searchable text of each template (name, description, scope, subject code, owner names
+and item task/instruction text) is kept in a shadow table keyed by template id:
+
+  * on SQLite, an FTS5 table whose rowid is the template id (migration 0003), matched
+    word by word as prefixes and ranked with bm25;
+  * on PostgreSQL, a plain table with a pg_trgm GIN index over the whole document
+    (migration 0011), matched word by word as substrings and ranked by weighted
+    word_similarity. Rows are upserted (INSERT ... ON CONFLICT) and go away with their
+    template through the foreign key.
+
+Either table is kept in sync by the receivers in signals.py; `python manage.py
+rebuild_search_index` rebuilds it from scratch.
+
+Callers should go through search_filter()/ranked_template_ids(), which return None when
+the index is unavailable (other database backends, SQLite built without FTS5, PostgreSQL
+without pg_trgm) so the caller can fall back to plain icontains filtering.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import ItemContent, Subject, Template, TemplateItem, User
+
+SEARCH_TABLE = "ai_scale_app_template_search"
+
+# bm25 column weights, in the column order of the FTS table below
+SEARCH_COLUMNS = (
+    ("name", 10.0),
+    ("description", 2.0),
+    ("scope", 2.0),
+    ("subject_code", 5.0),
+    ("owner", 3.0),
+    ("items", 1.0),
+)
+
+CREATE_SEARCH_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    + ", ".join(col for col, _ in SEARCH_COLUMNS)
+    + ", tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+# PostgreSQL: the same columns in a regular table, plus the generated document the trigram index covers
+CREATE_TRIGRAM_SQL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    f"template_id bigint PRIMARY KEY REFERENCES {Template._meta.db_table} (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    + ", ".join(f"{col} text NOT NULL" for col, _ in SEARCH_COLUMNS)
+    + ", document text GENERATED ALWAYS AS ("
+    + " || ' ' || ".join(col for col, _ in SEARCH_COLUMNS)
+    + ") STORED)",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_trgm ON {SEARCH_TABLE} USING gin (document gin_trgm_ops)",
+)
+
+# The backends search.py keeps an index for, and the column holding the template id there
+KEY_COLUMNS = {"sqlite": "rowid", "postgresql": "template_id"}
+
+# database name -> whether the search table exists there (checked once per process and database)
+_available = {}
+
+
+def is_available() -> bool:
+    """
+    True when the search table (FTS5 or trigram) exists on the default database
+    """
+    name = str(connection.settings_dict["NAME"])
+    if name not in _available:
+        _available[name] = (
+            connection.vendor in KEY_COLUMNS
+            and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _available[name]
+
+
+def _key() -> str:
+    return KEY_COLUMNS[connection.vendor]
+
+
+def _document_select_sql(where: str = "") -> str:
+    """
+    SELECT producing one (template id, *SEARCH_COLUMNS) row per template, straight from the model tables
+    """
+    template = Template._meta.db_table
+    subject = Subject._meta.db_table
+    user = User._meta.db_table
+    item = TemplateItem._meta.db_table
+    content = ItemContent._meta.db_table
+    items = "c.task || ' ' || COALESCE(c.\"instructionsToStudents\", '')"
+    items = f"string_agg({items}, ' ')" if connection.vendor == "postgresql" else f"group_concat({items}, ' ')"
+    return f"""
+        SELECT t.id,
+               t.name,
+               COALESCE(t.description, ''),
+               COALESCE(t.scope, ''),
+               COALESCE(s."subjectCode", ''),
+               u.username || ' ' || u.first_name || ' ' || u.last_name,
+               COALESCE((
+                   SELECT {items}
+                   FROM {item} i
+                   JOIN {content} c ON c.hash = i.content_id
+                   WHERE i."templateId_id" = t.id
+               ), '')
+        FROM {template} t
+        JOIN {user} u ON u.id = t."ownerId_id"
+        LEFT JOIN {subject} s ON s.id = t.subject_id
+        {where}
+    """
+
+
+def _insert_sql(where: str = "") -> str:
+    columns = ", ".join(col for col, _ in SEARCH_COLUMNS)
+    sql = f"INSERT INTO {SEARCH_TABLE} ({_key()}, {columns}) {_document_select_sql(where)}"
+    if connection.vendor == "postgresql":
+        updates = ", ".join(f"{col} = EXCLUDED.{col}" for col, _ in SEARCH_COLUMNS)
+        sql += f" ON CONFLICT (template_id) DO UPDATE SET {updates}"
+    return sql
+
+
+def index_templates(template_ids) -> None:
+    """
+    (Re)indexes the given templates. Ids that no longer exist are simply dropped from the index.
+    """
+    ids = [int(pk) for pk in template_ids]
+    if not ids or not is_available():
+        return
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            # FTS5 tables have no upsert; on PostgreSQL the insert below updates in place
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", ids)
+        cursor.execute(_insert_sql(f"WHERE t.id IN ({placeholders})"), ids)
+
+
+def remove_templates(template_ids) -> None:
+    ids = [int(pk) for pk in template_ids]
+    if not ids or not is_available():
+        return
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {_key()} IN ({placeholders})", ids)
+
+
+def _trigram_installable(cursor) -> bool:
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    return cursor.fetchone() is not None
+
+
+def rebuild_index() -> int:
+    """
+    Drops every indexed document and reindexes all templates, in one transaction so searches
+    keep matching the old documents until the new ones are in. Returns the number indexed,
+    or None when there is no index to build (neither SQLite nor PostgreSQL, or PostgreSQL
+    without the pg_trgm contrib module).
+    """
+    if connection.vendor not in KEY_COLUMNS:
+        return None
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql" and not _trigram_installable(cursor):
+            return None
+        if connection.vendor == "sqlite":
+            cursor.execute(CREATE_SEARCH_TABLE_SQL)
+        else:
+            for sql in CREATE_TRIGRAM_SQL:
+                cursor.execute(sql)
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(_insert_sql())
+        if connection.vendor == "sqlite":
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        count = cursor.fetchone()[0]
+    _available[str(connection.settings_dict["NAME"])] = True
+    return count
+
+
+def search_words(q: str) -> list:
+    return re.findall(r"\w+", q or "")
+
+
+def match_expression(q: str):
+    """
+    Turns free text into an FTS5 query: every word must match, each as a prefix
+    (so "comp ess" finds "COMP30020 Essay"). Returns None when q has no searchable words.
+    """
+    words = search_words(q)
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def _match_sql(q: str):
+    """
+    (WHERE condition, params) matching q against the index on this backend, or None when q has no searchable words
+    """
+    if connection.vendor == "sqlite":
+        expr = match_expression(q)
+        return None if expr is None else (f"{SEARCH_TABLE} MATCH %s", [expr])
+    words = search_words(q)
+    if not words:
+        return None
+    # every word as a substring of the document; the trigram index serves ILIKE '%...%'
+    patterns = ["%" + w.replace("_", "\\_") + "%" for w in words]
+    return " AND ".join(["document ILIKE %s"] * len(words)), patterns
+
+
+def search_filter(q: str):
+    """
+    Q object restricting a Template (or TemplateSummary, keyed by template) queryset to full-text
+    matches of q, or None if the index is unavailable
+    """
+    if not is_available():
+        return None
+    match = _match_sql(q)
+    if match is None:
+        return None
+    where, params = match
+    return Q(pk__in=RawSQL(f"SELECT {_key()} FROM {SEARCH_TABLE} WHERE {where}", params))
+
+
+def ranked_template_ids(q: str, queryset, limit: int, offset: int = 0):
+    """
+    (ids, count): the ids of templates in `queryset` matching q, best match first (BM25 on
+    SQLite, weighted trigram word similarity on PostgreSQL), sliced to [offset, offset + limit),
+    and how many match in all. The queryset's filters are applied inside the ranked query, so
+    the ranking and the count cover exactly the rows the caller may show. None if the index is
+    unavailable.
+    """
+    if not is_available():
+        return None
+    match = _match_sql(q)
+    if match is None:
+        return None
+    where, params = match
+    allowed_sql, allowed_params = queryset.order_by().values("pk").query.sql_with_params()
+    where = f"{where} AND {_key()} IN ({allowed_sql})"
+    params = [*params, *allowed_params]
+    if connection.vendor == "sqlite":
+        weights = ", ".join(str(w) for _, w in SEARCH_COLUMNS)
+        rank = f"bm25({SEARCH_TABLE}, {weights})"
+        rank_params = []
+    else:
+        rank = " + ".join(f"{w} * word_similarity(%s, {col})" for col, w in SEARCH_COLUMNS) + " DESC"
+        rank_params = [" ".join(search_words(q))] * len(SEARCH_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {where}", params)
+        count = cursor.fetchone()[0]
+        if count <= offset:
+            return [], count
+        cursor.execute(
+            f"SELECT {_key()} FROM {SEARCH_TABLE} WHERE {where} ORDER BY {rank} LIMIT %s OFFSET %s",
+            [*params, *rank_params, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()], count
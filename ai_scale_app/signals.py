@@ -0,0 +1,240 @@
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import audit, caches, counters, metrics, scales, search, summaries
+from .models import User, Subject, Template, TemplateItem, AIUseScale
+
+# User fields copied into search documents, widget rows and summaries
+_DISPLAYED_USER_FIELDS = {"username", "first_name", "last_name"}
+
+# post_save receivers below return early for raw saves (loaddata): fixtures are loaded as-is, and
+# the read models they would update are rebuilt afterwards with `manage.py rebuild_read_models`.
+
+
+def _owner_display_changed(created, update_fields) -> bool:
+    """
+    Whether a User save may have changed how the user is displayed next to their templates.
+    New users own nothing yet and saves limited to other fields (e.g. last_login on login) are skipped.
+    """
+    if created:
+        return False
+    return update_fields is None or bool(_DISPLAYED_USER_FIELDS & set(update_fields))
+
+
+def _template_deleted_too(origin) -> bool:
+    """
+    Whether a TemplateItem post_delete is part of deleting its template (directly, or with the
+    template's subject or owner). Items only cascade from their template, so any origin other
+    than an item is such a delete, and the template's own receivers cover it once.
+    """
+    if origin is None:  # post_save
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not TemplateItem
+
+
+# ---- TEMPLATE FRESHNESS ---- #
+# Template.updatedAt backs the ETags on the template details/versions endpoints,
+# so anything that changes what those endpoints return has to bump it.
+# Bulk operations (bulk_create, queryset.update) skip these receivers and must call Template.touch themselves.
+
+@receiver([post_save, post_delete], sender=TemplateItem)
+def touch_template_on_item_change(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or _template_deleted_too(origin):
+        return
+    Template.touch([instance.templateId_id])
+
+
+@receiver(post_save, sender=Subject)
+def touch_templates_on_subject_change(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        Template.objects.filter(subject=instance).update(updatedAt=timezone.now())
+
+
+@receiver(post_save, sender=AIUseScale)
+def touch_templates_on_scale_rename(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        Template.touch(
+            TemplateItem.objects.filter(aiUseScaleLevel=instance).values("templateId")
+        )
+
+
+@receiver(pre_delete, sender=AIUseScale)
+def touch_templates_on_scale_delete(sender, instance, **kwargs):
+    # before the delete: SET_NULL then clears the items' level with an UPDATE that sends no signals
+    Template.touch(
+        TemplateItem.objects.filter(aiUseScaleLevel=instance).values("templateId")
+    )
+
+
+# ---- SEARCH INDEX ---- #
+# Keeps the full-text index (search.py) in step with every row that feeds a template's document.
+
+@receiver(post_save, sender=Template)
+def index_template(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_templates([instance.pk])
+
+
+@receiver(post_delete, sender=Template)
+def unindex_template(sender, instance, **kwargs):
+    search.remove_templates([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=TemplateItem)
+def reindex_template_on_item_change(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or _template_deleted_too(origin):
+        return
+    search.index_templates([instance.templateId_id])
+
+
+@receiver(post_save, sender=Subject)
+def reindex_templates_on_subject_change(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        search.index_templates(Template.objects.filter(subject=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=User)
+def reindex_templates_on_owner_change(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or not _owner_display_changed(created, update_fields):
+        return
+    search.index_templates(Template.objects.filter(ownerId=instance).values_list("pk", flat=True))
+
+
+# ---- CACHED RESPONSES ---- #
+
+@receiver([post_save, post_delete], sender=Template)
+def invalidate_community_widget_on_template_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # covers publish/unpublish, edits and deletes
+    caches.invalidate_community_widget()
+
+
+@receiver(post_save, sender=Subject)
+def invalidate_community_widget_on_subject_change(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        caches.invalidate_community_widget()
+
+
+@receiver(post_save, sender=User)
+def invalidate_community_widget_on_owner_change(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or not _owner_display_changed(created, update_fields):
+        return
+    caches.invalidate_community_widget()
+
+
+# ---- TEMPLATE SUMMARY READ MODEL ---- #
+# Summary rows are deleted with their template (on_delete=CASCADE), so only saves need handling here.
+
+@receiver(post_save, sender=Template)
+def refresh_template_summary(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    summaries.refresh_template_summaries([instance.pk])
+
+
+@receiver(post_save, sender=Subject)
+def refresh_summaries_on_subject_change(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        summaries.refresh_subject(instance)
+
+
+@receiver(post_save, sender=User)
+def refresh_summaries_on_owner_change(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or not _owner_display_changed(created, update_fields):
+        return
+    summaries.refresh_owner(instance)
+
+
+# ---- AI USE SCALE CATALOGUE ---- #
+# Drops this process's in-memory catalogue (scales.py) when a level is added, renamed or removed,
+# and again on commit so a lookup made mid-transaction cannot keep uncommitted rows.
+
+@receiver([post_save, post_delete], sender=AIUseScale)
+def invalidate_scale_catalogue(sender, instance, **kwargs):
+    scales.invalidate()
+    transaction.on_commit(scales.invalidate)
+
+
+# ---- DASHBOARD COUNTERS ---- #
+# Keeps the SystemCounter rows read by system_overview in step (see counters.py for the staleness bound).
+
+@receiver(post_save, sender=Template)
+def count_template_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.adjust(counters.TEMPLATES, 1)
+
+
+@receiver(post_delete, sender=Template)
+def count_template_deleted(sender, instance, **kwargs):
+    counters.adjust(counters.TEMPLATES, -1)
+
+
+@receiver(post_save, sender=Subject)
+def count_subject_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.adjust(counters.SUBJECTS, 1)
+
+
+@receiver(post_delete, sender=Subject)
+def count_subject_deleted(sender, instance, **kwargs):
+    counters.adjust(counters.SUBJECTS, -1)
+
+
+def _is_active_coordinator(user) -> bool:
+    return user.role == User.Role.COORDINATOR and user.is_active
+
+
+@receiver(post_save, sender=User)
+def count_user_created(sender, instance, created, raw=False, **kwargs):
+    # other saves are skipped: a role or activation change shows up at the next reconciliation
+    if not created or raw:
+        return
+    counters.adjust(counters.USERS, 1)
+    if _is_active_coordinator(instance):
+        counters.adjust(counters.ACTIVE_COORDINATORS, 1)
+
+
+@receiver(post_delete, sender=User)
+def count_user_deleted(sender, instance, **kwargs):
+    counters.adjust(counters.USERS, -1)
+    if _is_active_coordinator(instance):
+        counters.adjust(counters.ACTIVE_COORDINATORS, -1)
+
+
+# ---- AUDIT LOG ---- #
+# Writes the buffered audit entries (audit.py) once the response has gone out, when a trigger has fired.
+
+@receiver(request_finished)
+def flush_audit_log(sender, **kwargs):
+    if audit.flush_due():
+        audit.flush()
+
+
+# ---- SQLITE CONNECTION PROFILE ---- #
+# Applies settings.SQLITE_PRAGMAS to each new SQLite connection (journal mode, sync level, busy timeout, caches).
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            if value not in (None, ""):
+                cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+# ---- REQUEST METRICS ---- #
+# Counts and times each SQL statement for the request being served (ai_scale_app/metrics.py).
+
+@receiver(connection_created)
+def install_sql_metrics(sender, connection, **kwargs):
+    metrics.install(connection)
@@ -0,0 +1,453 @@
+"""
+Consistent, compressed snapshots of the SQLite database in object storage.
+
+A snapshot is taken with the SQLite online backup API, which copies a consistent state of the
+live database (including commits still sitting in the -wal file) without blocking writers.
+It is gzip-compressed and hashed in one streaming pass, and stored under two keys:
+
+    <key>.<sha256>.gz      the compressed database, named after the hash of its content
+    <key>.manifest.json    {"sha256", "size", "compressedSize", "key", "createdAt"}
+
+Snapshot objects are never overwritten, and the manifest names the one it describes ("key").
+It is written after that object, so a reader that finds a manifest always finds its snapshot,
+even while a newer one is being uploaded. The snapshot before the current one is kept too, for
+readers that fetched the previous manifest; older ones are deleted. sha256 is the hash of the
+uncompressed database; a snapshot whose hash matches the last one uploaded is not uploaded again.
+
+Snapshotter turns a stream of change notifications (scripts/watch_db.py feeds it file
+system events) into uploads. Notifications are coalesced: a snapshot is taken once no
+change has been seen for `debounce` seconds, or `max_delay` seconds after the first pending
+change if changes keep coming. Snapshots and uploads run on a background thread, and failed
+uploads are retried with exponential backoff.
+
+restore() is the way back (scripts/restore_db.py at boot): it compares the stored manifest
+with the local database and only downloads when they differ. The snapshot is decompressed
+and hashed as it streams in, checked against the manifest and then swapped into place.
+A copy of the manifest kept next to the local file (<db>.manifest.json), together with the
+file's size and mtime, lets a later boot recognise an untouched local copy without hashing it.
+It also marks the local database as descended from the stored snapshot (is_restored_copy), the
+only case in which scripts/watch_db.py uploads at startup, before any write: a database that
+failed to restore, or was never restored, must not replace a good snapshot.
+
+Backends: S3Backend (boto3, imported only when used) and LocalDirBackend, a directory
+standing in for a bucket in tests and local runs. Other data kept next to the snapshots (the
+audit archive, see archive.py) uses them too, under its own prefix. This module does not
+need Django.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY = "db.sqlite3"
+DEFAULT_DEBOUNCE = 5.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 2.0
+CHUNK_SIZE = 1024 * 1024
+# snapshot objects kept in the backend: the current one and the one before it
+KEEP_SNAPSHOTS = 2
+
+
+def snapshot_key(key: str, sha256: str) -> str:
+    return f"{key}.{sha256}.gz"
+
+
+def manifest_key(key: str) -> str:
+    return f"{key}.manifest.json"
+
+
+class LocalDirBackend:
+    """
+    Keeps objects as files under a directory. Writes go through a temporary file that is
+    fsynced and then renamed, so readers never see a partial object, even after a crash.
+    """
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def _replace(self, key: str, write) -> None:
+        dest = self._path(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part = dest.with_name(dest.name + ".part")
+        write(part)
+        with open(part, "rb") as fh:
+            os.fsync(fh.fileno())
+        os.replace(part, dest)
+
+    def upload_file(self, path, key: str) -> None:
+        self._replace(key, lambda part: shutil.copyfile(path, part))
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self._replace(key, lambda part: part.write_bytes(data))
+
+    def get_bytes(self, key: str):
+        """
+        The object's content, or None when there is no such object
+        """
+        path = self._path(key)
+        return path.read_bytes() if path.exists() else None
+
+    def open(self, key: str):
+        """
+        Readable binary stream of the object; FileNotFoundError when there is no such object
+        """
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def list(self, prefix: str) -> list:
+        """
+        Keys of the objects whose key starts with prefix
+        """
+        folder = self._path(prefix.rpartition("/")[0])
+        if not folder.is_dir():
+            return []
+        keys = (p.relative_to(self.root).as_posix() for p in folder.rglob("*") if p.is_file())
+        return [k for k in keys if k.startswith(prefix) and not k.endswith(".part")]
+
+
+class S3Backend:
+    """
+    Objects in an S3 bucket, optionally under a key prefix (e.g. "audit_archive/")
+    """
+    def __init__(self, bucket: str, client=None, prefix: str = ""):
+        if client is None:
+            import boto3
+            client = boto3.client("s3")
+        self.bucket = bucket
+        self.client = client
+        self.prefix = prefix
+
+    def upload_file(self, path, key: str) -> None:
+        self.client.upload_file(str(path), self.bucket, self.prefix + key)
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def get_bytes(self, key: str):
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def open(self, key: str):
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"]
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def list(self, prefix: str) -> list:
+        keys = []
+        pages = self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=self.prefix + prefix)
+        for page in pages:
+            keys += [obj["Key"][len(self.prefix):] for obj in page.get("Contents", [])]
+        return keys
+
+
+def backend_from_env(folder: str = ""):
+    """
+    LocalDirBackend when SNAPSHOT_DIR is set, otherwise S3Backend for S3_BUCKET_NAME, otherwise None.
+    folder puts the objects in a subdirectory (key prefix) of that storage.
+    """
+    if os.environ.get("SNAPSHOT_DIR"):
+        return LocalDirBackend(Path(os.environ["SNAPSHOT_DIR"]) / folder)
+    if os.environ.get("S3_BUCKET_NAME"):
+        return S3Backend(os.environ["S3_BUCKET_NAME"], prefix=f"{folder}/" if folder else "")
+    return None
+
+
+def backup(db_path, dest_path) -> None:
+    """
+    Copies a consistent state of a live database to dest_path with the online backup API
+    """
+    with closing(sqlite3.connect(db_path)) as src, closing(sqlite3.connect(dest_path)) as dest:
+        src.backup(dest)
+
+
+def compress(src_path, dest_path) -> dict:
+    """
+    gzips src_path to dest_path in chunks, hashing as it goes. Returns the manifest fields
+    describing it: sha256 and size of the uncompressed bytes, and compressedSize.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    # mtime=0 keeps the gzip header free of the time, so equal databases compress to equal bytes
+    with open(src_path, "rb") as src, gzip.GzipFile(dest_path, "wb", mtime=0) as dest:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+            dest.write(chunk)
+    return {"sha256": digest.hexdigest(), "size": size, "compressedSize": os.path.getsize(dest_path)}
+
+
+def read_manifest(backend, key: str = DEFAULT_KEY):
+    data = backend.get_bytes(manifest_key(key))
+    return json.loads(data) if data else None
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_manifest_path(db_path) -> Path:
+    return Path(f"{db_path}.manifest.json")
+
+
+def local_sha256(db_path):
+    """
+    sha256 of the local database, None when there is none. Taken from the local manifest when
+    the file still has the size and mtime recorded there, otherwise computed.
+    """
+    db_path = Path(db_path)
+    if not db_path.exists():
+        return None
+    stat = db_path.stat()
+    try:
+        local = json.loads(local_manifest_path(db_path).read_text())
+        if (local["size"], local["mtimeNs"]) == (stat.st_size, stat.st_mtime_ns):
+            return local["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return file_sha256(db_path)
+
+
+def is_restored_copy(db_path, backend, key: str = DEFAULT_KEY) -> bool:
+    """
+    Whether the local database was restored from, or checked current against, the snapshot the
+    backend holds now (changes made since, e.g. by migrations, do not matter)
+    """
+    manifest = read_manifest(backend, key)
+    if manifest is None:
+        return False
+    try:
+        local = json.loads(local_manifest_path(db_path).read_text())
+    except (OSError, ValueError):
+        return False
+    return local.get("sha256") == manifest["sha256"]
+
+
+def _write_local_manifest(db_path, sha256: str) -> None:
+    stat = Path(db_path).stat()
+    local_manifest_path(db_path).write_text(
+        json.dumps({"sha256": sha256, "size": stat.st_size, "mtimeNs": stat.st_mtime_ns})
+    )
+
+
+def _download(stream, dest, compressed: bool) -> dict:
+    """
+    Copies a backend stream to dest chunk by chunk, decompressing on the way when compressed.
+    Returns the sha256 and size of what was written.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with closing(stream), open(dest, "wb") as out:
+        src = gzip.GzipFile(fileobj=stream) if compressed else stream
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+            out.write(chunk)
+    return {"sha256": digest.hexdigest(), "size": size}
+
+
+def restore(db_path, backend, key: str = DEFAULT_KEY) -> dict:
+    """
+    Brings the local database up to the stored snapshot. Returns what happened:
+    {"status": "current" | "restored" | "missing", "seconds", and "size" when restored}.
+
+    "current": the local file already has the snapshot's content, nothing was downloaded.
+    "missing": the backend has no snapshot (the local file, if any, is left alone).
+    Raises ValueError when the downloaded snapshot does not match its manifest; the local
+    file is then left as it was.
+    """
+    started = time.monotonic()
+    db_path = Path(db_path)
+    manifest = read_manifest(backend, key)
+    if manifest is not None:
+        if local_sha256(db_path) == manifest["sha256"]:
+            _write_local_manifest(db_path, manifest["sha256"])
+            return {"status": "current", "seconds": time.monotonic() - started}
+        source, compressed = manifest["key"], True
+    else:
+        # a plain upload from before snapshots were compressed
+        source, compressed = key, False
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    part = db_path.with_name(db_path.name + ".part")
+    try:
+        try:
+            stream = backend.open(source)
+        except FileNotFoundError:
+            return {"status": "missing", "seconds": time.monotonic() - started}
+        written = _download(stream, part, compressed)
+        if manifest is not None and written["sha256"] != manifest["sha256"]:
+            raise ValueError(f"Snapshot {source} does not match its manifest")
+        os.replace(part, db_path)
+    finally:
+        part.unlink(missing_ok=True)
+    # a WAL left behind by the replaced file belongs to other content
+    for suffix in ("-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    _write_local_manifest(db_path, written["sha256"])
+    return {"status": "restored", "size": written["size"], "seconds": time.monotonic() - started}
+
+
+class Snapshotter:
+    def __init__(self, db_path, backend, key: str = DEFAULT_KEY, debounce: float = DEFAULT_DEBOUNCE,
+                 max_delay: float = DEFAULT_MAX_DELAY, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF):
+        self.db_path = str(db_path)
+        self.backend = backend
+        self.key = key
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.retries = retries
+        self.backoff = backoff
+        # sha256 of the last snapshot known to be in the backend
+        self.last_hash = None
+        # keys of the snapshot objects this snapshotter knows are stored, oldest first
+        self.stored_keys = []
+        self.uploads = 0
+        self._cond = threading.Condition()
+        # monotonic times of the first and latest change not snapshotted yet
+        self._first_change = None
+        self._last_change = None
+        self._stopping = False
+        self._thread = None
+
+    def notify(self) -> None:
+        """
+        Records that the database changed; cheap and safe to call from any thread
+        """
+        now = time.monotonic()
+        with self._cond:
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._cond.notify()
+
+    def pending(self) -> bool:
+        with self._cond:
+            return self._first_change is not None
+
+    def _due_in_locked(self):
+        """
+        Seconds until the pending changes are due for a snapshot (<= 0 means now), None when nothing is pending
+        """
+        if self._first_change is None:
+            return None
+        due = min(self._last_change + self.debounce, self._first_change + self.max_delay)
+        return due - time.monotonic()
+
+    def start(self) -> None:
+        """
+        Starts the background thread. Reads the backend's manifest first, so an unchanged
+        database is not uploaded again after a restart.
+        """
+        if self.last_hash is None:
+            manifest = read_manifest(self.backend, self.key)
+            if manifest is not None:
+                self.last_hash = manifest["sha256"]
+                self.stored_keys = [manifest["key"]]
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="db-snapshotter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Snapshots any pending changes right away, then stops the background thread
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    due_in = self._due_in_locked()
+                    if due_in is not None and due_in <= 0:
+                        break
+                    self._cond.wait(due_in)
+                pending = self._first_change is not None
+                self._first_change = self._last_change = None
+                stopping = self._stopping
+            if pending:
+                try:
+                    self.snapshot_once()
+                except Exception:
+                    logger.exception("Database snapshot failed")
+            if stopping:
+                return
+
+    def snapshot_once(self) -> bool:
+        """
+        Takes a snapshot and uploads it unless its content is what was last uploaded. Returns whether it uploaded.
+        """
+        started = time.monotonic()
+        with tempfile.TemporaryDirectory(prefix="db-snapshot-") as tmp:
+            raw = Path(tmp) / "snapshot.sqlite3"
+            packed = Path(tmp) / "snapshot.sqlite3.gz"
+            backup(self.db_path, raw)
+            manifest = compress(raw, packed)
+            if manifest["sha256"] == self.last_hash:
+                logger.info("Database unchanged since the last snapshot; not uploading")
+                return False
+            manifest["key"] = snapshot_key(self.key, manifest["sha256"])
+            manifest["createdAt"] = datetime.now(timezone.utc).isoformat()
+            self._with_retries(self.backend.upload_file, packed, manifest["key"])
+            self._with_retries(self.backend.put_bytes, manifest_key(self.key), json.dumps(manifest).encode("utf-8"))
+        self.last_hash = manifest["sha256"]
+        self.uploads += 1
+        self._prune(manifest["key"])
+        logger.info(
+            "Uploaded database snapshot (%d bytes, %d compressed) in %.2fs",
+            manifest["size"], manifest["compressedSize"], time.monotonic() - started,
+        )
+        return True
+
+    def _prune(self, current: str) -> None:
+        """
+        Deletes the snapshot objects older than the last KEEP_SNAPSHOTS uploaded
+        """
+        self.stored_keys = [k for k in self.stored_keys if k != current] + [current]
+        while len(self.stored_keys) > KEEP_SNAPSHOTS:
+            stale = self.stored_keys.pop(0)
+            try:
+                self.backend.delete(stale)
+            except Exception:
+                logger.warning("Could not delete old snapshot %s", stale, exc_info=True)
+
+    def _with_retries(self, fn, *args):
+        for attempt in range(1, self.retries + 1):
+            try:
+                return fn(*args)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning("Snapshot upload attempt %d failed; retrying in %.1fs", attempt, delay, exc_info=True)
+                time.sleep(delay)
@@ -0,0 +1,106 @@
+"""
+Maintenance of the TemplateSummary read model.
+
+Each TemplateSummary row copies the fields the "my templates" views and the community listing
+show (template name, version and flags, subject code/name/year/semester, owner username and
+full name), so those views read a single indexed table instead of joining Template, Subject and User.
+signals.py calls these functions whenever one of the source rows changes; code that writes
+templates in bulk (bulk_create, queryset.update) must call refresh_template_summaries itself.
+"""
+from django.db import transaction
+
+from .models import Template, TemplateSummary
+
+# Columns overwritten when a template's summary row already exists
+_SUMMARY_FIELDS = [
+    "ownerId", "ownerUsername", "ownerName", "name", "version",
+    "subjectId", "subjectCode", "subjectName", "year", "semester",
+    "isPublishable", "isTemplate", "sortCode", "sortYear", "sortSemester",
+]
+
+
+def full_name(user) -> str:
+    return f"{user.first_name} {user.last_name}".strip()
+
+
+def summary_for(t: Template) -> TemplateSummary:
+    """
+    Builds (without saving) the summary row for a template loaded with its subject and owner
+    """
+    subject = t.subject
+    owner = t.ownerId
+    return TemplateSummary(
+        templateId_id=t.pk,
+        ownerId_id=owner.pk,
+        ownerUsername=owner.username,
+        ownerName=full_name(owner),
+        name=t.name,
+        version=t.version,
+        subjectId_id=t.subject_id,
+        subjectCode=subject.subjectCode if subject else None,
+        subjectName=subject.name if subject else None,
+        year=subject.year if subject else None,
+        semester=subject.semester if subject else None,
+        isPublishable=bool(t.isPublishable),
+        isTemplate=bool(t.isTemplate),
+        sortCode=subject.subjectCode if subject else "",
+        sortYear=subject.year if subject else 0,
+        sortSemester=subject.semester if subject else 0,
+    )
+
+
+def refresh_template_summaries(template_ids, batch_size=500) -> None:
+    """
+    Upserts the summary rows of the given templates (one INSERT ... ON CONFLICT per batch)
+    """
+    templates = Template.objects.filter(pk__in=list(template_ids)).select_related("subject", "ownerId")
+    rows = [summary_for(t) for t in templates]
+    if rows:
+        TemplateSummary.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["templateId"],
+            update_fields=_SUMMARY_FIELDS,
+        )
+
+
+def refresh_subject(subject) -> None:
+    TemplateSummary.objects.filter(subjectId=subject).update(
+        subjectCode=subject.subjectCode,
+        subjectName=subject.name,
+        year=subject.year,
+        semester=subject.semester,
+        sortCode=subject.subjectCode,
+        sortYear=subject.year,
+        sortSemester=subject.semester,
+    )
+
+
+def refresh_owner(user) -> None:
+    TemplateSummary.objects.filter(ownerId=user).update(
+        ownerUsername=user.username,
+        ownerName=full_name(user),
+    )
+
+
+def rebuild_summaries(batch_size=500) -> int:
+    """
+    Recreates every summary row from the source tables. Returns the number of rows written.
+    One transaction: concurrent readers see the old rows until the new ones are all in, and a
+    concurrent save's refresh_template_summaries waits for the rebuild instead of colliding with it.
+    """
+    count = 0
+    batch = []
+    with transaction.atomic():
+        TemplateSummary.objects.all().delete()
+        for t in Template.objects.select_related("subject", "ownerId").order_by("pk").iterator(chunk_size=batch_size):
+            batch.append(summary_for(t))
+            if len(batch) >= batch_size:
+                TemplateSummary.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            TemplateSummary.objects.bulk_create(batch)
+            count += len(batch)
+    return count
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from ai_scale_app import audit
+from ai_scale_app.models import User, AuditLog
+
+# run this by python manage.py test ai_scale_app.tests.test_activity_feed
+
+
+class ActivityFeedTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create(username="alice")
+        self.ben = User.objects.create(username="ben")
+        start = timezone.now() - timedelta(days=1)
+        entries = []
+        for i in range(30):
+            entries.append(AuditLog(
+                user=self.alice if i % 2 else self.ben,
+                action=("CREATE", "UPDATE", "DELETE")[i % 3],
+                model_name="Template" if i % 5 else "Subject",
+                object_id=i % 4,
+                details={"n": i},
+            ))
+        AuditLog.objects.bulk_create(entries)
+        # spread timestamps out, with one tie, so ordering has to fall back to id
+        for i, log in enumerate(AuditLog.objects.order_by("id")):
+            AuditLog.objects.filter(pk=log.pk).update(timestamp=start + timedelta(minutes=min(i, 28)))
+
+    def _feed(self, **params):
+        response = self.client.get(reverse("recent-activity"), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def _walk(self, **params):
+        seen, cursor = [], None
+        while True:
+            page = self._feed(**params, **({"cursor": cursor} if cursor else {}))
+            seen += [row["details"]["n"] for row in page["results"]]
+            cursor = page["nextCursor"]
+            if not cursor:
+                return seen
+
+    def test_cursor_walk_is_newest_first_without_gaps(self):
+        first = self._feed(limit=7)
+        self.assertEqual([r["details"]["n"] for r in first["results"]], [29, 28, 27, 26, 25, 24, 23])
+        self.assertEqual(first["results"][0]["user"], "alice")
+        self.assertEqual(self._walk(limit=7), list(range(29, -1, -1)))
+
+    def test_filters(self):
+        self.assertEqual(self._walk(user="alice", limit=4), list(range(29, 0, -2)))
+        self.assertEqual(self._walk(model="Subject"), [25, 20, 15, 10, 5, 0])
+        self.assertEqual(self._walk(action="delete", limit=3), [29, 26, 23, 20, 17, 14, 11, 8, 5, 2])
+        self.assertEqual(self._walk(model="Template", objectId=3), [27, 23, 19, 11, 7, 3])
+        self.assertEqual(self._feed(user="nobody")["results"], [])
+
+    def test_edits_and_deletes_show_up(self):
+        AuditLog.objects.create(user=self.ben, action="DELETE", model_name="Template", object_id=99, details={"n": 99})
+        row = self._feed(limit=1)["results"][0]
+        self.assertEqual((row["user"], row["action"], row["model"], row["objectId"]), ("ben", "DELETE", "Template", 99))
+
+    def test_registrations_and_new_subjects_show_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("register"), {
+                "username": "carol", "password": "pw-12345", "first_name": "Carol", "last_name": "C", "role": "COORDINATOR",
+            }, content_type="application/json")
+            self.client.post(reverse("update_template"), {
+                "username": "carol", "name": "Essay", "subjectCode": "COMP1234", "year": 2025, "semester": 1,
+            }, content_type="application/json")
+        audit.flush()
+        rows = [(r["user"], r["action"], r["model"], r["details"]["name"]) for r in self._feed(limit=3)["results"]]
+        self.assertEqual(rows, [
+            ("carol", "CREATE", "Template", "Essay"),
+            ("carol", "CREATE", "Subject", "COMP1234"),
+            ("carol", "CREATE", "User", "carol"),
+        ])
+
+    def test_bad_parameters(self):
+        url = reverse("recent-activity")
+        self.assertEqual(self.client.get(url, {"cursor": "garbage"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"action": "PUBLISH"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"objectId": 3}).status_code, 400)
+
+    def test_pages_are_read_in_index_order(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("query plan check is SQLite specific")
+        for params in ({}, {"user": "alice"}, {"model": "Template"}, {"action": "UPDATE"}):
+            with self.subTest(**params):
+                with CaptureQueriesContext(connection) as ctx:
+                    self._feed(**params)
+                sql = ctx.captured_queries[-1]["sql"]
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                    plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+                self.assertIn("USING INDEX", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
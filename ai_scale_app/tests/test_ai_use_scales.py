@@ -0,0 +1,101 @@
+from unittest import mock
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from ai_scale_app import audit, scales
+from ai_scale_app.models import User, Template, TemplateItem, AIUseScale
+
+# run this by python manage.py test ai_scale_app.tests.test_ai_use_scales
+
+
+# TransactionTestCase: the catalogue only keeps what it reads outside a transaction,
+# and TestCase runs every test inside one
+class AIUseScaleCatalogueTests(TransactionTestCase):
+    def setUp(self):
+        scales.invalidate()
+        self.levels = [AIUseScale.objects.create(name=f"Level {i}") for i in range(1, 4)]
+
+    def tearDown(self):
+        # the flush after each test deletes the rows this process still remembers
+        scales.invalidate()
+        audit.flush()
+
+    def test_known_names_are_served_from_memory(self):
+        scales.catalogue()
+        with self.assertNumQueries(0):
+            resolved = scales.resolve(["Level 1", "Level 3"])
+        self.assertEqual(resolved["Level 3"].id, self.levels[2].id)
+
+    def test_bulk_item_save_resolves_levels_from_memory(self):
+        user = User.objects.create(username="owner")
+        template = Template.objects.create(ownerId=user, name="Guidelines")
+        items = [{"task": f"Task {i}", "aiUseScaleLevel_name": f"Level {i}"} for i in range(1, 4)]
+        scales.catalogue()
+        with mock.patch.object(AIUseScale.objects, "bulk_create") as create:
+            response = self.client.post(reverse("bulk_update_template_items"),
+                                        {"templateId": template.id, "items": items}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        create.assert_not_called()
+        self.assertEqual(
+            list(TemplateItem.objects.order_by("id").values_list("aiUseScaleLevel", flat=True)),
+            [level.id for level in self.levels],
+        )
+
+    def test_rename_and_delete_invalidate(self):
+        scales.catalogue()
+        level = self.levels[0]
+        level.name = "No AI"
+        level.save()
+        self.assertEqual(scales.resolve(["No AI"])["No AI"].id, level.id)
+        self.assertEqual(AIUseScale.objects.count(), 3)
+
+        self.levels[1].delete()
+        self.assertNotIn("Level 2", [s["name"] for s in scales.catalogue()])
+
+    def test_names_created_elsewhere_are_reloaded_not_duplicated(self):
+        scales.catalogue()
+        # bulk_create sends no signals, like a row written by another worker process
+        AIUseScale.objects.bulk_create([AIUseScale(name="Level 4")])
+        resolved = scales.resolve(["Level 4"])
+        self.assertEqual(AIUseScale.objects.filter(name="Level 4").count(), 1)
+        self.assertEqual(resolved["Level 4"].id, AIUseScale.objects.get(name="Level 4").id)
+
+    def test_unknown_names_are_created_and_kept(self):
+        resolved = scales.resolve(["Level 1", "Full AI"])
+        self.assertEqual(resolved["Full AI"].id, AIUseScale.objects.get(name="Full AI").id)
+        with self.assertNumQueries(0):
+            scales.resolve(["Full AI"])
+
+    def test_reads_inside_transactions_are_not_kept(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            scales.resolve(["Temporary"])
+            raise RuntimeError
+        self.assertFalse(AIUseScale.objects.filter(name="Temporary").exists())
+
+        resolved = scales.resolve(["Temporary"])
+        self.assertTrue(AIUseScale.objects.filter(pk=resolved["Temporary"].id).exists())
+
+    def test_stale_copies_expire(self):
+        scales.catalogue()
+        AIUseScale.objects.filter(pk=self.levels[0].pk).update(name="Renamed elsewhere")
+        with mock.patch.object(scales, "CATALOGUE_TTL", 0):
+            self.assertIn("Renamed elsewhere", [s["name"] for s in scales.catalogue()])
+
+
+class AIUseScaleEndpointTests(TestCase):
+    def setUp(self):
+        scales.invalidate()
+        self.levels = [AIUseScale.objects.create(name=f"Level {i}") for i in range(1, 4)]
+
+    def test_catalogue_endpoint(self):
+        response = self.client.get(reverse("ai_use_scales"))
+        self.assertEqual(response.json()["scales"], [{"id": l.id, "name": l.name} for l in self.levels])
+        self.assertIn("max-age=3600", response["Cache-Control"])
+
+        again = self.client.get(reverse("ai_use_scales"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+        AIUseScale.objects.create(name="Level 4")
+        changed = self.client.get(reverse("ai_use_scales"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.json()["scales"]), 4)
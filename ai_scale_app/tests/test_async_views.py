@@ -0,0 +1,82 @@
+import json
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from ai_scale_app import views
+from ai_scale_app.models import AIUseScale, User, Subject, Template, TemplateItem
+
+# run this by python manage.py test ai_scale_app.tests.test_async_views
+
+
+class AsyncReadViewTests(TestCase):
+    """
+    The read endpoints are sync views, so the default WSGI deployment runs them without an
+    event loop; these requests go through the ASGI request path (AsyncClient, as under
+    SERVER_MODE=asgi) and must answer exactly like the WSGI one the rest of the suite uses.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username="coord", password="pass", first_name="Cara", last_name="Coord")
+        self.subject = Subject.objects.create(subjectCode="COMP1000", semester=1, year=2025)
+        level, _ = AIUseScale.objects.get_or_create(name="NO AI")
+        self.template = Template.objects.create(
+            ownerId=self.user, name="Essay", subject=self.subject, isPublishable=True, isTemplate=True,
+        )
+        TemplateItem.objects.create(templateId=self.template, task="Draft", aiUseScaleLevel=level)
+        Template.objects.create(ownerId=self.user, name="Essay", subject=self.subject, version=1, isPublishable=False)
+
+    def test_read_views_are_sync(self):
+        # under WSGI an async view costs an event loop per request and a thread hop per query
+        for view in (
+            views.template_details, views.summary_templates, views.community_templates,
+            views.list_template_versions, views.curr_user_session,
+        ):
+            self.assertFalse(iscoroutinefunction(view), view.__name__)
+
+    async def test_template_details_and_etag(self):
+        url = reverse("template_details")
+        response = await self.async_client.get(url, {"templateId": self.template.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["template_items"][0]["task"], "Draft")
+        wsgi = await sync_to_async(self.client.get)(url, {"templateId": self.template.id})
+        self.assertEqual(response.json(), wsgi.json())
+
+        etag = response["ETag"]
+        cached = await self.async_client.get(url, {"templateId": self.template.id}, headers={"if-none-match": etag})
+        self.assertEqual(cached.status_code, 304)
+        missing = await self.async_client.get(url, {"templateId": 999999})
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_summary_templates_streams_asynchronously(self):
+        url = reverse("summarise_templates")
+        listed = (await self.async_client.get(url, {"username": "coord"})).json()
+        self.assertEqual([t["version"] for t in listed["templates"]], [0, 1])
+
+        response = await self.async_client.get(url, {"username": "coord", "stream": "true"})
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(json.loads(body), listed)
+
+        unknown = await self.async_client.get(url, {"username": "nobody"})
+        self.assertEqual(unknown.status_code, 404)
+
+    async def test_community_templates_widget_and_browse(self):
+        url = reverse("community_templates")
+        widget = (await self.async_client.get(url, {"limit": 4})).json()
+        self.assertEqual([row["templateId"] for row in widget["templates"]], [self.template.id])
+
+        browse = (await self.async_client.get(url, {"q": "essay"})).json()
+        self.assertEqual(browse["count"], 1)
+        page = (await self.async_client.get(url, {"order": "name", "cursor": "", "count": "true"})).json()
+        self.assertEqual([row["templateId"] for row in page["results"]], [self.template.id])
+
+    async def test_versions_and_session_over_asgi(self):
+        anonymous = (await self.async_client.get(reverse("user_session"))).json()
+        self.assertEqual(anonymous, {"isAuthenticated": False})
+
+        await self.async_client.aforce_login(self.user)
+        session = (await self.async_client.get(reverse("user_session"))).json()
+        self.assertEqual(session["user"]["username"], "coord")
+
+        response = await self.async_client.get(reverse("template_versions"), {"template_id": self.template.id})
+        self.assertEqual([v["version"] for v in response.json()["versions"]], [0, 1])
+        self.assertTrue(response.has_header("ETag"))
@@ -0,0 +1,140 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from ai_scale_app import archive, snapshots
+from ai_scale_app.models import User, AuditLog
+
+# run this by python manage.py test ai_scale_app.tests.test_audit_archive
+
+
+class AuditArchiveTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        settings_override = override_settings(AUDIT_ARCHIVE_DIR=self.root, AUDIT_RETENTION_DAYS=30)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # no snapshot storage configured: the archive lives under AUDIT_ARCHIVE_DIR
+        env = mock.patch.dict(os.environ)
+        env.start()
+        self.addCleanup(env.stop)
+        os.environ.pop("SNAPSHOT_DIR", None)
+        os.environ.pop("S3_BUCKET_NAME", None)
+
+        self.user = User.objects.create(username="alice")
+        now = timezone.now()
+        self.old_day = (now - timedelta(days=40)).date()
+        old_start = archive.day_start(self.old_day)
+        # 10 entries over two old days, plus 3 recent ones that must stay
+        AuditLog.objects.bulk_create(
+            [AuditLog(user=self.user, action="UPDATE", model_name="Template", object_id=i,
+                      timestamp=old_start + timedelta(hours=5 * i)) for i in range(10)]
+            + [AuditLog(user=None, action="CREATE", model_name="Subject", object_id=100 + i,
+                        timestamp=now - timedelta(days=i)) for i in range(3)]
+        )
+
+    def test_archives_old_entries_in_batches_and_keeps_recent_ones(self):
+        with self.assertNumQueries(2 * 4 + 1):  # (SELECT + DELETE) per batch of 3, then the empty SELECT
+            count = archive.archive_before(archive.retention_cutoff(), batch_size=3)
+        self.assertEqual(count, 10)
+        self.assertEqual(sorted(AuditLog.objects.values_list("object_id", flat=True)), [100, 101, 102])
+
+        # a part per batch and day, named after its first entry (hours 0-20 on the first day, 25-45 after)
+        ids = list(AuditLog.objects.order_by("id").values_list("id", flat=True))  # the 3 recent ones
+        first_id = ids[0] - 10
+        parts = sorted(p.name for p in self.root.rglob("*.jsonl.gz"))
+        next_day = self.old_day + timedelta(days=1)
+        self.assertEqual(parts, sorted([
+            f"auditlog-{self.old_day:%Y-%m-%d}.{first_id}.jsonl.gz",
+            f"auditlog-{self.old_day:%Y-%m-%d}.{first_id + 3}.jsonl.gz",
+            f"auditlog-{next_day:%Y-%m-%d}.{first_id + 5}.jsonl.gz",
+            f"auditlog-{next_day:%Y-%m-%d}.{first_id + 6}.jsonl.gz",
+            f"auditlog-{next_day:%Y-%m-%d}.{first_id + 9}.jsonl.gz",
+        ]))
+        with gzip.open(self.root / archive.partition_key(self.old_day, first_id), "rt") as fh:
+            first = json.loads(fh.readline())
+        self.assertEqual((first["object_id"], first["username"], first["action"]), (0, "alice", "UPDATE"))
+
+    def test_archive_goes_to_the_snapshot_storage_when_configured(self):
+        bucket = self.root / "bucket"
+        with mock.patch.dict(os.environ, {"SNAPSHOT_DIR": str(bucket)}):
+            archive.archive_before(archive.retention_cutoff())
+            self.assertEqual(len(list(archive.read(archive.day_start(self.old_day), timezone.now()))), 10)
+        self.assertEqual(len(list((bucket / "audit_archive").rglob("auditlog-*.jsonl.gz"))), 2)
+
+    def test_a_crash_mid_write_keeps_earlier_parts_and_the_rows(self):
+        backend = snapshots.LocalDirBackend(self.root)
+        real_put = backend.put_bytes
+
+        def put_then_crash(key, data):
+            if put_then_crash.calls:  # the second part: a torn write, then the process dies
+                (self.root / (key + ".part")).write_bytes(data[:10])
+                raise OSError("killed")
+            put_then_crash.calls += 1
+            real_put(key, data)
+        put_then_crash.calls = 0
+
+        with mock.patch.object(backend, "put_bytes", put_then_crash), self.assertRaises(OSError):
+            archive.archive_before(archive.retention_cutoff(), batch_size=3, backend=backend)
+        self.assertEqual(AuditLog.objects.count(), 13 - 3)
+        readable = list(archive.read(archive.day_start(self.old_day), timezone.now(), backend=backend))
+        self.assertEqual([e["object_id"] for e in readable], [0, 1, 2])
+
+        archive.archive_before(archive.retention_cutoff(), batch_size=3, backend=backend)
+        everything = list(archive.read(archive.day_start(self.old_day), timezone.now(), backend=backend))
+        self.assertEqual([e["object_id"] for e in everything], list(range(10)))
+
+    def test_read_lists_months_instead_of_probing_days(self):
+        archive.archive_before(archive.retention_cutoff())
+        backend = archive.archive_backend()
+        start = archive.day_start(self.old_day) - timedelta(days=300)
+        with mock.patch.object(backend, "list", wraps=backend.list) as listed:
+            entries = list(archive.read(start, start + timedelta(days=archive.MAX_READ_DAYS), backend=backend))
+        self.assertEqual(len(entries), 10)
+        self.assertLessEqual(listed.call_count, 13)
+        with self.assertRaises(ValueError):
+            list(archive.read(start, start + timedelta(days=archive.MAX_READ_DAYS + 1)))
+
+    def test_read_returns_a_time_range_from_the_archive(self):
+        archive.archive_before(archive.retention_cutoff())
+        start = archive.day_start(self.old_day) + timedelta(hours=10)
+        entries = list(archive.read(start, start + timedelta(hours=20)))
+        self.assertEqual([e["object_id"] for e in entries], [2, 3, 4, 5])
+
+    def test_rerun_after_crash_does_not_duplicate_on_read(self):
+        rows = list(AuditLog.objects.filter(object_id__lt=10).order_by("id").values(*archive.ARCHIVED_FIELDS))
+        # a previous run wrote the files but died before deleting
+        archive._write_parts(rows, archive.archive_backend())
+        archive.archive_before(archive.retention_cutoff())
+        everything = list(archive.read(archive.day_start(self.old_day), timezone.now()))
+        self.assertEqual([e["object_id"] for e in everything], list(range(10)))
+
+    def test_command_and_archive_endpoint(self):
+        call_command("archive_audit_log", stdout=StringIO())
+        self.assertEqual(AuditLog.objects.count(), 3)
+        params = {"from": self.old_day.isoformat(), "to": self.old_day.isoformat(), "user": "alice"}
+
+        self.assertEqual(self.client.get(reverse("audit_archive"), params).status_code, 401)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("audit_archive"), params).status_code, 403)
+        self.client.force_login(User.objects.create(username="admin", role=User.Role.ADMIN))
+
+        response = self.client.get(reverse("audit_archive"), params)
+        self.assertTrue(response.streaming)
+        body = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([e["object_id"] for e in body["results"]], [0, 1, 2, 3, 4])
+
+        bad = self.client.get(reverse("audit_archive"), {"from": "yesterday", "to": "2025-01-01"})
+        self.assertEqual(bad.status_code, 400)
+        too_long = self.client.get(reverse("audit_archive"), {"from": "0001-01-01", "to": "9999-12-31"})
+        self.assertEqual(too_long.status_code, 400)
@@ -0,0 +1,117 @@
+import queue
+from unittest import mock
+from django.db import OperationalError, connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ai_scale_app import audit
+from ai_scale_app.models import User, Subject, Template, AuditLog
+
+# run this by python manage.py test ai_scale_app.tests.test_audit_log
+
+
+# TransactionTestCase: entries are only queued once the surrounding transaction commits
+@override_settings(AUDIT_FLUSH_SIZE=100, AUDIT_FLUSH_INTERVAL=3600)
+class BufferedAuditLogTests(TransactionTestCase):
+    def setUp(self):
+        audit.flush()
+        AuditLog.objects.all().delete()
+        self.user = User.objects.create(username="owner")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+
+    def tearDown(self):
+        audit.flush()
+
+    def _create_template(self, name="Essay"):
+        response = self.client.post(reverse("update_template"), {
+            "username": "owner", "name": name, "subjectCode": "COMP1234", "year": 2025, "semester": 1,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["templateId"]
+
+    def test_entries_are_queued_then_bulk_written(self):
+        for i in range(3):
+            audit.record(self.user, "UPDATE", "Template", i, {"n": i})
+        self.assertEqual(audit.pending(), 3)
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(audit.flush(), 3)
+        self.assertEqual([q["sql"].split()[0] for q in ctx.captured_queries], ["BEGIN", "SELECT", "INSERT", "COMMIT"])
+        self.assertEqual(list(AuditLog.objects.order_by("id").values_list("object_id", flat=True)), [0, 1, 2])
+
+    def test_user_deleted_while_their_entries_are_queued(self):
+        other = User.objects.create(username="other")
+        audit.record(self.user, "UPDATE", "Template", 1)
+        audit.record(other, "UPDATE", "Template", 2)
+        audit.record(other, "UPDATE", "Template", 3)
+        other.delete()
+
+        self.assertEqual(audit.flush(), 3)
+        rows = list(AuditLog.objects.order_by("object_id").values_list("object_id", "user__username"))
+        self.assertEqual(rows, [(1, "owner"), (2, None), (3, None)])
+
+    def test_failed_batches_go_back_in_the_queue(self):
+        for i in range(3):
+            audit.record(self.user, "UPDATE", "Template", i)
+        locked = OperationalError("database is locked")
+        with mock.patch.object(AuditLog.objects, "bulk_create", side_effect=locked), \
+                self.assertLogs("ai_scale_app.audit", "ERROR"):
+            self.assertEqual(audit.flush(), 0)
+        self.assertEqual(audit.pending(), 3)
+
+        self.assertEqual(audit.flush(), 3)
+        self.assertEqual(sorted(AuditLog.objects.values_list("object_id", flat=True)), [0, 1, 2])
+
+    def test_timestamp_is_taken_when_recorded(self):
+        audit.record(self.user, "CREATE", "Template", 1)
+        entry = audit._queue.queue[0]
+        audit.flush()
+        self.assertEqual(AuditLog.objects.get().timestamp, entry.timestamp)
+
+    def test_template_lifecycle_is_audited_without_writes_in_the_request(self):
+        with mock.patch.object(AuditLog.objects, "create", side_effect=AssertionError("synchronous audit write")):
+            template_id = self._create_template()
+            self._create_template()  # same owner/name/version again is an update
+            copy = self.client.post(reverse("duplicate_template"), {"templateId": template_id, "username": "owner"},
+                                    content_type="application/json").json()["new_template"]
+            self.client.post(reverse("delete_template"), {"templateId": template_id}, content_type="application/json")
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        audit.flush()
+        rows = list(AuditLog.objects.order_by("id").values_list("action", "model_name", "object_id", "user__username"))
+        self.assertEqual(rows, [
+            ("CREATE", "Template", template_id, "owner"),
+            ("UPDATE", "Template", template_id, "owner"),
+            ("CREATE", "Template", copy["templateId"], "owner"),
+            ("DELETE", "Template", template_id, None),
+        ])
+        self.assertEqual(AuditLog.objects.get(object_id=copy["templateId"]).details["duplicatedFrom"], template_id)
+
+    @override_settings(AUDIT_FLUSH_SIZE=2)
+    def test_size_trigger_flushes_after_the_request(self):
+        self._create_template("One")
+        self.assertEqual(AuditLog.objects.count(), 0)
+        self._create_template("Two")
+        self.assertEqual(AuditLog.objects.count(), 2)
+        self.assertEqual(audit.pending(), 0)
+
+    @override_settings(AUDIT_FLUSH_INTERVAL=0)
+    def test_time_trigger_flushes_after_the_request(self):
+        audit.record(self.user, "UPDATE", "Template", 1)
+        self.client.get(reverse("health_check"))
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_rolled_back_changes_are_not_audited(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            audit.record(self.user, "CREATE", "Template", 1)
+            raise RuntimeError
+        self.assertEqual(audit.pending(), 0)
+
+    def test_full_queue_falls_back_to_synchronous_writes(self):
+        with mock.patch.object(audit, "_queue", queue.Queue(maxsize=1)), self.assertLogs("ai_scale_app.audit", "WARNING"):
+            audit.record(self.user, "CREATE", "Template", 1)
+            audit.record(self.user, "CREATE", "Template", 2)
+            self.assertEqual(list(AuditLog.objects.values_list("object_id", flat=True)), [2])
+            audit.flush()
+        self.assertEqual(AuditLog.objects.count(), 2)
@@ -0,0 +1,98 @@
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ai_scale_app.models import User, Subject, Template, TemplateItem, AIUseScale
+
+# run this by python manage.py test ai_scale_app.tests.test_bulk_template_items
+
+
+class BulkTemplateItemsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+        self.template = Template.objects.create(ownerId=self.user, name="Guidelines", subject=self.subject)
+
+    def _save(self, items, template_id=None):
+        return self.client.post(
+            reverse("bulk_update_template_items"),
+            {"templateId": template_id or self.template.id, "items": items},
+            content_type="application/json",
+        )
+
+    def _levels(self, n, prefix="Level"):
+        return [
+            {"task": f"Task {i}", "aiUseScaleLevel_name": f"{prefix} {i}", "instructionsToStudents": "Do it",
+             "useAcknowledgement": i % 2 == 0}
+            for i in range(n)
+        ]
+
+    def test_creates_updates_and_deletes_in_one_call(self):
+        created = self._save(self._levels(3)).json()
+        self.assertEqual(created["created"], 3)
+        ids = [row["id"] for row in created["items"]]
+
+        desired = [
+            {"id": ids[0], "task": "Edited", "aiUseScaleLevel_name": "Level 0"},
+            {"id": ids[2], "task": "Task 2", "aiUseScaleLevel_name": "Level 2"},
+            {"task": "Brand new", "aiUseScaleLevel_name": "Level 9"},
+        ]
+        data = self._save(desired).json()
+        self.assertEqual((data["created"], data["updated"], data["deleted"]), (1, 2, 1))
+
+        items = TemplateItem.objects.filter(templateId=self.template).order_by("id")
+        self.assertEqual([i.task for i in items], ["Edited", "Task 2", "Brand new"])
+        self.assertEqual(items[2].aiUseScaleLevel.name, "Level 9")
+        self.assertFalse(TemplateItem.objects.filter(pk=ids[1]).exists())
+
+    def test_delete_without_signals(self):
+        items = [TemplateItem.objects.create(templateId=self.template, task=f"Task {i}") for i in range(3)]
+        deleted = []
+        post_delete.connect(lambda sender, instance, **kwargs: deleted.append(instance), sender=TemplateItem, weak=False,
+                            dispatch_uid="test_delete_without_signals")
+        try:
+            with self.assertNumQueries(1):
+                count = TemplateItem.objects.filter(pk__in=[items[0].pk, items[2].pk]).delete_without_signals()
+        finally:
+            post_delete.disconnect(sender=TemplateItem, dispatch_uid="test_delete_without_signals")
+        self.assertEqual(count, 2)
+        self.assertEqual(deleted, [])
+        self.assertEqual(list(TemplateItem.objects.values_list("pk", flat=True)), [items[1].pk])
+
+    def test_resaving_is_idempotent(self):
+        ids = [row["id"] for row in self._save(self._levels(4)).json()["items"]]
+        again = [dict(entry, id=pk) for entry, pk in zip(self._levels(4), ids)]
+        data = self._save(again).json()
+        self.assertEqual((data["created"], data["updated"], data["deleted"]), (0, 4, 0))
+        self.assertEqual(TemplateItem.objects.filter(templateId=self.template).count(), 4)
+        self.assertEqual(AIUseScale.objects.count(), 4)
+
+    def test_statement_count_is_constant(self):
+        counts = []
+        for n, prefix in ((2, "Small"), (10, "Large")):
+            template = Template.objects.create(ownerId=self.user, name=f"Guidelines {n}", subject=self.subject)
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self._save(self._levels(n, prefix), template.id).status_code, 200)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_rejects_items_of_other_templates(self):
+        other = Template.objects.create(ownerId=self.user, name="Other", subject=self.subject)
+        foreign = TemplateItem.objects.create(templateId=other, task="Not yours")
+        response = self._save([{"id": foreign.id, "task": "Hijack"}])
+        self.assertEqual(response.status_code, 400)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.task, "Not yours")
+
+    def test_updates_etag_and_search_index(self):
+        etag = self.client.get(reverse("template_details"), {"templateId": self.template.id})["ETag"]
+        self._save([{"task": "Reflective journal", "aiUseScaleLevel_name": "Level 1"}])
+        details = self.client.get(reverse("template_details"), {"templateId": self.template.id})
+        self.assertNotEqual(details["ETag"], etag)
+
+        found = self.client.get(reverse("community-templates"), {"q": "journal"}).json()["results"]
+        self.assertEqual([r["templateId"] for r in found], [self.template.id])
+
+    def test_missing_template(self):
+        self.assertEqual(self._save([], template_id=999999).status_code, 404)
@@ -0,0 +1,89 @@
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ai_scale_app.models import User, Subject, Template
+
+# run this by python manage.py test ai_scale_app.tests.test_community_pagination
+
+
+class CommunityKeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="owner", first_name="Olive", last_name="Owner")
+        subjects = [
+            Subject.objects.create(subjectCode=f"COMP{n}", semester=sem, year=year)
+            for n, (year, sem) in enumerate([(2024, 1), (2024, 2), (2025, 1)])
+        ]
+        for i in range(14):
+            Template.objects.create(
+                ownerId=cls.user,
+                name=f"Template {i % 5}",
+                version=i,
+                subject=subjects[i % 3] if i != 13 else None,
+                isPublishable=True,
+                isTemplate=True,
+            )
+        Template.objects.create(ownerId=cls.user, name="Private", isPublishable=False)
+
+    def _walk(self, order, limit=4):
+        ids, cursor = [], ""
+        while cursor is not None:
+            response = self.client.get(reverse("community-templates"), {"order": order, "limit": limit, "cursor": cursor})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids += [row["templateId"] for row in data["results"]]
+            cursor = data["nextCursor"]
+        return ids
+
+    def _offset_ids(self, order):
+        response = self.client.get(reverse("community-templates"), {"order": order, "limit": 100})
+        return [row["templateId"] for row in response.json()["results"]]
+
+    def test_cursor_pages_match_offset_order(self):
+        for order in ("recent", "name", "subject", "oldest"):
+            with self.subTest(order=order):
+                walked = self._walk(order)
+                self.assertEqual(len(walked), 14)
+                self.assertEqual(walked, self._offset_ids(order))
+
+    def test_count_is_opt_in(self):
+        url = reverse("community-templates")
+        self.assertIsNone(self.client.get(url, {"cursor": ""}).json()["count"])
+        self.assertEqual(self.client.get(url, {"cursor": "", "count": "true"}).json()["count"], 14)
+
+    def test_rejects_bad_or_mismatched_cursor(self):
+        url = reverse("community-templates")
+        self.assertEqual(self.client.get(url, {"cursor": "not-a-cursor"}).status_code, 400)
+
+        cursor = self.client.get(url, {"cursor": "", "limit": 2, "order": "name"}).json()["nextCursor"]
+        self.assertEqual(self.client.get(url, {"cursor": cursor, "order": "recent"}).status_code, 400)
+
+    def test_offset_mode_still_available(self):
+        data = self.client.get(reverse("community-templates"), {"limit": 5, "offset": 10}).json()
+        self.assertEqual(data["count"], 14)
+        self.assertEqual(data["offset"], 10)
+        self.assertEqual(len(data["results"]), 4)
+
+    def test_subject_edit_moves_templates_in_the_listing(self):
+        subject = Subject.objects.get(subjectCode="COMP0")
+        subject.year = 2030
+        subject.save()
+        first = self.client.get(reverse("community-templates"), {"cursor": "", "limit": 1}).json()["results"][0]
+        self.assertEqual((first["subjectCode"], first["year"]), ("COMP0", 2030))
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite's")
+    def test_each_order_reads_its_index_without_sorting(self):
+        for order in ("recent", "name", "subject", "oldest"):
+            cursor = self.client.get(reverse("community-templates"), {"order": order, "cursor": "", "limit": 2}).json()["nextCursor"]
+            for page in ("", cursor):
+                with self.subTest(order=order, first_page=not page):
+                    with CaptureQueriesContext(connection) as ctx:
+                        self.client.get(reverse("community-templates"), {"order": order, "cursor": page, "limit": 2})
+                    sql = next(q["sql"] for q in ctx.captured_queries if "ORDER BY" in q["sql"])
+                    with connection.cursor() as db:
+                        db.execute(f"EXPLAIN QUERY PLAN {sql}")
+                        plan = " ".join(str(row[-1]) for row in db.fetchall())
+                    self.assertIn(f"USING INDEX summary_community_{order}", plan)
+                    self.assertNotIn("TEMP B-TREE", plan)
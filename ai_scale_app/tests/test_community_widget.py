@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from ai_scale_app.models import User, Subject, Template
+
+# run this by python manage.py test ai_scale_app.tests.test_community_widget
+
+
+class CommunityWidgetCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="owner", first_name="Olive", last_name="Owner")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+        self.templates = [
+            Template.objects.create(ownerId=self.user, name=f"Template {i}", subject=self.subject, isPublishable=True)
+            for i in range(6)
+        ]
+
+    def _titles(self, limit=4):
+        response = self.client.get(reverse("community_templates"), {"limit": limit})
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.json()["templates"]]
+
+    def test_cache_hit_touches_no_database_rows(self):
+        self.assertEqual(self._titles(), ["Template 5", "Template 4", "Template 3", "Template 2"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._titles(2), ["Template 5", "Template 4"])
+
+    def test_publish_unpublish_edit_and_delete_invalidate(self):
+        self._titles()
+
+        newest = self.templates[-1]
+        newest.isPublishable = False
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.save()
+        self.assertEqual(self._titles(1), ["Template 4"])
+
+        newest.isPublishable = True
+        newest.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.save()
+        self.assertEqual(self._titles(1), ["Renamed"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.delete()
+        self.assertEqual(self._titles(1), ["Template 4"])
+
+    def test_invalidation_waits_for_commit(self):
+        self._titles()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Template.objects.create(ownerId=self.user, name="Uncommitted", subject=self.subject, isPublishable=True)
+            # a read before the commit must not re-cache rows that may still be rolled back
+            self.assertEqual(self._titles(1), ["Template 5"])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self._titles(1), ["Uncommitted"])
+
+    def test_owner_rename_invalidates(self):
+        self.client.get(reverse("community_templates"))
+        self.user.first_name = "Oscar"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.client.get(reverse("community_templates"), {"limit": 1})
+        self.assertEqual(response.json()["templates"][0]["author"], "Oscar Owner")
+
+    def test_both_routes_serve_widget_and_browse(self):
+        for name in ("community_templates", "community-templates"):
+            with self.subTest(route=name):
+                widget = self.client.get(reverse(name), {"limit": 2}).json()
+                self.assertEqual(len(widget["templates"]), 2)
+
+                browse = self.client.get(reverse(name), {"limit": 2, "offset": 0}).json()
+                self.assertEqual(browse["count"], 6)
+                self.assertEqual(len(browse["results"]), 2)
+
+    def test_large_limits_bypass_cache(self):
+        self.assertEqual(len(self._titles(50)), 6)
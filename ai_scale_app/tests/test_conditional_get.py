@@ -0,0 +1,87 @@
+from django.test import TestCase
+from django.urls import reverse
+from ai_scale_app.models import AIUseScale, User, Subject, Template, TemplateItem, TemplateOwnership
+
+# run this by python manage.py test ai_scale_app.tests.test_conditional_get
+
+
+class TemplateDetailsETagTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025, name="Test Subject")
+        self.template = Template.objects.create(ownerId=self.user, name="Guidelines", subject=self.subject)
+        TemplateItem.objects.create(templateId=self.template, task="Essay")
+
+    def _get(self, **headers):
+        return self.client.get(reverse("template_details"), {"templateId": self.template.id}, headers=headers)
+
+    def test_returns_etag_and_304_on_match(self):
+        first = self._get()
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(1):
+            second = self._get(if_none_match=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+
+    def test_item_change_invalidates_etag(self):
+        etag = self._get()["ETag"]
+        TemplateItem.objects.create(templateId=self.template, task="Report")
+        response = self._get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_subject_change_invalidates_etag(self):
+        etag = self._get()["ETag"]
+        self.subject.name = "Renamed Subject"
+        self.subject.save()
+        response = self._get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["subject"]["name"], "Renamed Subject")
+
+    def test_scale_delete_invalidates_etag(self):
+        scale = AIUseScale.objects.create(name="Level 9")
+        TemplateItem.objects.create(templateId=self.template, task="Report", aiUseScaleLevel=scale)
+        etag = self._get()["ETag"]
+        scale.delete()
+        response = self._get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([i["aiUseScaleLevel__name"] for i in response.json()["template_items"]], [None, None])
+
+    def test_missing_template_still_404s(self):
+        response = self.client.get(reverse("template_details"), {"templateId": 999999})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
+
+
+class TemplateVersionsETagTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+        self.v0 = Template.objects.create(ownerId=self.user, name="Guidelines", subject=self.subject, version=0)
+
+    def _get(self, **headers):
+        return self.client.get(reverse("template_versions"), {"template_id": self.v0.id}, headers=headers)
+
+    def test_304_until_a_new_version_is_added(self):
+        etag = self._get()["ETag"]
+        self.assertEqual(self._get(if_none_match=etag).status_code, 304)
+
+        Template.objects.create(ownerId=self.user, name="Guidelines", subject=self.subject, version=1)
+        response = self._get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([v["version"] for v in response.json()["versions"]], [0, 1])
+
+    def test_etag_is_scoped_to_the_requesting_user(self):
+        TemplateOwnership.objects.create(templateId=self.v0, ownerId=self.user)
+        params = {"name": "Guidelines"}
+        self.client.login(username="owner", password="pass")
+        owner_etag = self.client.get(reverse("template_versions"), params)["ETag"]
+        self.client.logout()
+
+        User.objects.create_user(username="other", password="pass")
+        self.client.login(username="other", password="pass")
+        response = self.client.get(reverse("template_versions"), params, headers={"if_none_match": owner_etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["versions"], [])
@@ -0,0 +1,80 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ai_scale_app.models import User, Subject, Template, TemplateItem, TemplateOwnership, AIUseScale
+
+# run this by python manage.py test ai_scale_app.tests.test_duplicate_template
+
+
+class DuplicateTemplateTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username="author")
+        self.copier = User.objects.create(username="copier", first_name="Cody", last_name="Copier")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+        self.level = AIUseScale.objects.create(name="Level 2")
+
+    def _template(self, name, items):
+        t = Template.objects.create(ownerId=self.author, name=name, subject=self.subject, isPublishable=True)
+        TemplateItem.objects.bulk_create([
+            TemplateItem(templateId=t, task=f"Task {i}", aiUseScaleLevel=self.level, examples=f"Example {i}")
+            for i in range(items)
+        ])
+        return t
+
+    def _duplicate(self, template):
+        response = self.client.post(
+            reverse("duplicate_template"),
+            {"templateId": template.id, "username": "copier"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()["new_template"]
+
+    def test_copies_items_and_ownership(self):
+        original = self._template("Essay", items=3)
+        copy = self._duplicate(original)
+        self.assertEqual(copy["name"], "Essay (1)")
+        self.assertIs(copy["isPublishable"], False)
+
+        new = Template.objects.get(pk=copy["templateId"])
+        self.assertEqual(new.ownerId, self.copier)
+        self.assertTrue(TemplateOwnership.objects.filter(templateId=new, ownerId=self.copier).exists())
+        self.assertEqual(
+            list(new.templateitem_set.order_by("id").values_list("content__task", "content__examples", "aiUseScaleLevel")),
+            list(original.templateitem_set.order_by("id").values_list("content__task", "content__examples", "aiUseScaleLevel")),
+        )
+
+    def test_suffix_numbering(self):
+        original = self._template("Essay", items=1)
+        Template.objects.create(ownerId=self.copier, name="Essay (7)")
+        Template.objects.create(ownerId=self.copier, name="Essay (draft)")
+        Template.objects.create(ownerId=self.copier, name="Essay copy (12)")
+        self.assertEqual(self._duplicate(original)["name"], "Essay (8)")
+
+        # duplicating a copy numbers from the same base name
+        copy = Template.objects.get(ownerId=self.copier, name="Essay (8)")
+        self.assertEqual(self._duplicate(copy)["name"], "Essay (9)")
+
+    def test_statement_count_does_not_grow(self):
+        small = self._template("Small", items=2)
+        large = self._template("Large", items=50)
+        for n in range(40):
+            Template.objects.create(ownerId=self.copier, name=f"Large ({n + 1})")
+
+        counts = []
+        for template in (small, large):
+            with CaptureQueriesContext(connection) as ctx:
+                self._duplicate(template)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(TemplateItem.objects.filter(templateId__name="Large (41)").count(), 50)
+
+    def test_copy_is_searchable_by_item_text(self):
+        original = self._template("Essay", items=1)
+        copy = self._duplicate(original)
+        published = Template.objects.get(pk=copy["templateId"])
+        published.isPublishable = True
+        published.save()  # through the model, so the listing's summary row follows
+        found = self.client.get(reverse("community-templates"), {"q": "Task", "owner": "copier"}).json()
+        self.assertEqual([r["templateId"] for r in found["results"]], [copy["templateId"]])
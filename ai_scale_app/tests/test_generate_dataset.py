@@ -0,0 +1,92 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone as django_timezone
+from ai_scale_app import archive, counters, search
+from ai_scale_app.models import (
+    AcknowledgementForm, AcknowledgementFormItem, AuditLog, Enrolment, Template, TemplateItem,
+    TemplateOwnership, TemplateSummary, User,
+)
+
+# run this by python manage.py test ai_scale_app.tests.test_generate_dataset
+
+
+def _generate(**options) -> str:
+    out = StringIO()
+    call_command("generate_dataset", stdout=out, **{"rows": 2000, "chunk_size": 50, **options})
+    return out.getvalue()
+
+
+def _snapshot(prefix) -> list:
+    # the generated templates with the prefix taken out, to compare runs under different prefixes
+    templates = Template.objects.filter(ownerId__username__startswith=f"{prefix}-").order_by("id")
+    return [
+        (
+            t.ownerId.username.removeprefix(prefix), t.name, t.version, t.isPublishable, t.scope,
+            t.subject.subjectCode.removeprefix(prefix.upper()),
+            [(i.task, i.instructionsToStudents, i.aiUseScaleLevel.name) for i in t.templateitem_set.order_by("id")],
+        )
+        for t in templates.select_related("ownerId", "subject")
+    ]
+
+
+class GenerateDatasetTests(TestCase):
+    def test_writes_every_table_in_chunks(self):
+        out = _generate()
+
+        templates = Template.objects.count()
+        self.assertEqual(templates, 2000 // 16)
+        self.assertEqual(set(User.objects.values_list("role", flat=True)), set(User.Role.values))
+        self.assertGreater(Enrolment.objects.count(), 0)
+        self.assertGreater(TemplateItem.objects.count(), templates)
+        self.assertGreater(TemplateOwnership.objects.count(), templates)  # owners plus some shares
+        self.assertEqual(AcknowledgementFormItem.objects.count(), 2 * AcknowledgementForm.objects.count())
+        self.assertEqual(AuditLog.objects.count(), 2 * templates)
+        # version chains: same owner, name and subject, numbered from 0
+        for name, owner in Template.objects.filter(version=1).values_list("name", "ownerId")[:5]:
+            chain = Template.objects.filter(name=name, ownerId=owner).order_by("version")
+            self.assertEqual(list(chain.values_list("version", flat=True)), list(range(chain.count())))
+            self.assertEqual(len(set(chain.values_list("subject", flat=True))), 1)
+        # a progress line with the running rate per chunk
+        progress = [line for line in out.splitlines() if line.lstrip().startswith("templates")]
+        self.assertGreater(len(progress), 1)
+        self.assertTrue(all(line.endswith("rows/s") for line in progress))
+        self.assertIn(f"{templates}/{templates}", progress[-1])
+
+    def test_read_models_are_rebuilt(self):
+        _generate()
+        self.assertEqual(TemplateSummary.objects.count(), Template.objects.count())
+        self.assertEqual(counters.read()["templates"], Template.objects.count())
+        if search.is_available():
+            name = Template.objects.filter(isPublishable=True).values_list("name", flat=True).first()
+            self.assertIn(name, Template.objects.filter(search.search_filter(name)).values_list("name", flat=True))
+
+    def test_audit_entries_count_back_from_now(self):
+        _generate(prefix="a", now=date(2026, 1, 31))
+        end = datetime(2026, 1, 31, tzinfo=timezone.utc)
+        stamps = list(AuditLog.objects.values_list("timestamp", flat=True))
+        self.assertTrue(all(end - timedelta(days=365) <= ts <= end for ts in stamps))
+
+        # by default up to today, so some entries are inside the retention window and some are archivable
+        AuditLog.objects.all().delete()
+        _generate(prefix="b")
+        cutoff = archive.retention_cutoff()
+        self.assertTrue(AuditLog.objects.filter(timestamp__gte=cutoff).exists())
+        self.assertTrue(AuditLog.objects.filter(timestamp__lt=cutoff).exists())
+        self.assertFalse(AuditLog.objects.filter(timestamp__gt=django_timezone.now()).exists())
+
+    def test_same_seed_gives_the_same_data(self):
+        _generate(prefix="a", seed=3)
+        _generate(prefix="b", seed=3)
+        _generate(prefix="c", seed=4)
+        self.assertEqual(_snapshot("a"), _snapshot("b"))
+        self.assertNotEqual(_snapshot("a"), _snapshot("c"))
+
+    def test_refuses_a_used_prefix(self):
+        _generate(rows=100)
+        with self.assertRaises(CommandError):
+            _generate(rows=100)
+        with self.assertRaises(CommandError):
+            _generate(prefix="Bad-Prefix")
@@ -33,13 +33,15 @@ class TemplateLifecycleTests(APITestCase):
     def test_publishable_template_visible_in_community(self):
         """Published templates appear in community template listing."""
         subj = Subject.objects.create(subjectCode="FINM7403", year=2025, semester=2)
-        Template.objects.create(
-            ownerId=self.user,
-            name="My Publishable",
-            subject=subj,
-            isPublishable=True,
-            isTemplate=True,
-        )
+        # the cached widget is invalidated on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Template.objects.create(
+                ownerId=self.user,
+                name="My Publishable",
+                subject=subj,
+                isPublishable=True,
+                isTemplate=True,
+            )
 
         response = self.client.get(reverse("community_templates"))
         self.assertEqual(response.status_code, 200, msg=response.content)
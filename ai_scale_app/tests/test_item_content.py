@@ -0,0 +1,131 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from ai_scale_app.models import User, Subject, Template, TemplateItem, ItemContent
+
+# run this by python manage.py test ai_scale_app.tests.test_item_content
+
+
+class ItemContentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+        self.template = Template.objects.create(ownerId=self.user, name="Essay", subject=self.subject)
+
+    def _item(self, template=None, **texts):
+        return TemplateItem.objects.create(templateId=template or self.template, **{"task": "Research", **texts})
+
+    def test_identical_text_is_stored_once(self):
+        a = self._item(instructionsToStudents="Library only")
+        b = self._item(instructionsToStudents="Library only")
+        c = self._item(instructionsToStudents="Anything goes")
+        self.assertEqual(a.content_id, b.content_id)
+        self.assertNotEqual(a.content_id, c.content_id)
+        self.assertEqual(ItemContent.objects.count(), 2)
+
+        fresh = TemplateItem.objects.select_related("content").get(pk=b.pk)
+        self.assertEqual((fresh.task, fresh.instructionsToStudents, fresh.examples), ("Research", "Library only", None))
+
+    def test_editing_text_leaves_old_content_to_the_collector(self):
+        shared = self._item(examples="Shared")
+        other = self._item(examples="Shared")
+        shared.examples = "Edited"
+        shared.save()
+        other.examples = "Edited"
+        other.save(update_fields=["examples"])
+        self.assertEqual(ItemContent.objects.count(), 2)
+
+        self.assertEqual(ItemContent.collect_garbage(), 1)
+        self.assertEqual(list(ItemContent.objects.values_list("examples", flat=True)), ["Edited"])
+
+    def test_duplicate_shares_text_with_the_original(self):
+        for i in range(5):
+            self._item(task=f"Task {i}")
+        before = ItemContent.objects.count()
+        response = self.client.post(reverse("duplicate_template"), {"templateId": self.template.id, "username": "owner"},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ItemContent.objects.count(), before)
+        copy_id = response.json()["new_template"]["templateId"]
+        tasks = self.client.get(reverse("template_details"), {"templateId": copy_id}).json()["template_items"]
+        self.assertEqual([t["task"] for t in tasks], [f"Task {i}" for i in range(5)])
+
+    def test_new_version_stores_only_changed_items(self):
+        blank = {"instructionsToStudents": "", "examples": "", "aiGeneratedContent": ""}
+        for i in range(4):
+            self._item(task=f"Task {i}", **blank)
+        v1 = Template.objects.create(ownerId=self.user, name="Essay", version=1, subject=self.subject)
+        items = [{"task": f"Task {i}"} for i in range(4)]
+        items[2]["task"] = "Rewritten"
+        self.client.post(reverse("bulk_update_template_items"), {"templateId": v1.id, "items": items},
+                         content_type="application/json")
+        self.assertEqual(ItemContent.objects.count(), 5)
+
+    def test_collector_sweeps_content_of_deleted_items(self):
+        self._item(task="Only here")
+        kept = self._item(task="Also elsewhere")
+        other = Template.objects.create(ownerId=self.user, name="Other", subject=self.subject)
+        self._item(template=other, task="Also elsewhere")
+
+        self.template.delete()
+        self.assertEqual(ItemContent.collect_garbage(), 1)
+        self.assertEqual(list(ItemContent.objects.values_list("task", flat=True)), ["Also elsewhere"])
+
+        # bulk save deleting the last user of a content
+        response = self.client.post(reverse("bulk_update_template_items"), {"templateId": other.id, "items": []},
+                                    content_type="application/json")
+        self.assertEqual(response.json()["deleted"], 1)
+        self.assertFalse(TemplateItem.objects.filter(templateId=other).exists())
+        self.assertEqual(ItemContent.collect_garbage(), 1)
+        self.assertFalse(ItemContent.objects.filter(pk=kept.content_id).exists())
+
+    def test_collect_garbage_sweeps_orphans(self):
+        ItemContent.store([{"task": "Orphan"}])
+        self._item()
+        out = StringIO()
+        call_command("collect_item_content", stdout=out)
+        self.assertIn("Deleted 1 ", out.getvalue())
+        self.assertEqual(ItemContent.objects.count(), 1)
+
+
+class ItemContentMigrationTests(TransactionTestCase):
+    migrate_from = [("ai_scale_app", "0007_auditlog_timestamp_default")]
+    migrate_to = [("ai_scale_app", "0009_remove_templateitem_text")]
+
+    def test_existing_items_are_deduplicated(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+        OldUser = apps.get_model("ai_scale_app", "User")
+        OldTemplate = apps.get_model("ai_scale_app", "Template")
+        OldItem = apps.get_model("ai_scale_app", "TemplateItem")
+        owner = OldUser.objects.create(username="legacy")
+        ids = []
+        for version in range(3):
+            t = OldTemplate.objects.create(ownerId=owner, name="Essay", version=version)
+            for task in ("Research", "Drafting", f"Version {version} only"):
+                ids.append(OldItem.objects.create(templateId=t, task=task, examples="Same examples").pk)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        apps = executor.loader.project_state(self.migrate_to).apps
+        NewItem = apps.get_model("ai_scale_app", "TemplateItem")
+        NewContent = apps.get_model("ai_scale_app", "ItemContent")
+
+        self.assertEqual(NewContent.objects.count(), 5)
+        tasks = [item.content.task for item in NewItem.objects.select_related("content").order_by("pk")]
+        self.assertEqual(tasks[:3], ["Research", "Drafting", "Version 0 only"])
+        self.assertEqual(NewItem.objects.get(pk=ids[0]).content_id, NewItem.objects.get(pk=ids[3]).content_id)
+        self.assertEqual(
+            NewContent.objects.get(task="Research").hash,
+            ItemContent.hash_of({"task": "Research", "examples": "Same examples"}),
+        )
+
+        # leave the schema as the other tests expect it
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes("ai_scale_app"))
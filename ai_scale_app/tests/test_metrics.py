@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from ai_scale_app import metrics
+from ai_scale_app.models import User, Subject, Template
+
+# run this by python manage.py test ai_scale_app.tests.test_metrics
+
+
+def _sample(name, view, **labels):
+    return REGISTRY.get_sample_value(name, {"view": view, "method": "GET", **labels}) or 0
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="coord")
+        subject = Subject.objects.create(subjectCode="COMP1000", semester=1, year=2025)
+        self.template = Template.objects.create(ownerId=self.user, name="Essay", subject=subject)
+
+    def test_records_latency_queries_and_bytes_per_url_name(self):
+        before = {
+            name: _sample(name, "template_details")
+            for name in ("ai_scale_request_seconds_count", "ai_scale_request_queries_sum", "ai_scale_response_bytes_sum")
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("template_details"), {"templateId": self.template.id})
+
+        self.assertEqual(_sample("ai_scale_request_seconds_count", "template_details"), before["ai_scale_request_seconds_count"] + 1)
+        self.assertEqual(_sample("ai_scale_request_queries_sum", "template_details"), before["ai_scale_request_queries_sum"] + len(queries))
+        self.assertEqual(_sample("ai_scale_response_bytes_sum", "template_details"), before["ai_scale_response_bytes_sum"] + len(response.content))
+        self.assertGreater(_sample("ai_scale_request_sql_seconds_sum", "template_details"), 0)
+
+    async def test_asgi_requests_attribute_their_queries(self):
+        before = _sample("ai_scale_request_queries_sum", "summarise_templates")
+        await self.async_client.get(reverse("summarise_templates"), {"username": "coord"})
+        # the summary rows, then nothing else: the user exists check only runs for empty results
+        self.assertEqual(_sample("ai_scale_request_queries_sum", "summarise_templates"), before + 1)
+
+    def test_status_codes_and_unmatched_routes(self):
+        before = _sample("ai_scale_responses_total", "unmatched", status="404")
+        self.client.get("/no/such/page/")
+        self.assertEqual(_sample("ai_scale_responses_total", "unmatched", status="404"), before + 1)
+
+    def test_unknown_methods_are_labelled_other(self):
+        before = _sample("ai_scale_responses_total", "template_details", method="other", status="405")
+        self.client.generic("BREW", reverse("template_details"))
+        self.client.generic("PROPFIND", reverse("template_details"))
+        self.assertEqual(_sample("ai_scale_responses_total", "template_details", method="other", status="405"), before + 2)
+        self.assertIsNone(REGISTRY.get_sample_value(
+            "ai_scale_responses_total", {"view": "template_details", "method": "BREW", "status": "405"},
+        ))
+
+    @override_settings(DEBUG=True)
+    def test_metrics_endpoint_serves_prometheus_text(self):
+        self.client.get(reverse("template_details"), {"templateId": self.template.id})
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn('ai_scale_request_seconds_bucket{le="0.005",method="GET",view="template_details"}', response.content.decode())
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        response = self.client.get(reverse("metrics"), headers={"authorization": "Bearer s3cret"})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_metrics_denied_without_a_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    def test_wrapper_is_installed_once_and_outermost(self):
+        connection.execute_wrappers.remove(metrics.sql_wrapper)
+        with connection.execute_wrapper(lambda execute, *args: execute(*args)):
+            metrics.install(connection)  # as when the connection is re-created inside the block
+        metrics.install(connection)
+        self.assertEqual(connection.execute_wrappers, [metrics.sql_wrapper])
+
+
+class MultiprocessMetricsTests(SimpleTestCase):
+    def test_workers_are_summed_through_the_shared_directory(self):
+        observe = (
+            "from ai_scale_app import metrics; "
+            "metrics.REQUEST_SECONDS.labels('template_details', 'GET').observe(0.2)"
+        )
+        render = "from ai_scale_app import metrics; print(metrics.render().decode())"
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": tmp}
+            root = Path(__file__).resolve().parents[2]
+            for _ in range(2):  # two "workers", each its own process and file
+                subprocess.run([sys.executable, "-c", observe], env=env, cwd=root, check=True)
+            self.assertEqual(len(list(Path(tmp).glob("histogram_*.db"))), 2)
+            text = subprocess.run(
+                [sys.executable, "-c", render], env=env, cwd=root, check=True, capture_output=True, text=True,
+            ).stdout
+        self.assertIn('ai_scale_request_seconds_count{method="GET",view="template_details"} 2.0', text)
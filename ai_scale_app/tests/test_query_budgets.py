@@ -0,0 +1,201 @@
+import json
+import re
+import tempfile
+from collections import Counter
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern
+from ai_scale_app import audit, counters, scales, search, summaries
+from ai_scale_app.models import (
+    AIUseScale, AuditLog, User, Subject, Template, TemplateItem, TemplateOwnership,
+)
+from ai_scale_app.urls import urlpatterns
+
+# run this by python manage.py test ai_scale_app.tests.test_query_budgets
+
+# Templates of one lineage (same owner, name and subject; versions 0..LINEAGE-1)
+LINEAGE = 5
+ITEMS_PER_TEMPLATE = 3
+PASSWORD = "budget-pass"
+METRICS_TOKEN = "budget-token"
+
+
+def seed(size: int) -> dict:
+    """
+    A coordinator owning `size` publishable templates (lineages of LINEAGE versions spread over
+    size / 10 subjects, ITEMS_PER_TEMPLATE items each) and `size` audit log entries. Written with
+    bulk_create, so the read models a save would maintain are brought up to date here.
+    """
+    user = User.objects.create_user(
+        username="coord", password=PASSWORD, first_name="Cara", last_name="Coord", role=User.Role.COORDINATOR,
+        is_staff=True,  # the audit archive is staff-only
+    )
+    level, _ = AIUseScale.objects.get_or_create(name="NO AI")
+    subjects = Subject.objects.bulk_create(
+        Subject(subjectCode=f"COMP{1000 + s}", semester=1 + s % 2, year=2025, name=f"Subject {s}")
+        for s in range(max(1, size // 10))
+    )
+    templates = Template.objects.bulk_create(
+        Template(
+            ownerId=user, name=f"Template {i // LINEAGE}", version=i % LINEAGE,
+            subject=subjects[(i // LINEAGE) % len(subjects)], description="Budget template",
+            scope="Essay", isPublishable=True, isTemplate=True,
+        )
+        for i in range(size)
+    )
+    TemplateOwnership.objects.bulk_create(TemplateOwnership(templateId=t, ownerId=user) for t in templates)
+    TemplateItem.objects.bulk_create(
+        TemplateItem(
+            templateId=t, task=f"Task {n}", instructionsToStudents=f"Instructions {n} for {t.name}", aiUseScaleLevel=level,
+        )
+        for t in templates for n in range(ITEMS_PER_TEMPLATE)
+    )
+    AuditLog.objects.bulk_create(
+        AuditLog(user=user, action="UPDATE", model_name="Template", object_id=t.id, details={"name": t.name})
+        for t in templates
+    )
+    ids = [t.id for t in templates]
+    search.index_templates(ids)
+    summaries.refresh_template_summaries(ids)
+    counters.reconcile()
+    return {"user": user, "subject": subjects[0], "lineage": templates[:LINEAGE], "templates": templates}
+
+
+def _shape(sql: str) -> str:
+    # the statement with its literal values blanked out, so the queries of an N+1 loop compare equal
+    return re.sub(r"'[^']*'|\b\d+(\.\d+)?\b", "?", sql)
+
+
+def _report(queries) -> str:
+    repeats = Counter(_shape(q["sql"]) for q in queries)
+    lines = []
+    for n, q in enumerate(queries, 1):
+        times = repeats[_shape(q["sql"])]
+        lines.append(f"{n}. {'(x%d) ' % times if times > 1 else ''}{q['sql']}")
+    return "\n".join(lines)
+
+
+# (route, case, method, request builder, query budget). Every route in urls.py needs at least one
+# case. The request builder gets the seed() data and returns GET params or a JSON POST body.
+# Budgets count everything the request runs, including the session and user lookups of the
+# logged-in client; the same budget holds at both data sizes.
+CASES = [
+    ("", "index", "get", lambda d: {}, 0),
+    ("api/health/", "health", "get", lambda d: {}, 0),
+    ("metrics/", "metrics", "get", lambda d: {}, 0),
+    ("username/", "user details", "get", lambda d: {"username": "coord"}, 1),
+    ("auth/login/", "login", "post", lambda d: {"username": "coord", "password": PASSWORD}, 6),
+    ("auth/register/", "register", "post", lambda d: {
+        "username": "newcomer", "password": PASSWORD, "first_name": "New", "last_name": "Comer", "role": "COORDINATOR",
+    }, 4),
+    ("info/taught_subjects/", "taught subjects", "get", lambda d: {"username": "coord"}, 2),
+    ("template/update/", "new version", "post", lambda d: {
+        "username": "coord", "name": d["lineage"][0].name, "subjectCode": d["subject"].subjectCode,
+        "year": d["subject"].year, "semester": d["subject"].semester, "version": LINEAGE, "isPublishable": True,
+    }, 15),
+    ("template/update/", "edit", "post", lambda d: {
+        "templateId": d["lineage"][0].id, "username": "coord", "name": d["lineage"][0].name,
+        "subjectCode": d["subject"].subjectCode, "year": d["subject"].year, "semester": d["subject"].semester,
+        "description": "Edited",
+    }, 12),
+    ("templateitem/update/", "add item", "post", lambda d: {
+        "templateId": d["lineage"][0].id, "task": "New task", "aiUseScaleLevel": "NO AI", "useAcknowledgement": False,
+    }, 8),
+    ("templateitem/bulk_update/", "bulk save", "post", lambda d: {
+        "templateId": d["lineage"][0].id,
+        "items": [
+            {"id": item.id, "task": f"{item.task} edited", "aiUseScaleLevel": "NO AI"}
+            for item in d["lineage"][0].templateitem_set.order_by("id")[1:]
+        ] + [{"task": "Added", "aiUseScaleLevel": "NO AI"}],
+    }, 17),
+    ("template/summary/", "summary", "get", lambda d: {"username": "coord"}, 1),
+    ("template/summary/", "summary stream", "get", lambda d: {"username": "coord", "stream": "true"}, 2),
+    ("template/details/", "details", "get", lambda d: {"templateId": d["lineage"][0].id}, 3),
+    ("template/details/batch/", "batch", "get", lambda d: {
+        "templateIds": ",".join(str(t.id) for t in d["templates"][:10]),
+    }, 2),
+    ("template/delete/", "delete", "post", lambda d: {"templateId": d["lineage"][-1].id}, 11),
+    ("template/duplicate/", "duplicate", "post", lambda d: {"templateId": d["lineage"][0].id, "username": "coord"}, 18),
+    ("session/", "session", "get", lambda d: {}, 2),
+    ("logout/", "logout", "post", lambda d: {}, 4),
+    ("token/", "csrf token", "get", lambda d: {}, 0),
+    ("auth/csrf/", "csrf token", "get", lambda d: {}, 0),
+    ("info/subjects_with_templates/", "subjects", "get", lambda d: {"username": "coord"}, 1),
+    ("template/for_subject/", "for subject", "get", lambda d: {
+        "username": "coord", "subjectCode": d["subject"].subjectCode,
+    }, 1),
+    ("templates/community/", "widget", "get", lambda d: {"limit": 4}, 1),
+    ("api/community/templates/", "browse", "get", lambda d: {"order": "name", "limit": 20, "offset": 20}, 2),
+    ("api/community/templates/", "browse cursor", "get", lambda d: {"order": "subject", "cursor": "", "limit": 20}, 1),
+    ("api/community/templates/", "search", "get", lambda d: {"q": "template", "limit": 20}, 3),
+    ("api/community/templates/", "filtered", "get", lambda d: {
+        "subjectCode": d["subject"].subjectCode, "owner": "coord", "order": "recent",
+    }, 2),
+    ("system-overview/", "overview", "get", lambda d: {}, 1),
+    ("recent-activity/", "activity", "get", lambda d: {"limit": 20}, 1),
+    ("recent-activity/", "activity by user", "get", lambda d: {"user": "coord", "model": "Template"}, 2),
+    ("api/templates/versions/", "versions", "get", lambda d: {"template_id": d["lineage"][0].id}, 3),
+    ("api/templates/versions/", "versions by name", "get", lambda d: {"name": d["lineage"][0].name}, 3),
+    ("api/templates/diff/", "diff", "get", lambda d: {"from": d["lineage"][0].id, "to": d["lineage"][-1].id}, 2),
+    ("api/ai-use-scales/", "scales", "get", lambda d: {}, 2),
+    ("api/audit/archive/", "archive", "get", lambda d: {"from": "2025-01-01", "to": "2025-01-31", "user": "coord"}, 2),
+]
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every endpoint runs a fixed number of SQL statements, whatever the amount of data: each case
+    is measured against its budget with SIZE templates seeded (this class) and with 100x as many
+    (LargeQueryBudgetTests). A count that grows with the data is an N+1; the failure lists the
+    statements the request ran, repeated shapes marked (xN).
+    """
+    SIZE = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed(cls.SIZE)
+
+    def _measure(self, method, route, payload):
+        # cold caches and an empty audit queue, so each case is measured on the same path
+        cache.clear()
+        scales.invalidate()
+        audit.flush()
+        self.client.force_login(self.data["user"])
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                # the /metrics/ scraper's credentials; no other route reads the header
+                headers = {"authorization": f"Bearer {METRICS_TOKEN}"}
+                if method == "get":
+                    response = self.client.get(f"/{route}", payload, headers=headers)
+                else:
+                    response = self.client.post(
+                        f"/{route}", json.dumps(payload), content_type="application/json", headers=headers,
+                    )
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            transaction.set_rollback(True)  # writes are undone before the next case
+        return response, queries.captured_queries
+
+    def test_every_route_has_a_budget(self):
+        routes = {str(p.pattern) for p in urlpatterns if isinstance(p, URLPattern)}
+        self.assertEqual(routes - {route for route, *_ in CASES}, set())
+
+    def test_queries_stay_within_budget(self):
+        with tempfile.TemporaryDirectory() as archive_dir, override_settings(
+            AUDIT_ARCHIVE_DIR=archive_dir, METRICS_TOKEN=METRICS_TOKEN,
+        ):
+            for route, case, method, build, budget in CASES:
+                with self.subTest(route=route, case=case):
+                    response, queries = self._measure(method, route, build(self.data))
+                    self.assertLess(response.status_code, 400, f"/{route} ({case}) answered {response.status_code}")
+                    self.assertEqual(
+                        len(queries), budget,
+                        f"/{route} ({case}) ran {len(queries)} queries with {self.SIZE} templates, "
+                        f"budget {budget}:\n{_report(queries)}",
+                    )
+
+
+class LargeQueryBudgetTests(QueryBudgetTests):
+    SIZE = 1000
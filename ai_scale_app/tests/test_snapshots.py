@@ -0,0 +1,301 @@
+import gzip
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ai_scale_app import snapshots
+
+# run this by python manage.py test ai_scale_app.tests.test_snapshots
+
+
+class FlakyBackend(snapshots.LocalDirBackend):
+    """
+    Fails the first `failures` uploads, and counts upload attempts
+    """
+    def __init__(self, root, failures=0):
+        super().__init__(root)
+        self.failures = failures
+        self.attempts = 0
+        self.uploaded = threading.Event()
+
+    def upload_file(self, path, key):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("simulated outage")
+        super().upload_file(path, key)
+        self.uploaded.set()
+
+
+class SnapshotTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.db_path = self.tmp / "db.sqlite3"
+        # a live WAL database whose latest commits have not been checkpointed into the main file
+        self.db = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self.addCleanup(self.db.close)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA wal_autocheckpoint = 0")
+        self.db.execute("CREATE TABLE note (body TEXT)")
+        self.backend = FlakyBackend(self.tmp / "bucket")
+
+    def _write(self, body):
+        self.db.execute("INSERT INTO note VALUES (?)", [body])
+
+    def _stored_notes(self):
+        restored = self.tmp / "restored.sqlite3"
+        with self.backend.open(snapshots.read_manifest(self.backend)["key"]) as src:
+            restored.write_bytes(gzip.decompress(src.read()))
+        with closing(sqlite3.connect(restored)) as db:
+            return [row[0] for row in db.execute("SELECT body FROM note ORDER BY rowid")]
+
+    def _snapshotter(self, **kwargs):
+        options = {"debounce": 0.05, "max_delay": 1.0, "retries": 3, "backoff": 0.01, **kwargs}
+        return snapshots.Snapshotter(self.db_path, self.backend, **options)
+
+    def test_snapshot_includes_commits_still_in_the_wal(self):
+        self._write("first")
+        self._write("second")
+        self.assertGreater((self.tmp / "db.sqlite3-wal").stat().st_size, 0)
+        self.assertTrue(self._snapshotter().snapshot_once())
+        self.assertEqual(self._stored_notes(), ["first", "second"])
+
+        manifest = snapshots.read_manifest(self.backend)
+        self.assertEqual(manifest["key"], f"db.sqlite3.{manifest['sha256']}.gz")
+        self.assertEqual(manifest["compressedSize"], (self.tmp / "bucket" / manifest["key"]).stat().st_size)
+
+    def test_snapshots_are_never_overwritten_and_old_ones_pruned(self):
+        snapshotter = self._snapshotter()
+        keys = []
+        for n in range(4):
+            self._write(f"note {n}")
+            snapshotter.snapshot_once()
+            keys.append(snapshots.read_manifest(self.backend)["key"])
+        self.assertEqual(len(set(keys)), 4)
+        stored = sorted(p.name for p in (self.tmp / "bucket").glob("*.gz"))
+        self.assertEqual(stored, sorted(keys[-snapshots.KEEP_SNAPSHOTS:]))
+
+    def test_unchanged_content_is_not_uploaded_again(self):
+        self._write("only")
+        snapshotter = self._snapshotter()
+        self.assertTrue(snapshotter.snapshot_once())
+        self.assertFalse(snapshotter.snapshot_once())
+        self.assertEqual(self.backend.attempts, 1)
+
+        # a new process reads the stored manifest instead of re-uploading
+        restarted = self._snapshotter()
+        restarted.start()
+        restarted.notify()
+        restarted.stop(timeout=5)
+        self.assertEqual((restarted.uploads, self.backend.attempts), (0, 1))
+
+        self._write("more")
+        self.assertTrue(snapshotter.snapshot_once())
+        self.assertEqual(self._stored_notes(), ["only", "more"])
+
+    def test_bursts_of_changes_are_coalesced(self):
+        snapshotter = self._snapshotter(debounce=0.2)
+        snapshotter.start()
+        self.addCleanup(snapshotter.stop, 5)
+        for n in range(20):
+            self._write(f"note {n}")
+            snapshotter.notify()
+        self.assertTrue(self.backend.uploaded.wait(5))
+        time.sleep(0.3)
+        self.assertEqual(snapshotter.uploads, 1)
+        self.assertEqual(len(self._stored_notes()), 20)
+
+    def test_steady_changes_still_snapshot_after_max_delay(self):
+        snapshotter = self._snapshotter(debounce=0.2, max_delay=0.3)
+        snapshotter.start()
+        self.addCleanup(snapshotter.stop, 5)
+        deadline = time.monotonic() + 2
+        # changes every 50ms never leave the 200ms quiet period the debounce waits for
+        while not self.backend.uploaded.is_set() and time.monotonic() < deadline:
+            self._write("tick")
+            snapshotter.notify()
+            time.sleep(0.05)
+        self.assertTrue(self.backend.uploaded.is_set())
+
+    def test_failed_uploads_are_retried(self):
+        self.backend.failures = 2
+        self._write("persisted")
+        with self.assertLogs("ai_scale_app.snapshots", "WARNING"):
+            self.assertTrue(self._snapshotter().snapshot_once())
+        self.assertEqual(self.backend.attempts, 3)
+        self.assertEqual(self._stored_notes(), ["persisted"])
+
+    def test_gives_up_after_the_last_retry(self):
+        self.backend.failures = 10
+        self._write("lost")
+        snapshotter = self._snapshotter()
+        with self.assertLogs("ai_scale_app.snapshots", "WARNING"), self.assertRaises(ConnectionError):
+            snapshotter.snapshot_once()
+        self.assertIsNone(snapshots.read_manifest(self.backend))
+        self.assertIsNone(snapshotter.last_hash)
+
+    def test_stop_flushes_pending_changes(self):
+        snapshotter = self._snapshotter(debounce=60)
+        snapshotter.start()
+        self._write("late")
+        snapshotter.notify()
+        snapshotter.stop(timeout=5)
+        self.assertEqual(self._stored_notes(), ["late"])
+
+
+class CountingBackend(snapshots.LocalDirBackend):
+    def __init__(self, root):
+        super().__init__(root)
+        self.opened = []
+
+    def open(self, key):
+        self.opened.append(key)
+        return super().open(key)
+
+
+class RestoreTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.backend = CountingBackend(self.tmp / "bucket")
+        self.local = self.tmp / "app" / "db.sqlite3"
+
+    def _upload(self, *notes):
+        source = self.tmp / f"source-{len(notes)}.sqlite3"
+        with closing(sqlite3.connect(source)) as db:
+            db.execute("CREATE TABLE note (body TEXT)")
+            db.executemany("INSERT INTO note VALUES (?)", [[n] for n in notes])
+            db.commit()
+        snapshots.Snapshotter(source, self.backend).snapshot_once()
+
+    def _local_notes(self):
+        with closing(sqlite3.connect(self.local)) as db:
+            return [row[0] for row in db.execute("SELECT body FROM note ORDER BY rowid")]
+
+    def test_restores_then_skips_while_current(self):
+        self._upload("a", "b")
+        result = snapshots.restore(self.local, self.backend)
+        self.assertEqual(result["status"], "restored")
+        self.assertEqual(result["size"], self.local.stat().st_size)
+        self.assertEqual(self._local_notes(), ["a", "b"])
+
+        result = snapshots.restore(self.local, self.backend)
+        self.assertEqual(result["status"], "current")
+        self.assertEqual(self.backend.opened, [snapshots.read_manifest(self.backend)["key"]])
+
+        # a newer snapshot is downloaded again
+        self._upload("a", "b", "c")
+        self.assertEqual(snapshots.restore(self.local, self.backend)["status"], "restored")
+        self.assertEqual(self._local_notes(), ["a", "b", "c"])
+
+    def test_local_copy_is_recognised_without_the_local_manifest(self):
+        self._upload("a")
+        snapshots.restore(self.local, self.backend)
+        snapshots.local_manifest_path(self.local).unlink()
+        self.assertEqual(snapshots.restore(self.local, self.backend)["status"], "current")
+        self.assertEqual(len(self.backend.opened), 1)
+
+    def test_changed_local_copy_is_replaced(self):
+        self._upload("a")
+        snapshots.restore(self.local, self.backend)
+        with closing(sqlite3.connect(self.local)) as db:
+            db.execute("INSERT INTO note VALUES ('local only')")
+            db.commit()
+        Path(f"{self.local}-wal").write_bytes(b"stale")
+        self.assertEqual(snapshots.restore(self.local, self.backend)["status"], "restored")
+        self.assertEqual(self._local_notes(), ["a"])
+        self.assertFalse(Path(f"{self.local}-wal").exists())
+
+    def test_corrupt_snapshot_leaves_the_local_copy_alone(self):
+        self._upload("a")
+        snapshots.restore(self.local, self.backend)
+        before = self.local.read_bytes()
+        self._upload("a", "b")
+        manifest = snapshots.read_manifest(self.backend)
+        manifest["sha256"] = "0" * 64
+        self.backend.put_bytes(snapshots.manifest_key("db.sqlite3"), json.dumps(manifest).encode())
+        with self.assertRaises(ValueError):
+            snapshots.restore(self.local, self.backend)
+        self.assertEqual(self.local.read_bytes(), before)
+        self.assertEqual([p.name for p in self.local.parent.iterdir() if p.suffix == ".part"], [])
+
+    def test_a_manifest_read_before_a_new_upload_still_restores(self):
+        self._upload("a")
+        old_manifest = snapshots.read_manifest(self.backend)
+        self._upload("a", "b")  # lands between the reader fetching the manifest and the snapshot
+        with mock.patch.object(snapshots, "read_manifest", return_value=old_manifest):
+            self.assertEqual(snapshots.restore(self.local, self.backend)["status"], "restored")
+        self.assertEqual(self._local_notes(), ["a"])
+
+    def test_only_a_restored_copy_counts_as_restored(self):
+        self.assertFalse(snapshots.is_restored_copy(self.local, self.backend))
+        self._upload("a")
+        self.assertFalse(snapshots.is_restored_copy(self.local, self.backend))
+        snapshots.restore(self.local, self.backend)
+        self.assertTrue(snapshots.is_restored_copy(self.local, self.backend))
+        with closing(sqlite3.connect(self.local)) as db:  # e.g. migrations run after the restore
+            db.execute("CREATE TABLE later (id INTEGER)")
+        self.assertTrue(snapshots.is_restored_copy(self.local, self.backend))
+        self._upload("a", "b")  # someone else's newer snapshot
+        self.assertFalse(snapshots.is_restored_copy(self.local, self.backend))
+
+    def test_missing_and_legacy_snapshots(self):
+        self.assertEqual(snapshots.restore(self.local, self.backend)["status"], "missing")
+        self.assertFalse(self.local.exists())
+
+        # an uncompressed upload from before snapshots
+        source = self.tmp / "legacy.sqlite3"
+        with closing(sqlite3.connect(source)) as db:
+            db.execute("CREATE TABLE note (body TEXT)")
+            db.execute("INSERT INTO note VALUES ('legacy')")
+            db.commit()
+        self.backend.upload_file(source, "db.sqlite3")
+        self.assertEqual(snapshots.restore(self.local, self.backend)["status"], "restored")
+        self.assertEqual(self._local_notes(), ["legacy"])
+
+
+class RestoreScriptTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.backend = snapshots.LocalDirBackend(self.tmp / "bucket")
+
+    def _run(self):
+        env = {
+            **os.environ, "SNAPSHOT_DIR": str(self.tmp / "bucket"), "DB_PATH": str(self.tmp / "db.sqlite3"),
+            "RESTORE_RETRIES": "2", "RESTORE_BACKOFF": "0.01",
+        }
+        root = Path(__file__).resolve().parents[2]
+        return subprocess.run(
+            [sys.executable, "scripts/restore_db.py"], env=env, cwd=root, capture_output=True, text=True,
+        )
+
+    def test_boots_without_a_restore_only_when_there_is_no_snapshot(self):
+        self.assertEqual(self._run().returncode, 0)
+
+    def test_a_failed_restore_stops_the_boot(self):
+        source = self.tmp / "source.sqlite3"
+        with closing(sqlite3.connect(source)) as db:
+            db.execute("CREATE TABLE note (body TEXT)")
+            db.commit()
+        snapshots.Snapshotter(source, self.backend).snapshot_once()
+        manifest = snapshots.read_manifest(self.backend)
+        self.backend.put_bytes(manifest["key"], b"not a gzip stream")
+
+        result = self._run()
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Restore attempt 1 failed", result.stdout)
+        self.assertFalse((self.tmp / "db.sqlite3").exists())
@@ -0,0 +1,49 @@
+import tempfile
+from pathlib import Path
+
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+
+# run this by python manage.py test ai_scale_app.tests.test_sqlite_profile
+
+
+class SQLiteProfileTests(TestCase):
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite connection profile")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _pragmas(self, *names):
+        """
+        Opens a new connection to a file database (so connection_created fires) and reads the given pragmas
+        """
+        settings_dict = {**connection.settings_dict, "NAME": str(Path(self.tmp.name) / "profile.sqlite3")}
+        wrapper = connections["default"].__class__(settings_dict, alias="profile")
+        try:
+            with wrapper.cursor() as cursor:
+                values = {}
+                for name in names:
+                    cursor.execute(f"PRAGMA {name}")
+                    values[name] = cursor.fetchone()[0]
+                return values
+        finally:
+            wrapper.close()
+
+    def test_default_profile(self):
+        self.assertEqual(
+            self._pragmas("journal_mode", "synchronous", "busy_timeout", "temp_store", "cache_size"),
+            # synchronous NORMAL = 1, temp_store MEMORY = 2
+            {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000, "temp_store": 2, "cache_size": -20000},
+        )
+
+    @override_settings(SQLITE_PRAGMAS={"busy_timeout": "250", "synchronous": "", "cache_size": "-4000"})
+    def test_values_come_from_settings(self):
+        # "" keeps SQLite's default (FULL = 2)
+        self.assertEqual(
+            self._pragmas("busy_timeout", "synchronous", "cache_size", "journal_mode"),
+            {"busy_timeout": 250, "synchronous": 2, "cache_size": -4000, "journal_mode": "delete"},
+        )
+
+    def test_transactions_begin_immediate(self):
+        self.assertEqual(connection.settings_dict["OPTIONS"].get("transaction_mode"), "IMMEDIATE")
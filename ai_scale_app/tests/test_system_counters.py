@@ -0,0 +1,72 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from ai_scale_app import counters
+from ai_scale_app.models import User, Subject, Template, SystemCounter
+
+# run this by python manage.py test ai_scale_app.tests.test_system_counters
+
+
+class SystemCounterTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username="owner")
+        User.objects.create(username="coord", role=User.Role.COORDINATOR)
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+        Template.objects.create(ownerId=self.owner, name="First", subject=self.subject)
+
+    def _overview(self):
+        response = self.client.get(reverse("system-overview"))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_read_counts_then_reads_one_row_set(self):
+        self.assertEqual(self._overview(), {"totalUsers": 2, "subjects": 1, "templates": 1, "activeCoordinators": 1})
+        with self.assertNumQueries(1):
+            self._overview()
+
+    def test_saves_and_deletes_keep_counters_exact(self):
+        self._overview()
+        second = Template.objects.create(ownerId=self.owner, name="Second", subject=self.subject)
+        other = Subject.objects.create(subjectCode="FINM7403", semester=1, year=2025)
+        coordinator = User.objects.create(username="coord2", role=User.Role.COORDINATOR)
+        User.objects.create(username="staff", role=User.Role.STAFF)
+        self.assertEqual(self._overview(), {"totalUsers": 4, "subjects": 2, "templates": 2, "activeCoordinators": 2})
+
+        second.delete()
+        other.delete()
+        coordinator.delete()
+        self.assertEqual(self._overview(), {"totalUsers": 3, "subjects": 1, "templates": 1, "activeCoordinators": 1})
+
+        # cascaded deletes are counted too
+        self.owner.delete()
+        self.assertEqual(self._overview(), {"totalUsers": 2, "subjects": 1, "templates": 0, "activeCoordinators": 1})
+
+    def test_role_changes_wait_for_reconciliation(self):
+        self._overview()
+        promoted = User.objects.get(username="owner")
+        promoted.role = User.Role.COORDINATOR
+        with self.assertNumQueries(1):  # the UPDATE only, no counter query
+            promoted.save(update_fields=["role"])
+        self.assertEqual(self._overview()["activeCoordinators"], 1)
+
+        call_command("reconcile_counters", stdout=StringIO())
+        self.assertEqual(self._overview()["activeCoordinators"], 2)
+
+    def test_reconcile_command_corrects_drift(self):
+        self._overview()
+        Template.objects.bulk_create([Template(ownerId=self.owner, name=f"Bulk {i}") for i in range(3)])
+        self.assertEqual(self._overview()["templates"], 1)
+
+        call_command("reconcile_counters", stdout=StringIO())
+        self.assertEqual(self._overview()["templates"], 4)
+
+    @override_settings(SYSTEM_COUNTERS_MAX_AGE=60)
+    def test_reads_recount_once_older_than_max_age(self):
+        self._overview()
+        Template.objects.bulk_create([Template(ownerId=self.owner, name="Bulk")])
+        SystemCounter.objects.update(reconciledAt=timezone.now() - timedelta(seconds=61))
+        self.assertEqual(self._overview()["templates"], 2)
+        self.assertEqual(counters.read()[counters.TEMPLATES], 2)
@@ -0,0 +1,63 @@
+from django.test import TestCase
+from django.urls import reverse
+from ai_scale_app.models import User, Subject, Template, TemplateItem, AIUseScale
+from ai_scale_app.views import MAX_TEMPLATE_BATCH
+
+# run this by python manage.py test ai_scale_app.tests.test_template_batch_api
+
+
+class TemplateDetailsBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="owner", first_name="Olive", last_name="Owner")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025, name="Test Subject")
+        self.level = AIUseScale.objects.create(name="Level 1")
+
+    def _make_templates(self, n, items_each=2):
+        templates = []
+        start = Template.objects.count()
+        for i in range(start, start + n):
+            t = Template.objects.create(ownerId=self.user, name=f"Template {i}", subject=self.subject)
+            for j in range(items_each):
+                TemplateItem.objects.create(
+                    templateId=t, task=f"Task {j}", aiUseScaleLevel=self.level, examples='say \\"hi\\"'
+                )
+            templates.append(t)
+        return templates
+
+    def _get(self, ids):
+        return self.client.get(reverse("template_details_batch"), {"templateIds": ",".join(str(i) for i in ids)})
+
+    def test_matches_single_details_endpoint(self):
+        t = self._make_templates(1)[0]
+        single = self.client.get(reverse("template_details"), {"templateId": t.id}).json()
+        batch = self._get([t.id]).json()
+        self.assertEqual(batch["errors"], [])
+        self.assertEqual(batch["templates"], [single])
+
+    def test_query_count_is_constant(self):
+        few = self._make_templates(2)
+        many = few + self._make_templates(8)
+        with self.assertNumQueries(2):
+            self._get([t.id for t in few])
+        with self.assertNumQueries(2):
+            response = self._get([t.id for t in many])
+        self.assertEqual(len(response.json()["templates"]), 10)
+
+    def test_reports_missing_and_invalid_ids(self):
+        t = self._make_templates(1)[0]
+        response = self._get([t.id, 999999, "abc"])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([row["id"] for row in data["templates"]], [t.id])
+        self.assertEqual(
+            sorted(e["templateId"] for e in data["errors"]),
+            ["999999", "abc"],
+        )
+
+    def test_batch_size_is_capped(self):
+        response = self._get(range(1, MAX_TEMPLATE_BATCH + 2))
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_ids(self):
+        response = self.client.get(reverse("template_details_batch"))
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from ai_scale_app.models import User, Subject, Template, TemplateItem, AIUseScale
+
+# run this by python manage.py test ai_scale_app.tests.test_template_diff
+
+
+class TemplateVersionDiffTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="owner")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+        self.no_ai = AIUseScale.objects.create(name="No AI")
+        self.some_ai = AIUseScale.objects.create(name="Some AI")
+        self.v0 = Template.objects.create(ownerId=self.user, name="Essay", version=0, subject=self.subject,
+                                          description="First draft")
+        self.v1 = Template.objects.create(ownerId=self.user, name="Essay", version=1, subject=self.subject,
+                                          description="Final")
+        for task, level, instructions in (("Research", self.no_ai, "Library only"),
+                                          ("Drafting", self.some_ai, "Cite prompts"),
+                                          ("Editing", self.some_ai, "Grammar tools ok")):
+            TemplateItem.objects.create(templateId=self.v0, task=task, aiUseScaleLevel=level,
+                                        instructionsToStudents=instructions)
+        for task, level, instructions in (("Research", self.no_ai, "Library only"),
+                                          ("Drafting", self.no_ai, "Cite prompts"),
+                                          ("Presentation", self.some_ai, "Slides")):
+            TemplateItem.objects.create(templateId=self.v1, task=task, aiUseScaleLevel=level,
+                                        instructionsToStudents=instructions)
+
+    def _diff(self, old, new):
+        return self.client.get(reverse("template_version_diff"), {"from": old.id, "to": new.id})
+
+    def test_reports_only_changes(self):
+        diff = self._diff(self.v0, self.v1).json()
+        self.assertEqual(diff["fields"], {
+            "version": {"from": 0, "to": 1},
+            "description": {"from": "First draft", "to": "Final"},
+        })
+        items = diff["items"]
+        self.assertEqual(items["unchanged"], 1)
+        self.assertEqual([r["task"] for r in items["added"]], ["Presentation"])
+        self.assertEqual([r["task"] for r in items["removed"]], ["Editing"])
+        self.assertEqual(len(items["modified"]), 1)
+        self.assertEqual(items["modified"][0]["task"], "Drafting")
+        self.assertEqual(items["modified"][0]["changes"],
+                         {"aiUseScaleLevel__name": {"from": "Some AI", "to": "No AI"}})
+
+    def test_identical_versions(self):
+        diff = self._diff(self.v0, self.v0).json()
+        self.assertEqual(diff["fields"], {})
+        self.assertEqual(diff["items"], {"added": [], "removed": [], "modified": [], "unchanged": 3})
+
+    def test_cached_until_either_version_changes(self):
+        self._diff(self.v0, self.v1)
+        with self.assertNumQueries(1):
+            self._diff(self.v0, self.v1)
+
+        TemplateItem.objects.create(templateId=self.v1, task="Reflection")
+        added = self._diff(self.v0, self.v1).json()["items"]["added"]
+        self.assertEqual([r["task"] for r in added], ["Presentation", "Reflection"])
+
+    def test_rejects_templates_from_different_lineages(self):
+        other = Template.objects.create(ownerId=self.user, name="Exam", version=0, subject=self.subject)
+        self.assertEqual(self._diff(self.v0, other).status_code, 400)
+        response = self.client.get(reverse("template_version_diff"), {"from": self.v0.id, "to": 999999})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(reverse("template_version_diff")).status_code, 400)
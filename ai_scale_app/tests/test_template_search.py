@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ai_scale_app import search
+from ai_scale_app.models import User, Subject, Template, TemplateItem
+
+# run this by python manage.py test ai_scale_app.tests.test_template_search
+
+
+class TemplateSearchTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create(username="alice", first_name="Alice", last_name="Barn")
+        self.ben = User.objects.create(username="ben", first_name="Ben", last_name="Connor")
+        self.comp = Subject.objects.create(subjectCode="COMP30020", semester=2, year=2025)
+        self.finm = Subject.objects.create(subjectCode="FINM7403", semester=1, year=2025)
+        self.essay = Template.objects.create(ownerId=self.alice, name="Essay guidelines", subject=self.comp)
+        self.exam = Template.objects.create(
+            ownerId=self.ben, name="Exam rules", subject=self.finm, description="No essay writing tools"
+        )
+
+    def _search(self, q, **params):
+        response = self.client.get(reverse("community-templates"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["templateId"] for row in response.json()["results"]]
+
+    def test_index_is_available_on_sqlite(self):
+        self.assertEqual(search.is_available(), connection.vendor == "sqlite")
+
+    def test_prefix_match_across_fields(self):
+        self.assertEqual(self._search("comp30"), [self.essay.id])
+        self.assertEqual(self._search("connor"), [self.exam.id])
+        self.assertEqual(self._search("ess comp"), [self.essay.id])
+
+    def test_bm25_ranks_name_matches_first(self):
+        self.assertEqual(self._search("essay"), [self.essay.id, self.exam.id])
+
+    def test_item_text_is_searchable_and_kept_in_sync(self):
+        item = TemplateItem.objects.create(templateId=self.exam, task="Reflection", instructionsToStudents="Cite prompts")
+        self.assertEqual(self._search("prompts"), [self.exam.id])
+        item.delete()
+        self.assertEqual(self._search("prompts"), [])
+
+    def test_owner_and_subject_edits_are_reindexed(self):
+        self.ben.last_name = "Zhang"
+        self.ben.save()
+        self.assertEqual(self._search("zhang"), [self.exam.id])
+
+        self.finm.subjectCode = "ECON1010"
+        self.finm.save()
+        self.assertEqual(self._search("econ"), [self.exam.id])
+        self.assertEqual(self._search("finm"), [])
+
+    def test_deleted_templates_drop_out(self):
+        self.essay.delete()
+        self.assertEqual(self._search("essay"), [self.exam.id])
+
+    def test_search_combines_with_filters_and_orders(self):
+        self.assertEqual(self._search("essay", owner="alice"), [self.essay.id])
+        self.assertEqual(self._search("essay", order="name"), [self.essay.id, self.exam.id])
+
+    def test_ranking_and_count_cover_only_listable_templates(self):
+        # many private matches that would outrank the public one if ranked before filtering
+        Template.objects.bulk_create(
+            Template(ownerId=self.ben, name=f"Essay essay essay {n}", subject=self.finm, isPublishable=False)
+            for n in range(600)
+        )
+        search.rebuild_index()
+        response = self.client.get(reverse("community-templates"), {"q": "essay", "limit": 1, "offset": 1})
+        body = response.json()
+        self.assertEqual(body["count"], 2)
+        self.assertEqual([row["templateId"] for row in body["results"]], [self.exam.id])
+        self.assertEqual(self._search("essay", owner="ben"), [self.exam.id])
+
+    def test_failed_rebuild_keeps_the_old_index(self):
+        if not search.is_available():
+            self.skipTest("no search index on this backend")
+        with mock.patch.object(search, "_insert_sql", return_value="INSERT INTO no_such_table VALUES (1)"):
+            with self.assertRaises(Exception):
+                search.rebuild_index()
+        self.assertEqual(self._search("comp30"), [self.essay.id])
+
+    def test_template_delete_does_not_reindex_per_item(self):
+        def delete_cost(template, items):
+            for n in range(items):
+                TemplateItem.objects.create(templateId=template, task=f"Task {n}", instructionsToStudents=f"Step {n}")
+            with CaptureQueriesContext(connection) as queries:
+                template.delete()
+            return [q["sql"] for q in queries if search.SEARCH_TABLE in q["sql"] or "updatedAt" in q["sql"]]
+
+        self.assertEqual(len(delete_cost(self.essay, 1)), len(delete_cost(self.exam, 10)))
+        self.assertEqual(self._search("step"), [])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.SEARCH_TABLE}")
+        self.assertEqual(self._search("essay"), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self._search("essay"), [self.essay.id, self.exam.id])
@@ -0,0 +1,134 @@
+import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from ai_scale_app import counters, summaries
+from ai_scale_app.models import User, Subject, Template, TemplateSummary, SystemCounter
+from ai_scale_app.views import _stream_json
+
+# run this by python manage.py test ai_scale_app.tests.test_template_summaries
+
+
+class TemplateSummaryReadModelTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="coord", first_name="Cara", last_name="Coord")
+        self.other = User.objects.create(username="other")
+        self.s2024 = Subject.objects.create(subjectCode="COMP1000", semester=2, year=2024, name="Old offering")
+        self.s2025 = Subject.objects.create(subjectCode="COMP1000", semester=1, year=2025, name="Programming")
+        self.finm = Subject.objects.create(subjectCode="FINM7403", semester=1, year=2025, name="Finance")
+        self.t1 = Template.objects.create(ownerId=self.user, name="Essay", version=0, subject=self.s2025)
+        self.t2 = Template.objects.create(ownerId=self.user, name="Essay", version=1, subject=self.s2025)
+        self.t3 = Template.objects.create(ownerId=self.user, name="Exam", version=0, subject=self.s2024)
+        self.t4 = Template.objects.create(ownerId=self.user, name="Quiz", subject=self.finm, isPublishable=False)
+        Template.objects.create(ownerId=self.other, name="Not mine", subject=self.finm)
+
+    def test_summary_rows_follow_source_changes(self):
+        self.t1.name = "Essay draft"
+        self.t1.save()
+        self.s2025.name = "Programming 1"
+        self.s2025.save()
+        self.user.last_name = "Lee"
+        self.user.save()
+
+        row = TemplateSummary.objects.get(templateId=self.t1)
+        self.assertEqual(row.name, "Essay draft")
+        self.assertEqual(row.subjectName, "Programming 1")
+        self.assertEqual(row.ownerName, "Cara Lee")
+
+        self.t1.delete()
+        self.assertFalse(TemplateSummary.objects.filter(templateId=self.t1.pk).exists())
+
+    def test_summary_templates_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("summarise_templates"), {"username": "coord"})
+        rows = response.json()["templates"]
+        self.assertEqual([(r["name"], r["version"]) for r in rows], [("Essay", 0), ("Essay", 1), ("Exam", 0), ("Quiz", 0)])
+        self.assertEqual(rows[0]["ownerName"], "Cara Coord")
+        self.assertEqual(rows[0]["subjectCode"], "COMP1000")
+        self.assertIs(rows[3]["isPublishable"], False)
+
+    def test_summary_templates_unknown_user(self):
+        response = self.client.get(reverse("summarise_templates"), {"username": "nobody"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_subjects_with_templates_groups_by_offering(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("subjects_templates"), {"username": "coord"})
+        subjects = response.json()["subjects"]
+        self.assertEqual(
+            [(s["subject"]["subjectCode"], s["subject"]["year"], s["templatesCount"]) for s in subjects],
+            [("COMP1000", 2025, 2), ("FINM7403", 2025, 1), ("COMP1000", 2024, 1)],
+        )
+        self.assertEqual([t["version"] for t in subjects[0]["templates"]], [1, 0])
+
+    def test_templates_for_subject(self):
+        response = self.client.get(reverse("template_for_subject"), {"username": "coord", "subjectCode": "COMP1000"})
+        data = response.json()
+        self.assertEqual(data["subject"]["year"], 2025)
+        self.assertEqual(data["templatesCount"], 3)
+
+        response = self.client.get(
+            reverse("template_for_subject"), {"username": "coord", "subjectCode": "COMP1000", "year": 2024}
+        )
+        self.assertEqual([t["name"] for t in response.json()["templates"]], ["Exam"])
+
+        response = self.client.get(reverse("template_for_subject"), {"username": "other", "subjectCode": "COMP1000"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_rebuild_matches_incremental_maintenance(self):
+        before = list(TemplateSummary.objects.order_by("pk").values())
+        self.assertEqual(summaries.rebuild_summaries(), 5)
+        self.assertEqual(list(TemplateSummary.objects.order_by("pk").values()), before)
+
+    def test_failed_rebuild_keeps_the_old_rows(self):
+        before = list(TemplateSummary.objects.order_by("pk").values())
+        bulk_create = TemplateSummary.objects.bulk_create
+        calls = iter([bulk_create, mock.Mock(side_effect=RuntimeError("lost connection"))])
+        with mock.patch.object(TemplateSummary.objects, "bulk_create", side_effect=lambda rows: next(calls)(rows)):
+            with self.assertRaises(RuntimeError):
+                summaries.rebuild_summaries(batch_size=2)
+        self.assertEqual(list(TemplateSummary.objects.order_by("pk").values()), before)
+
+
+class StreamingListingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="power", first_name="Pat", last_name="Power")
+        subjects = [Subject.objects.create(subjectCode=f"COMP{n}", semester=1, year=2020 + n) for n in range(3)]
+        for version in range(12):
+            Template.objects.create(ownerId=self.user, name="Lineage", version=version, subject=subjects[version % 3])
+
+    def _stream(self, url_name, **params):
+        response = self.client.get(reverse(url_name), {"username": "power", "stream": "true", **params})
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_streamed_body_matches_buffered_body(self):
+        for url_name in ("summarise_templates", "subjects_templates"):
+            with self.subTest(url=url_name):
+                buffered = self.client.get(reverse(url_name), {"username": "power"}).json()
+                self.assertEqual(self._stream(url_name), buffered)
+
+    def test_streams_in_bounded_chunks(self):
+        response = _stream_json("rows", iter(range(12)), chunk_size=5)
+        chunks = list(response.streaming_content)
+        # opening bracket, two full chunks, then the remainder with the closing bracket
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(json.loads(b"".join(chunks)), {"rows": list(range(12))})
+
+    def test_unknown_user_is_404_before_streaming(self):
+        response = self.client.get(reverse("summarise_templates"), {"username": "nobody", "stream": "true"})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.streaming)
+
+
+class FixtureLoadTests(TestCase):
+    def test_loaddata_skips_receivers_and_rebuild_catches_up(self):
+        call_command("loaddata", "ai_scale_app/table_data/dummy_data.json", stdout=StringIO())
+        self.assertFalse(TemplateSummary.objects.exists())
+        self.assertFalse(SystemCounter.objects.exists())
+
+        call_command("rebuild_read_models", stdout=StringIO())
+        self.assertEqual(TemplateSummary.objects.count(), Template.objects.count())
+        self.assertEqual(counters.read()[counters.TEMPLATES], Template.objects.count())
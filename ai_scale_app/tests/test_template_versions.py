@@ -0,0 +1,103 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ai_scale_app.models import User, Subject, Template, TemplateOwnership
+
+# run this by python manage.py test ai_scale_app.tests.test_template_versions
+
+
+class TemplateVersionListingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.subject = Subject.objects.create(subjectCode="COMP1234", semester=1, year=2025)
+        self.other_subject = Subject.objects.create(subjectCode="COMP1234", semester=2, year=2025)
+        self.v0 = Template.objects.create(ownerId=self.user, name="Guidelines", subject=self.subject, version=0)
+
+    def _add_versions(self, upto):
+        start = Template.objects.filter(name="Guidelines", subject=self.subject).count()
+        Template.objects.bulk_create(
+            Template(ownerId=self.user, name="Guidelines", subject=self.subject, version=v) for v in range(start, upto)
+        )
+
+    def _list(self, **params):
+        return self.client.get(reverse("template_versions"), params or {"template_id": self.v0.id})
+
+    def test_lists_versions_of_the_same_lineage(self):
+        self._add_versions(3)
+        # a same-named template in another subject or of another owner is a different lineage
+        Template.objects.create(ownerId=self.user, name="Guidelines", subject=self.other_subject, version=7)
+        stranger = User.objects.create(username="stranger")
+        Template.objects.create(ownerId=stranger, name="Guidelines", subject=self.subject, version=8)
+
+        body = self._list().json()
+        self.assertEqual(body["meta"], {"name": "Guidelines", "subject": {"code": "COMP1234", "semester": 1, "year": 2025}})
+        versions = list(Template.objects.filter(ownerId=self.user, subject=self.subject).order_by("version").values_list("id", "version"))
+        self.assertEqual([(v["templateId"], v["version"]) for v in body["versions"]], versions)
+
+    def test_subject_params_override_the_starting_template(self):
+        other = Template.objects.create(ownerId=self.user, name="Guidelines", subject=self.other_subject, version=4)
+        body = self._list(template_id=self.v0.id, semester=2).json()
+        self.assertEqual(body["versions"], [{"templateId": other.id, "version": 4}])
+        self.assertEqual(body["meta"]["subject"]["semester"], 2)
+
+    def test_starting_template_without_subject_matches_any_subject(self):
+        loose = Template.objects.create(ownerId=self.user, name="Guidelines", version=1)
+        body = self._list(template_id=loose.id).json()
+        self.assertEqual([v["version"] for v in body["versions"]], [0, 1])
+
+    def test_errors(self):
+        self.assertEqual(self._list(template_id=999999).status_code, 404)
+        self.assertEqual(self._list(template_id="abc").status_code, 404)
+        self.assertEqual(self.client.get(reverse("template_versions")).status_code, 400)
+        self.assertEqual(self._list(name="Guidelines", year="soon").status_code, 400)
+        # the template exists but nothing matches the overridden subject
+        body = self._list(template_id=self.v0.id, year=1999).json()
+        self.assertEqual(body, {"meta": {"name": "Guidelines", "subject": {"code": None, "semester": None, "year": None}}, "versions": []})
+
+    def test_latest_template_wins_within_a_version(self):
+        TemplateOwnership.objects.create(templateId=self.v0, ownerId=self.user)
+        # same name and version under another owner, shared with this user
+        stranger = User.objects.create(username="stranger")
+        newer = Template.objects.create(ownerId=stranger, name="Guidelines", subject=self.subject, version=0)
+        TemplateOwnership.objects.create(templateId=newer, ownerId=self.user)
+        self.client.force_login(self.user)
+        body = self._list(name="Guidelines").json()
+        self.assertEqual(body["versions"], [{"templateId": newer.id, "version": 0}])
+
+    def test_one_query_however_many_versions(self):
+        for upto in (1, 25, 200):
+            self._add_versions(upto)
+            with self.subTest(versions=upto):
+                with self.assertNumQueries(1):
+                    response = self._list()
+                self.assertEqual(len(response.json()["versions"]), upto)
+
+    def test_conditional_get_reuses_the_listing_query(self):
+        self._add_versions(10)
+        etag = self._list()["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("template_versions"), {"template_id": self.v0.id}, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_listings_read_an_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("query plan check is SQLite specific")
+        self._add_versions(50)
+        for version in range(50):
+            TemplateOwnership.objects.create(templateId=Template.objects.get(subject=self.subject, version=version), ownerId=self.user)
+        self.client.force_login(self.user)
+        lookups = {
+            # the starting template's owner and name: the unique (ownerId, name, version) index
+            "ai_scale_app_template_ownerId_id_name_version": {"template_id": self.v0.id},
+            "ai_scale_ap_name_39c468_idx": {"name": "Guidelines", "subjectCode": "COMP1234", "semester": 1, "year": 2025},
+        }
+        for index, params in lookups.items():
+            with self.subTest(**params):
+                with CaptureQueriesContext(connection) as ctx:
+                    self._list(**params)
+                sql = next(q["sql"] for q in ctx.captured_queries if "ROW_NUMBER" in q["sql"])
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                    plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+                self.assertIn(f"SEARCH ai_scale_app_template USING INDEX {index}", plan)
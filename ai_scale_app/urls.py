@@ -1,11 +1,11 @@
 # ai_scale_app/urls.py
 from django.urls import path
 from . import views
-from .views import community_templates
 
 urlpatterns = [
     path("", views.index, name="index"),
     path("api/health/", views.health_check, name="health_check"),
+    path("metrics/", views.prometheus_metrics, name="metrics"),
     path("username/", views.user_details, name="user_details"),
     path("auth/login/", views.user_login, name="login"),
     path("auth/register/", views.register, name="register"),
@@ -14,8 +14,14 @@ urlpatterns = [
     path(
         "templateitem/update/", views.update_template_item, name="update_template_item"
     ),
+    path(
+        "templateitem/bulk_update/",
+        views.bulk_update_template_items,
+        name="bulk_update_template_items",
+    ),
     path("template/summary/", views.summary_templates, name="summarise_templates"),
     path("template/details/", views.template_details, name="template_details"),
+    path("template/details/batch/", views.template_details_batch, name="template_details_batch"),
     path("template/delete/", views.delete_template, name="delete_template"),
     path("template/duplicate/", views.duplicate_template, name="duplicate_template"),
     path("session/", views.curr_user_session, name="user_session"),
@@ -36,6 +42,9 @@ urlpatterns = [
     path("system-overview/", views.system_overview, name="system-overview"),
     path("system-overview/", views.system_overview, name="system-overview"),
     path("recent-activity/", views.recent_activity, name="recent-activity"),
-    path("api/community/templates/", community_templates, name="community-templates"),
-    path("api/templates/versions/", views.list_template_versions, name="template_versions")
+    path("api/community/templates/", views.community_templates, name="community-templates"),
+    path("api/templates/versions/", views.list_template_versions, name="template_versions"),
+    path("api/templates/diff/", views.template_version_diff, name="template_version_diff"),
+    path("api/ai-use-scales/", views.ai_use_scales, name="ai_use_scales"),
+    path("api/audit/archive/", views.audit_archive, name="audit_archive"),
 ]
@@ -1,24 +1,42 @@
-from django.http import JsonResponse, HttpResponse
-from django.views.decorators.http import require_GET, require_POST
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.views.decorators.http import require_GET, require_POST, condition
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
 from django.db import transaction, IntegrityError
 from django.contrib.auth import authenticate, login as auth_login
-from .models import User, Subject, Template, TemplateItem, TemplateOwnership, Enrolment, AIUseScale
+from .models import (
+    User, Subject, Template, TemplateItem, TemplateOwnership, TemplateSummary, Enrolment, AIUseScale,
+    COMMUNITY_LISTED,
+)
+from . import archive, audit, caches, counters, metrics, scales, search
+from django.core.cache import cache
 from http import HTTPStatus
 from django.contrib.auth import logout as auth_logout
 from django.conf import settings
 from django.middleware.csrf import get_token
+import base64
+import hashlib
+import hmac
 import json
 import logging
+import re
+from itertools import groupby
+from operator import itemgetter
 from django.db import IntegrityError
 import traceback
 from django.db.models import Max
 from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
 from django.views.decorators.csrf import csrf_protect, ensure_csrf_cookie
-from django.db.models import Q, Max, Exists, OuterRef
+from django.db.models import Q, F, Max, Count, Exists, OuterRef, Prefetch, Subquery, Value, IntegerField, Window
+from django.db.models.functions import Cast, FirstValue, Length, RowNumber, Substr
 from django.views.decorators.http import require_GET
 from .models import Template
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.utils.timezone import now
+from datetime import timedelta, timezone as dt_timezone
 from .models import AuditLog
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -46,6 +64,22 @@ def health_check(request):
     }
     return JsonResponse(data, status=HTTPStatus.OK)
 
+# GET /metrics/
+# Per-endpoint latency, SQL and response size histograms in Prometheus text format
+@require_GET
+def prometheus_metrics(request):
+    """
+    Scrape endpoint for the request metrics. Requires the settings.METRICS_TOKEN bearer token;
+    without a token configured it is only served with DEBUG on.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return JsonResponse({"error": "Metrics are disabled (METRICS_TOKEN is not set)"}, status=HTTPStatus.FORBIDDEN)
+    elif not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return JsonResponse({"error": "Unauthorized"}, status=HTTPStatus.UNAUTHORIZED)
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE_LATEST)
+
 # ---- HELPER FUNCTIONS ---- #
 def _has_field(model, name: str) -> bool:
     try:
@@ -57,9 +91,16 @@ def _has_field(model, name: str) -> bool:
 def resolve_ai_use_level(use_scale_name):
     """
     Accepts an AIUseScale name and resolves it to an AIUseScale object
+    (served from the in-process catalogue, see scales.py)
+    """
+    return scales.resolve([use_scale_name])[use_scale_name]
+
+def resolve_ai_use_levels(use_scale_names) -> dict:
+    """
+    Batch version of resolve_ai_use_level: maps each name to its AIUseScale, creating
+    missing ones. Known names cost no queries at all.
     """
-    a, _ = AIUseScale.objects.get_or_create(name=use_scale_name)
-    return a
+    return scales.resolve(use_scale_names)
 
 def _body(request) -> dict:
     """
@@ -73,6 +114,16 @@ def _body(request) -> dict:
             return {}
     return request.POST.dict()
 
+def _acting_user(request, fallback=None):
+    """
+    The user an audited change is attributed to: the session user, else fallback
+    (e.g. the user named in the request body)
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    return fallback
+
 def _get_rid_of_escape_char(s):
     """
     Unescape for strings e.g. \"
@@ -207,6 +258,8 @@ def register(request):
             last_name=data.get("last_name", ""),
             role=role,
         )
+        # attributed to the new user: registration is self-service, and reading request.user would cost a session query
+        audit.record(user, "CREATE", "User", user.id, {"name": user.username, "role": role})
         return JsonResponse({"success": True, "user": {"username": user.username}},
                             status=HTTPStatus.CREATED)
     except Exception as e:
@@ -284,9 +337,13 @@ def create_or_update_template(request):
     # 4) Subject lookup / create (atomic)
     with transaction.atomic():
         try:
-            subject = Subject.objects.get(subjectCode=subject_code, year=year, semester=semester)
-        except Subject.DoesNotExist:
-            subject = Subject.objects.create(subjectCode=subject_code, year=year, semester=semester, name="")
+            # get_or_create re-reads the row when a concurrent save created it first (unique constraint)
+            subject, subject_created = Subject.objects.get_or_create(
+                subjectCode=subject_code, year=year, semester=semester, defaults={"name": ""},
+            )
+            if subject_created:
+                audit.record(_acting_user(request, owner), "CREATE", "Subject", subject.id,
+                             {"name": subject_code, "year": year, "semester": semester})
         except MultipleObjectsReturned:
             subject = (
                 Subject.objects
@@ -339,6 +396,8 @@ def create_or_update_template(request):
             for k, v in base_kwargs.items():
                 setattr(tpl, k, v)
             tpl.save()
+            audit.record(_acting_user(request, owner), "UPDATE", "Template", tpl.id,
+                         {"name": tpl.name, "version": tpl.version})
             return JsonResponse({"templateId": tpl.id, "version": getattr(tpl, "version", 0)})
 
         # No template_id => create-or-update by unique triple
@@ -356,6 +415,8 @@ def create_or_update_template(request):
                 if k not in lookup:
                     setattr(tpl, k, v)
             tpl.save()
+        audit.record(_acting_user(request, owner), "CREATE" if created else "UPDATE", "Template", tpl.id,
+                     {"name": tpl.name, "version": tpl.version})
         return JsonResponse({"templateId": tpl.id, "version": getattr(tpl, "version", 0)})
 
     except IntegrityError:
@@ -367,6 +428,8 @@ def create_or_update_template(request):
         # also update lookup for the new version
         try:
             tpl = Template.objects.create(**base_kwargs)
+            audit.record(_acting_user(request, owner), "CREATE", "Template", tpl.id,
+                         {"name": tpl.name, "version": tpl.version})
             return JsonResponse({"templateId": tpl.id, "version": getattr(tpl, "version", next_ver)})
         except Exception as e:
             return JsonResponse({"error": f"Unexpected error after bumping version: {e}"}, status=400)
@@ -411,53 +474,258 @@ def update_template_item(request):
         logger.exception("Failed to create template item")
         return JsonResponse({"error": f"{type(e).__name__}: {e}"}, status=HTTPStatus.BAD_REQUEST)
 
-# GET /template/summary/?username=...
+# Item fields a bulk save may set (besides id and the AI use level)
+BULK_ITEM_FIELDS = ["task", "aiUseScaleLevel", "instructionsToStudents", "examples", "aiGeneratedContent", "useAcknowledgement"]
+
+# POST /templateitem/bulk_update/
+# body {templateId, items: [{id?, task, aiUseScaleLevel_name, instructionsToStudents, examples, aiGeneratedContent, useAcknowledgement}, ...]}
+# items is the template's complete desired item list: entries with an id update that item, entries
+# without one are created, and existing items left out of the list are deleted
+@require_POST
+def bulk_update_template_items(request):
+    """
+    Saves all items of a template in one transaction with a constant number of statements
+    (bulk_create / bulk_update / one DELETE), whatever the number of items
+    """
+    data = _body(request)
+    items = data.get("items")
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return JsonResponse({"error": "items must be a list of objects"}, status=HTTPStatus.BAD_REQUEST)
+
+    try:
+        template_id = int(data.get("templateId"))
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "templateId is required"}, status=HTTPStatus.BAD_REQUEST)
+
+    wanted_ids = []
+    for entry in items:
+        if entry.get("id") in (None, ""):
+            continue
+        try:
+            wanted_ids.append(int(entry["id"]))
+        except (TypeError, ValueError):
+            return JsonResponse({"error": f"Invalid item id: {entry['id']}"}, status=HTTPStatus.BAD_REQUEST)
+    if len(wanted_ids) != len(set(wanted_ids)):
+        return JsonResponse({"error": "Duplicate item ids"}, status=HTTPStatus.BAD_REQUEST)
+
+    def _level_name(entry):
+        return (entry.get("aiUseScaleLevel_name") or entry.get("aiUseScaleLevel") or "").strip()
+
+    # resolved before the transaction so the in-process scale catalogue can serve (and keep) them
+    levels = resolve_ai_use_levels(n for n in map(_level_name, items) if n)
+
+    with transaction.atomic():
+        try:
+            tpl = Template.objects.select_for_update().get(pk=template_id)
+        except Template.DoesNotExist:
+            return JsonResponse({"error": "Template does not exist"}, status=HTTPStatus.NOT_FOUND)
+
+        existing = {i.id: i for i in TemplateItem.objects.filter(templateId=tpl)}
+        unknown = set(wanted_ids) - existing.keys()
+        if unknown:
+            return JsonResponse(
+                {"error": f"Items {sorted(unknown)} do not belong to template {tpl.id}"},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+
+        to_create, to_update = [], []
+        for entry in items:
+            fields = {
+                "task": (entry.get("task") or "").strip(),
+                "aiUseScaleLevel": levels.get(_level_name(entry)),
+                "instructionsToStudents": entry.get("instructionsToStudents") or "",
+                "examples": entry.get("examples") or "",
+                "aiGeneratedContent": entry.get("aiGeneratedContent") or "",
+                "useAcknowledgement": bool(entry.get("useAcknowledgement")),
+            }
+            if entry.get("id") in (None, ""):
+                to_create.append(TemplateItem(templateId=tpl, **fields))
+            else:
+                item = existing[int(entry["id"])]
+                for k, v in fields.items():
+                    setattr(item, k, v)
+                to_update.append(item)
+
+        to_delete = existing.keys() - set(wanted_ids)
+        if to_delete:
+            # one statement, no per-row signals; the template is touched and reindexed once below instead
+            TemplateItem.objects.filter(pk__in=to_delete).delete_without_signals()
+        if to_update:
+            TemplateItem.objects.bulk_update(to_update, BULK_ITEM_FIELDS)
+        if to_create:
+            TemplateItem.objects.bulk_create(to_create)
+
+        # bulk operations skip the model signals, so refresh what they would have
+        Template.touch([tpl.id])
+        search.index_templates([tpl.id])
+        audit.record(_acting_user(request), "UPDATE", "Template", tpl.id, {
+            "items": {"created": len(to_create), "updated": len(to_update), "deleted": len(to_delete)},
+        })
+
+    saved = sorted(to_update + to_create, key=lambda i: i.id)
+    return JsonResponse({
+        "success": True,
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+        "items": [_template_item_row(i) for i in saved],
+    }, status=HTTPStatus.OK)
+
+# Columns of TemplateSummary returned for each template by the "my templates" views
+SUMMARY_ROW_FIELDS = (
+    "templateId", "name", "version", "subjectCode", "year", "semester", "ownerName", "isPublishable",
+)
+
+def _summary_row(row: dict) -> dict:
+    row["isPublishable"] = bool(row["isPublishable"])
+    row["isTemplate"] = True
+    return row
+
+# Rows fetched per database round trip (and encoded per write) when a listing is streamed
+STREAM_CHUNK_SIZE = 500
+
+def _wants_stream(request) -> bool:
+    return (request.GET.get("stream") or "false").lower() in {"1", "true", "yes"}
+
+def _stream_json(key: str, items, chunk_size: int = STREAM_CHUNK_SIZE) -> StreamingHttpResponse:
+    """
+    Streams the JSON object {key: [item, ...]} while items is being iterated, encoding
+    chunk_size items per write so memory stays flat however long the list is.
+    items may be an async iterable, which an ASGI server consumes without a worker thread.
+    """
+    def generate():
+        yield "{" + json.dumps(key) + ": ["
+        buffer = []
+        first = True
+        for item in items:
+            buffer.append(("" if first else ",") + json.dumps(item, cls=DjangoJSONEncoder))
+            first = False
+            if len(buffer) >= chunk_size:
+                yield "".join(buffer)
+                buffer = []
+        buffer.append("]}")
+        yield "".join(buffer)
+
+    async def agenerate():
+        yield "{" + json.dumps(key) + ": ["
+        buffer = []
+        first = True
+        async for item in items:
+            buffer.append(("" if first else ",") + json.dumps(item, cls=DjangoJSONEncoder))
+            first = False
+            if len(buffer) >= chunk_size:
+                yield "".join(buffer)
+                buffer = []
+        buffer.append("]}")
+        yield "".join(buffer)
+
+    content = agenerate() if hasattr(items, "__aiter__") else generate()
+    return StreamingHttpResponse(content, content_type="application/json", status=HTTPStatus.OK)
+
+# GET /template/summary/?username=...[&stream=true]
 # returns summary of all templates owned by that user, includes all previous versions of the same template too
 # returns:   templateId, Template name, version, subject code, subject year, semester, owner name, isPublishable, isTemplate
+# stream=true sends the same body incrementally (for users with thousands of versions)
 @require_GET
 def summary_templates(request):
     """
-    Gives overview of all templates owned by requested user and displays their respective summary details
+    Gives overview of all templates owned by requested user and displays their respective summary details.
+    Reads the TemplateSummary read model only (one indexed query).
     """
     username = request.GET.get("username")
 
-    try:
-        user = User.objects.get(username=username)
-    except User.DoesNotExist:
-        return JsonResponse({"error": "User does not exist"}, status=HTTPStatus.NOT_FOUND)
-
-    relevant_templates = (
-        Template.objects
-        .filter(ownerId=user)
-        .select_related("ownerId")
-        .order_by("name", "version")  
+    rows = (
+        TemplateSummary.objects
+        .filter(ownerUsername=username)
+        .order_by("name", "version")
+        .values(*SUMMARY_ROW_FIELDS)
     )
 
-    # Helper function to get the full owner name by its id in Template
-    def get_full_owner_name(t: Template) -> str:
-        user_info = getattr(t, "ownerId", None)
-        return f"{user_info.first_name} {user_info.last_name}".strip()
+    if _wants_stream(request):
+        # The status line goes out before any row is read, so check the user up front
+        if not User.objects.filter(username=username).exists():
+            return JsonResponse({"error": "User does not exist"}, status=HTTPStatus.NOT_FOUND)
+        if isinstance(request, ASGIRequest):
+            items = (_summary_row(row) async for row in rows.aiterator(chunk_size=STREAM_CHUNK_SIZE))
+        else:
+            # a WSGI server can only drain an async iterator by buffering all of it first
+            items = map(_summary_row, rows.iterator(chunk_size=STREAM_CHUNK_SIZE))
+        return _stream_json("templates", items)
 
-    response_rows = []
-    for t in relevant_templates:
-        response_rows.append({
-            "templateId": t.id,
-            "name": t.name,
-            "version": t.version,
-            "subjectCode": t.subject.subjectCode,
-            "year": t.subject.year,
-            "semester": t.subject.semester,
-            "ownerName": get_full_owner_name(t),
-            "isPublishable": bool(t.isPublishable),
-            "isTemplate": True,
-        })
+    response_rows = [_summary_row(row) for row in rows]
+
+    # Only an empty result needs telling apart "no templates" from "no such user"
+    if not response_rows and not User.objects.filter(username=username).exists():
+        return JsonResponse({"error": "User does not exist"}, status=HTTPStatus.NOT_FOUND)
 
     return JsonResponse({"templates": response_rows}, status=HTTPStatus.OK)
 
 
+# Upper bound on how many templates a single batch details request may ask for
+MAX_TEMPLATE_BATCH = 50
+
+def _template_item_row(item: TemplateItem) -> dict:
+    """
+    Serialises a TemplateItem into the same row shape template_details returns
+    """
+    level = item.aiUseScaleLevel
+    return {
+        "id": item.id,
+        "task": item.task,
+        "instructionsToStudents": _get_rid_of_escape_char(item.instructionsToStudents),
+        "examples": _get_rid_of_escape_char(item.examples),
+        "aiGeneratedContent": item.aiGeneratedContent,
+        "useAcknowledgement": item.useAcknowledgement,
+        "aiUseScaleLevel_id": item.aiUseScaleLevel_id,
+        "aiUseScaleLevel__name": level.name if level else None,
+    }
+
+def _template_details_payload(t: Template, template_items: list) -> dict:
+    """
+    Builds the template details response body from a template (with subject loaded) and its item rows
+    """
+    subject = t.subject
+    return {
+        "id": t.id,
+        "name": t.name,
+        "version": t.version,
+        "ownerId": t.ownerId_id,
+        "subject": {
+            "id": t.subject_id,
+            "code": subject.subjectCode if subject else None,
+            "name": subject.name if subject else None,
+            "year": subject.year if subject else None,
+            "semester": subject.semester if subject else None,
+        },
+        "scope": t.scope,
+        "description": t.description,
+        "isPublishable": t.isPublishable,
+        "isTemplate": True,
+        "template_items": template_items,
+    }
+
+def _template_details_etag(request):
+    """
+    Strong validator for template_details: the template id plus its updatedAt stamp,
+    read with a single primary key lookup so a 304 never loads items.
+    """
+    try:
+        stamp = (
+            Template.objects.filter(pk=int(request.GET.get("templateId")))
+            .values_list("updatedAt", flat=True)
+            .first()
+        )
+    except (TypeError, ValueError):
+        return None
+    if stamp is None:
+        return None
+    return f"{request.GET.get('templateId')}-{stamp.timestamp():.6f}"
+
 # GET template/details/?templateId=...
 # returns all template details by its templateID, includes template info, template items, subject info
+# supports If-None-Match: answers 304 when the template has not changed since the given ETag
 @require_GET
+@condition(etag_func=_template_details_etag)
 def template_details(request):
     template_id = request.GET.get("templateId")
 
@@ -467,44 +735,86 @@ def template_details(request):
         return JsonResponse({"error": "Template does not exist"}, status=HTTPStatus.NOT_FOUND)
 
     # Get relevant template items
-    template_items = list(
+    items = (
         TemplateItem.objects.filter(templateId=t)
         .select_related("aiUseScaleLevel")
         .values(
             "id",
-            "task",
-            "instructionsToStudents",
-            "examples",
-            "aiGeneratedContent",
             "useAcknowledgement",
             "aiUseScaleLevel_id",
-            "aiUseScaleLevel__name",   
+            "aiUseScaleLevel__name",
+            # item text is stored once per distinct content (ItemContent)
+            task=F("content__task"),
+            instructionsToStudents=F("content__instructionsToStudents"),
+            examples=F("content__examples"),
+            aiGeneratedContent=F("content__aiGeneratedContent"),
         )
     )
+    template_items = list(items)
 
 
     for i in template_items:
         i["instructionsToStudents"] = _get_rid_of_escape_char(i.get("instructionsToStudents"))
         i["examples"] = _get_rid_of_escape_char(i.get("examples"))
         
-    return JsonResponse({
-        "id": t.id,
-        "name": t.name,
-        "version": t.version,
-        "ownerId": t.ownerId_id,
-        "subject": {
-            "id": t.subject_id,
-            "code": t.subject.subjectCode,
-            "name": t.subject.name,
-            "year": t.subject.year,
-            "semester": t.subject.semester
-        },
-        "scope": t.scope,
-        "description": t.description,
-        "isPublishable": t.isPublishable,
-        "isTemplate": True,
-        "template_items": template_items,
-    }, status=HTTPStatus.OK)
+    return JsonResponse(_template_details_payload(t, template_items), status=HTTPStatus.OK)
+
+
+# GET template/details/batch/?templateIds=1,2,3   (repeated ?templateId=... is accepted too)
+# returns the details of many templates in one round trip, using a fixed number of queries
+@require_GET
+def template_details_batch(request):
+    """
+    Multi-get version of template_details. Unknown or invalid ids are reported
+    per id under "errors" instead of failing the whole batch.
+    """
+    raw_ids = []
+    for value in request.GET.getlist("templateIds") + request.GET.getlist("templateId"):
+        raw_ids.extend(part.strip() for part in value.split(",") if part.strip())
+
+    if not raw_ids:
+        return JsonResponse({"error": "templateIds is required"}, status=HTTPStatus.BAD_REQUEST)
+
+    # Keep the requested order but only look each id up once
+    requested = list(dict.fromkeys(raw_ids))
+    if len(requested) > MAX_TEMPLATE_BATCH:
+        return JsonResponse(
+            {"error": f"At most {MAX_TEMPLATE_BATCH} templates can be requested at once"},
+            status=HTTPStatus.BAD_REQUEST,
+        )
+
+    errors = []
+    wanted = {}
+    for raw in requested:
+        try:
+            wanted[raw] = int(raw)
+        except ValueError:
+            errors.append({"templateId": raw, "error": "Invalid templateId"})
+
+    # One query for the templates and one for all of their items (with the AI use level joined in)
+    templates = (
+        Template.objects
+        .filter(pk__in=set(wanted.values()))
+        .select_related("subject", "ownerId")
+        .prefetch_related(
+            Prefetch(
+                "templateitem_set",
+                queryset=TemplateItem.objects.select_related("aiUseScaleLevel", "content").order_by("id"),
+            )
+        )
+    )
+    by_id = {t.id: t for t in templates}
+
+    results = []
+    for raw, pk in wanted.items():
+        t = by_id.get(pk)
+        if t is None:
+            errors.append({"templateId": raw, "error": "Template does not exist"})
+            continue
+        items = [_template_item_row(item) for item in t.templateitem_set.all()]
+        results.append(_template_details_payload(t, items))
+
+    return JsonResponse({"templates": results, "errors": errors}, status=HTTPStatus.OK)
 
 
 
@@ -519,18 +829,62 @@ def delete_template(request):
         t = Template.objects.get(pk=int(template_id))
     except (ValueError, Template.DoesNotExist):
         return JsonResponse({"error": "Template does not exist"}, status=HTTPStatus.NOT_FOUND)
+    deleted_id = t.id
     t.delete()
+    audit.record(_acting_user(request), "DELETE", "Template", deleted_id, {"name": t.name, "version": t.version})
     return JsonResponse({"success": True}, status=HTTPStatus.OK)
 
+# Times duplicate_template re-allocates the "(N)" suffix when it loses a race for a name
+DUPLICATE_NAME_ATTEMPTS = 3
+
+# Columns copied from each item of the original template; the copy shares the original's text (ItemContent)
+DUPLICATED_ITEM_FIELDS = ("content_id", "aiUseScaleLevel_id", "useAcknowledgement")
+
+def _next_copy_number(user, base_name: str) -> int:
+    """
+    Next free N for a copy named "<base_name> (N)", as one MAX() aggregate over the owner's templates
+    """
+    prefix = f"{base_name} ("
+    number = Cast(
+        Substr("name", len(prefix) + 1, Length("name") - Value(len(prefix) + 1)),
+        IntegerField(),
+    )
+    highest = (
+        Template.objects
+        .filter(ownerId=user, name__startswith=prefix, name__regex=rf"^{re.escape(base_name)} \(\d+\)$")
+        .aggregate(mx=Max(number))["mx"]
+    )
+    return (highest or 0) + 1
+
+def _create_duplicate(original: Template, user, base_name: str) -> Template:
+    """
+    Copies a template (unpublished, named "<base> (N)") with its items to the user. The number of
+    statements does not grow with the number of items or of existing copies.
+    Must run inside a transaction.
+    """
+    new_template = Template.objects.create(
+        ownerId=user,                     
+        name=f"{base_name} ({_next_copy_number(user, base_name)})",
+        scope=original.scope,
+        description=original.description,
+        subject=original.subject,        
+        version=original.version,
+        isPublishable=False,
+        isTemplate=True,
+    )
+    TemplateOwnership.objects.create(templateId=new_template, ownerId=user)
+
+    TemplateItem.objects.bulk_create([
+        TemplateItem(templateId=new_template, **row)
+        for row in TemplateItem.objects.filter(templateId=original).order_by("id").values(*DUPLICATED_ITEM_FIELDS)
+    ])
+    # bulk_create skips the item signals; the template was indexed before it had items
+    search.index_templates([new_template.id])
+    return new_template
+
 @csrf_exempt
 @require_POST
 def duplicate_template(request):
-    from http import HTTPStatus
-    from django.db import transaction
-    from django.http import JsonResponse
-    import re
-
-    User = get_user_model()
     data = _body(request)
     template_id = data.get("templateId")
     username = data.get("username") or getattr(request.user, "username", None)
@@ -541,52 +895,22 @@ def duplicate_template(request):
         return JsonResponse({"error": "username is required"}, status=HTTPStatus.BAD_REQUEST)
 
     try:
-        from .models import Template, TemplateItem, TemplateOwnership
         user = User.objects.get(username=username) 
 
-        # Generated by ChatGPT
-        original = Template.objects.get(pk=int(template_id))
+        original = Template.objects.select_related("subject").get(pk=int(template_id))
         base_name = re.sub(r" \(\d+\)$", "", original.name or "")
 
-        existing_names = (Template.objects
-                          .filter(ownerId=user, name__startswith=base_name)
-                          .values_list("name", flat=True))
-        max_num = 0
-        for nm in existing_names:
-            m = re.search(r"\((\d+)\)$", nm or "")
-            if m: 
-                n = int(m.group(1))
-                if n > max_num: max_num = n
-        new_name = f"{base_name} ({max_num+1})"
-
-        with transaction.atomic():
-            new_template = Template.objects.create(
-                ownerId=user,                     
-                name=new_name,
-                scope=original.scope,
-                description=original.description,
-                subject=original.subject,        
-                version=original.version,
-                isPublishable=False,
-                isTemplate=True,
-            )
-
-            # If your join model uses fields named `template`/`owner`, change them here:
+        for attempt in range(DUPLICATE_NAME_ATTEMPTS):
             try:
-                TemplateOwnership.objects.create(templateId=new_template, ownerId=user)
-            except TypeError:
-                TemplateOwnership.objects.create(template=new_template, owner=user)
-
-            for item in TemplateItem.objects.filter(templateId=original):
-                TemplateItem.objects.create(
-                    templateId=new_template,     
-                    task=item.task,
-                    aiUseScaleLevel=item.aiUseScaleLevel,
-                    instructionsToStudents=item.instructionsToStudents,
-                    examples=item.examples,
-                    aiGeneratedContent=item.aiGeneratedContent,
-                    useAcknowledgement=item.useAcknowledgement,
-                )
+                with transaction.atomic():
+                    new_template = _create_duplicate(original, user, base_name)
+                break
+            except IntegrityError:
+                # Another duplicate took the same "(N)" name concurrently; allocate again
+                if attempt == DUPLICATE_NAME_ATTEMPTS - 1:
+                    raise
+        audit.record(_acting_user(request, user), "CREATE", "Template", new_template.id,
+                     {"name": new_template.name, "version": new_template.version, "duplicatedFrom": original.id})
 
         ownerName = f"{getattr(user,'first_name','')} {getattr(user,'last_name','')}".strip()
         return JsonResponse({
@@ -610,132 +934,158 @@ def duplicate_template(request):
 
 
 
-# GET /info/subjects_with_templates/?username=... 
+def _subject_groups(rows):
+    """
+    Groups summary rows (ordered so each subject's rows are adjacent) into
+    {subject, templates, templatesCount} entries, one subject at a time
+    """
+    for subject_id, group in groupby(rows, key=itemgetter("subjectId")):
+        templates = []
+        subject = None
+        for row in group:
+            subject_name = row.pop("subjectName")
+            del row["subjectId"]
+            if subject is None:
+                subject = {
+                    "id": subject_id,
+                    "name": subject_name,
+                    "subjectCode": row["subjectCode"],
+                    "year": row["year"],
+                    "semester": row["semester"],
+                }
+            templates.append(_summary_row(row))
+        yield {"subject": subject, "templates": templates, "templatesCount": len(templates)}
+
+# GET /info/subjects_with_templates/?username=...[&stream=true]
 @require_GET
 def subjects_with_templates(request):
     """
     Returns subjects taught by the user that have at least one template
     owned by the same user, plus a mini summary list of those templates.
+    As in enrolment_teaching, 'taught' = subjects that have at least one template owned by this user.
     """
     username = request.GET.get("username")
     if not username:
         return JsonResponse({"error": "username is required"}, status=HTTPStatus.BAD_REQUEST)
 
-    include_empty = (request.GET.get("include_empty") or "false").lower() in {"1", "true", "yes"}
-
-    try:
-        user = User.objects.get(username=username)
-    except User.DoesNotExist:
-        return JsonResponse({"error": "User not found"}, status=HTTPStatus.NOT_FOUND)
-
-    # Subjects taught by this user
-    taught_qs = Subject.objects.filter(coordinatorId=user).only(
-        "id", "name", "subjectCode", "year", "semester"
+    # Newest offerings first; id breaks ties so each subject's rows stay adjacent
+    rows = (
+        TemplateSummary.objects
+        .filter(ownerUsername=username, subjectId__isnull=False)
+        .order_by("-year", "-semester", "subjectCode", "subjectId", "-version", "name")
+        .values("subjectId", "subjectName", *SUMMARY_ROW_FIELDS)
     )
 
-    # All templates owned by this user on those subjects
-    templates_qs = (
-        Template.objects
-        .filter(ownerId=user, subject__in=taught_qs)
-        .select_related("subject", "ownerId")
-        .only(
-            "id", "name", "version", "isPublishable", "isTemplate",
-            "subject__id", "subject__subjectCode", "subject__year", "subject__semester",
-            "ownerId__first_name", "ownerId__last_name"
-        )
-        .order_by("-subject__year", "-subject__semester", "-version", "name")
-    )
-
-    # Group templates by subjectCode 
-    by_code = {}
-    for t in templates_qs:
-        scode = t.subject.subjectCode
-        by_code.setdefault(scode, []).append({
-            "templateId": t.id,
-            "name": t.name,
-            "version": t.version,
-            "subjectCode": t.subject.subjectCode,
-            "year": t.subject.year,
-            "semester": t.subject.semester,
-            "isPublishable": bool(t.isPublishable),
-            "isTemplate": True,
-            "ownerName": f"{t.ownerId.first_name} {t.ownerId.last_name}".strip(),
-        })
+    if _wants_stream(request):
+        if not User.objects.filter(username=username).exists():
+            return JsonResponse({"error": "User not found"}, status=HTTPStatus.NOT_FOUND)
+        return _stream_json("subjects", _subject_groups(rows.iterator(chunk_size=STREAM_CHUNK_SIZE)))
 
-    payload = []
-    for s in taught_qs:
-        templates = by_code.get(s.subjectCode, [])
-        if not include_empty and not templates:
-            continue
-        payload.append({
-            "subject": {
-                "id": s.id,
-                "name": s.name,
-                "subjectCode": s.subjectCode,
-                "year": s.year,
-                "semester": s.semester,
-            },
-            "templates": templates,
-            "templatesCount": len(templates),
-        })
+    payload = list(_subject_groups(rows))
+    if not payload and not User.objects.filter(username=username).exists():
+        return JsonResponse({"error": "User not found"}, status=HTTPStatus.NOT_FOUND)
 
     return JsonResponse({"subjects": payload}, status=HTTPStatus.OK)
 
 
-# GET /template/for_subject/?username=...&subjectCode=...  
-# GET all of user's templates for one subject
+# GET /template/for_subject/?username=...&subjectCode=...[&year=...&semester=...]
+# GET all of user's templates for one subject (newest offering first)
 @require_GET
 def templates_for_subject(request):
     username = request.GET.get("username")
     subject_code = request.GET.get("subjectCode")
+    if not username or not subject_code:
+        return JsonResponse({"error": "username and subjectCode are required"}, status=HTTPStatus.BAD_REQUEST)
 
-    user = User.objects.get(username=username)
-
-    try:
-        # Optional: restrict to subjects they teach
-        subject = Subject.objects.get(subjectCode=subject_code, coordinatorId=user)
-    except Subject.DoesNotExist:
-        # If you prefer to allow templates even when they don't coordinate, remove coordinatorId=user above
-        return JsonResponse({"error": "Subject not found or not coordinated by user"}, status=HTTPStatus.NOT_FOUND)
+    qs = TemplateSummary.objects.filter(ownerUsername=username, subjectCode=subject_code)
+    for param in ("year", "semester"):
+        value = request.GET.get(param)
+        if value:
+            try:
+                qs = qs.filter(**{param: int(value)})
+            except ValueError:
+                return JsonResponse({"error": f"Invalid '{param}'"}, status=HTTPStatus.BAD_REQUEST)
 
-    tqs = (
-        Template.objects
-        .filter(ownerId=user, subject=subject)
-        .select_related("subject", "ownerId")
-        .only(
-            "id", "name", "version", "isPublishable", "isTemplate",
-            "subject__subjectCode", "subject__year", "subject__semester",
-            "ownerId__first_name", "ownerId__last_name"
-        )
-        .order_by("-year", "-semester", "-version", "name")
+    rows = list(
+        qs.order_by("-year", "-semester", "-version", "name")
+        .values("subjectId", "subjectName", *SUMMARY_ROW_FIELDS)
     )
-
-    rows = [{
-        "templateId": t.id,
-        "name": t.name,
-        "version": t.version,
-        "subjectCode": t.subject.subjectCode,
-        "year": t.subject.year,
-        "semester": t.subject.semester,
-        "isPublishable": bool(t.isPublishable),
-        "isTemplate": True,
-        "ownerName": f"{t.ownerId.first_name} {t.ownerId.last_name}".strip(),
-    } for t in tqs]
+    if not rows:
+        return JsonResponse({"error": "Subject not found or user has no templates for it"}, status=HTTPStatus.NOT_FOUND)
+
+    newest = rows[0]
+    subject = {
+        "id": newest["subjectId"],
+        "name": newest["subjectName"],
+        "subjectCode": newest["subjectCode"],
+        "year": newest["year"],
+        "semester": newest["semester"],
+    }
+    templates = []
+    for row in rows:
+        del row["subjectId"], row["subjectName"]
+        templates.append(_summary_row(row))
 
     return JsonResponse({
-        "subject": {
-            "id": subject.id,
-            "name": subject.name,
-            "subjectCode": subject.subjectCode,
-            "year": subject.year,
-            "semester": subject.semester,
-        },
-        "templates": rows,
-        "templatesCount": len(rows),
+        "subject": subject,
+        "templates": templates,
+        "templatesCount": len(templates),
     }, status=HTTPStatus.OK)
 
-@require_GET
-def community_templates(request):
+# Sort keys for each community listing order, over TemplateSummary (each has a matching index
+# there). The sort* columns hold ""/0 for templates without a subject so every row compares,
+# and the trailing template id makes every ordering total (needed for cursors).
+COMMUNITY_ORDERINGS = {
+    "recent": ("-sortYear", "-sortSemester", "name", "-version", "-pk"),
+    "name": ("name", "-version", "-pk"),
+    "subject": ("sortCode", "-sortYear", "-sortSemester", "name", "-version", "-pk"),
+    "oldest": ("sortYear", "sortSemester", "name", "version", "pk"),
+}
+
+def _encode_cursor(order: str, values: list) -> str:
+    """
+    Packs the sort key of the last row on a page into an opaque, url-safe cursor
+    """
+    raw = json.dumps({"o": order, "k": values}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str, order: str, orderings=COMMUNITY_ORDERINGS):
+    """
+    Inverse of _encode_cursor. Returns the sort key values, or None if the cursor is
+    malformed or was issued for a different ordering.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        values = data["k"]
+    except (ValueError, TypeError, KeyError):
+        return None
+    if data.get("o") != order or not isinstance(values, list) or len(values) != len(orderings[order]):
+        return None
+    return values
+
+def _after_keyset(ordering, values) -> Q:
+    """
+    Builds the "rows strictly after this sort key" predicate for a mixed asc/desc ordering:
+    (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... with < for descending keys.
+    """
+    after = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        clause = Q(**{f"{name}__{lookup}": values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            clause &= Q(**{prev_field.lstrip("-"): prev_value})
+        after |= clause
+    return after
+
+# Browse mode of community_templates:
+#   ?q=&subjectCode=&year=&semester=&owner=&order=recent|name|subject|oldest|relevance
+#   order defaults to relevance (BM25, offset mode only) when q is given, otherwise recent
+#   offset mode (default):  &limit=20&offset=0        -> {count, limit, offset, results}
+#   cursor mode:            &limit=20&cursor=<opaque>  -> {count, limit, nextCursor, results}
+#     pass an empty cursor for the first page; count is only computed when &count=true
+def browse_community_templates(request):
     """
     Public list of community templates (publishable + template)
     """
@@ -750,7 +1100,10 @@ def community_templates(request):
     year = _to_int(request.GET.get("year"))
     semester = _to_int(request.GET.get("semester"))
     owner = request.GET.get("owner")
-    order = (request.GET.get("order") or "recent").lower()
+    # searches default to best match first
+    order = (request.GET.get("order") or ("relevance" if q else "recent")).lower()
+    if order not in COMMUNITY_ORDERINGS and order != "relevance":
+        order = "recent"
 
     # Pagination 
     limit = _to_int(request.GET.get("limit"), 20)
@@ -762,90 +1115,112 @@ def community_templates(request):
     if offset is None or offset < 0:
         offset = 0
 
-    qs = (
-        Template.objects
-        .filter(isPublishable=True, isTemplate=True)
-        .select_related("subject", "ownerId")
-        .only(
-            "id", "name", "version", "isPublishable", "isTemplate",
-            "subject__subjectCode", "subject__year", "subject__semester",
-            "ownerId__username", "ownerId__first_name", "ownerId__last_name",
-            "description", "scope",
-        )
-    )
+    cursor_mode = "cursor" in request.GET
+    want_count = (request.GET.get("count") or "false").lower() in {"1", "true", "yes"}
 
-    # Generated by ChatGPT
-    # Free-text search
-    if q:
-        qs = qs.filter(
-            Q(name__icontains=q) |
-            Q(description__icontains=q) |
-            Q(subject__subjectCode__icontains=q) |
-            Q(ownerId__username__icontains=q) |
-            Q(ownerId__first_name__icontains=q) |
-            Q(ownerId__last_name__icontains=q)
-        )
+    def _row(t):
+        return {
+            "templateId": t.pk,
+            "name": t.name,
+            "version": t.version,
+            "subjectCode": t.subjectCode or "",
+            "year": t.year,
+            "semester": t.semester,
+            "ownerUsername": t.ownerUsername,
+            "ownerName": t.ownerName,
+            "isPublishable": t.isPublishable,
+            "isTemplate": True,
+        }
+
+    # Read from the TemplateSummary read model: it carries every column shown, and the sort keys
+    # with an index per order, so a page is an index range scan rather than a join and a sort
+    qs = TemplateSummary.objects.filter(COMMUNITY_LISTED)
 
     # Filters
     if subject_code:
-        qs = qs.filter(subject__subjectCode__iexact=subject_code)
+        qs = qs.filter(subjectCode__iexact=subject_code)
     if year is not None:
-        qs = qs.filter(subject__year=year)
+        qs = qs.filter(year=year)
     if semester is not None:
-        qs = qs.filter(subject__semester=semester)
+        qs = qs.filter(semester=semester)
     if owner:
-        qs = qs.filter(ownerId__username__iexact=owner)
+        qs = qs.filter(ownerUsername__iexact=owner)
+
+    # Relevance ranking comes from the search index and is only offered in offset mode. The
+    # filters above go into the ranked query, so rank and count cover only listable templates.
+    ranked = None
+    if order == "relevance" and not cursor_mode:
+        ranked = search.ranked_template_ids(q, qs, limit, offset)
+    if ranked is not None:
+        page_ids, count = ranked
+        by_id = {t.pk: t for t in qs.filter(pk__in=page_ids)} if page_ids else {}
+        return JsonResponse({
+            "count": count,
+            "limit": limit,
+            "offset": offset,
+            "results": [_row(by_id[pk]) for pk in page_ids if pk in by_id],
+        }, status=HTTPStatus.OK)
+    if order == "relevance":
+        order = "recent"
+
+    # Free-text search: the FTS index when available, otherwise a scan over the main text columns
+    if q:
+        text_match = search.search_filter(q)
+        if text_match is None:
+            # Generated by ChatGPT
+            text_match = (
+                Q(name__icontains=q) |
+                Q(templateId__description__icontains=q) |
+                Q(subjectCode__icontains=q) |
+                Q(ownerUsername__icontains=q) |
+                Q(ownerName__icontains=q)
+            )
+        qs = qs.filter(text_match)
 
     # Sort
-    if order == "name":
-        qs = qs.order_by("name", "-version")
-    elif order == "subject":
-        qs = qs.order_by("subject__subjectCode", "-subject__year", "-subject__semester", "name", "-version")
-    elif order == "oldest":
-        qs = qs.order_by("subject__year", "subject__semester", "name", "version")
-    else:  # 'recent'
-        qs = qs.order_by("-subject__year", "-subject__semester", "name", "-version")
+    ordering = COMMUNITY_ORDERINGS[order]
+    qs = qs.order_by(*ordering)
+
+    if cursor_mode:
+        # Keyset pagination: seek past the last row of the previous page instead of OFFSET-scanning to it
+        total = qs.count() if want_count else None
+        cursor = request.GET.get("cursor") or ""
+        if cursor:
+            after = _decode_cursor(cursor, order)
+            if after is None:
+                return JsonResponse({"error": "Invalid cursor"}, status=HTTPStatus.BAD_REQUEST)
+            qs = qs.filter(_after_keyset(ordering, after))
+
+        page = list(qs[:limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            last = page[-1]
+            next_cursor = _encode_cursor(order, [getattr(last, f.lstrip("-")) for f in ordering])
+
+        return JsonResponse({
+            "count": total,
+            "limit": limit,
+            "nextCursor": next_cursor,
+            "results": [_row(t) for t in page],
+        }, status=HTTPStatus.OK)
 
     total = qs.count()
     page = list(qs[offset: offset + limit])
 
-    results = [{
-        "templateId": t.id,
-        "name": t.name,
-        "version": t.version,
-        "subjectCode": t.subject.subjectCode if t.subject else "",
-        "year": t.subject.year if t.subject else None,
-        "semester": t.subject.semester if t.subject else None,
-        "ownerUsername": t.ownerId.username if t.ownerId_id else "",
-        "ownerName": f"{t.ownerId.first_name} {t.ownerId.last_name}".strip() if t.ownerId_id else "",
-        "isPublishable": bool(t.isPublishable),
-        "isTemplate": True,
-    } for t in page]
-
     resp = JsonResponse({
         "count": total,
         "limit": limit,
         "offset": offset,
-        "results": results,
+        "results": [_row(t) for t in page],
     }, status=HTTPStatus.OK)
 
     return resp
 
-@require_GET
-def community_templates(request):
+def _community_widget_rows(limit: int) -> list:
     """
-    Returns publishable templates for the homepage 'Community Templates' widget.
-    Optional query param: ?limit=4 (default 4)
+    Newest publishable templates serialised for the homepage 'Community Templates' widget
     """
-    # 1) Read ?limit= query param safely
-    limit_str = request.GET.get("limit", "4")
-    try:
-        limit = max(1, int(limit_str))
-    except ValueError:
-        limit = 4
-
-    # 2) Query publishable templates (newest first)
-    # NOTE: If you track "updated_at", use .order_by("-updated_at") instead.
     qs = (
         Template.objects
         .filter(isPublishable=True)
@@ -853,7 +1228,6 @@ def community_templates(request):
         .order_by("-id")[:limit]
     )
 
-    # 3) Serialize the items the widget needs
     rows = []
     for t in qs:
         author = "Unknown"
@@ -874,41 +1248,183 @@ def community_templates(request):
             # If you add a real popularity metric later, put it here:
             "popularity": 0,
         })
+    return rows
+
+# GET /templates/community/?limit=4                      -> homepage widget {templates: [...]}
+# GET /templates/community/?offset=&order=&q=&cursor=... -> filtered browse {count, limit, results, ...}
+# (also served at /api/community/templates/)
+@require_GET
+def community_templates(request):
+    """
+    Single entry point for community templates. A request with no parameters other than
+    limit (or ?view=widget) gets the homepage widget, served from a server-side cache of the
+    newest publishable templates; anything else is the filtered browse listing.
+    """
+    view = (request.GET.get("view") or "").lower()
+    if view != "widget" and (view == "browse" or set(request.GET) - {"limit", "view"}):
+        return browse_community_templates(request)
+
+    limit_str = request.GET.get("limit", "4")
+    try:
+        limit = max(1, int(limit_str))
+    except ValueError:
+        limit = 4
 
-    return JsonResponse({"templates": rows})
+    if limit > caches.COMMUNITY_WIDGET_SIZE:
+        return JsonResponse({"templates": _community_widget_rows(limit)})
+
+    rows = cache.get(caches.COMMUNITY_WIDGET_KEY)
+    if rows is None:
+        rows = _community_widget_rows(caches.COMMUNITY_WIDGET_SIZE)
+        cache.set(caches.COMMUNITY_WIDGET_KEY, rows, caches.COMMUNITY_WIDGET_TIMEOUT)
+    return JsonResponse({"templates": rows[:limit]})
 
 def system_overview(request):
     """
     Returns overall statistics for dashboard display.
+    Served from the maintained counters (one query); see counters.py for how stale they can be.
     """
+    return JsonResponse(counters.read())
 
-    total_users = User.objects.count()
-    total_subjects = Subject.objects.count()
-    total_templates = Template.objects.count()
-    active_coordinators = User.objects.filter(role=User.Role.COORDINATOR, is_active=True).count()
-
-    data = {
-        "totalUsers": total_users,
-        "subjects": total_subjects,
-        "templates": total_templates,
-        "activeCoordinators": active_coordinators,
-    }
-
-    return JsonResponse(data)
 
+# Activity feed ordering, newest first; id breaks ties between entries logged in the same instant
+ACTIVITY_ORDERINGS = {"recent": ("-timestamp", "-id")}
+ACTIVITY_ACTIONS = {code for code, _ in AuditLog.ACTION_CHOICES}
+MAX_ACTIVITY_PAGE = 100
 
+# GET /recent-activity/?user=&model=&action=&objectId=&limit=20&cursor=
+@require_GET
 def recent_activity(request):
-    recent_users = list(User.objects.order_by('-date_joined')[:5].values('username', 'date_joined'))
-    recent_subjects = list(Subject.objects.order_by('-id')[:5].values('name', 'subjectCode', 'year', 'semester'))
-    recent_templates = list(Template.objects.order_by('-id')[:5].values('name', 'version'))
+    """
+    Unified activity feed read from AuditLog, newest first, with keyset (cursor) paging.
+    Each filter has a (filter, timestamp, id) index that yields its rows already in feed order,
+    so a page costs the same however many log rows there are; no total count is returned.
+    """
+    try:
+        limit = min(max(int(request.GET.get("limit", 20)), 1), MAX_ACTIVITY_PAGE)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=HTTPStatus.BAD_REQUEST)
+
+    qs = AuditLog.objects.all()
+    username = request.GET.get("user")
+    if username:
+        # compare the id itself (not a join) so the (user, timestamp, id) index also gives the order
+        user_id = User.objects.filter(username=username).values_list("id", flat=True).first()
+        if user_id is None:
+            return JsonResponse({"limit": limit, "nextCursor": None, "results": []})
+        qs = qs.filter(user_id=user_id)
+    model_name = request.GET.get("model")
+    if model_name:
+        qs = qs.filter(model_name=model_name)
+    object_id = request.GET.get("objectId")
+    if object_id:
+        if not model_name:
+            return JsonResponse({"error": "objectId requires model"}, status=HTTPStatus.BAD_REQUEST)
+        try:
+            qs = qs.filter(object_id=int(object_id))
+        except ValueError:
+            return JsonResponse({"error": "objectId must be an integer"}, status=HTTPStatus.BAD_REQUEST)
+    action = (request.GET.get("action") or "").upper()
+    if action:
+        if action not in ACTIVITY_ACTIONS:
+            return JsonResponse({"error": f"Unknown action: {action}"}, status=HTTPStatus.BAD_REQUEST)
+        qs = qs.filter(action=action)
+
+    ordering = ACTIVITY_ORDERINGS["recent"]
+    cursor = request.GET.get("cursor") or ""
+    if cursor:
+        after = _decode_cursor(cursor, "recent", ACTIVITY_ORDERINGS)
+        if after is None:
+            return JsonResponse({"error": "Invalid cursor"}, status=HTTPStatus.BAD_REQUEST)
+        qs = qs.filter(_after_keyset(ordering, after))
+
+    rows = list(
+        qs.order_by(*ordering).values(
+            "id", "timestamp", "action", "model_name", "object_id", "details", "user__username"
+        )[:limit + 1]
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor("recent", [rows[-1]["timestamp"].isoformat(), rows[-1]["id"]])
 
     return JsonResponse({
-        "recentUsers": recent_users,
-        "recentSubjects": recent_subjects,
-        "recentTemplates": recent_templates,
-        "timestamp": now().isoformat()
+        "limit": limit,
+        "nextCursor": next_cursor,
+        "results": [
+            {
+                "id": r["id"],
+                "timestamp": r["timestamp"],
+                "user": r["user__username"],
+                "action": r["action"],
+                "model": r["model_name"],
+                "objectId": r["object_id"],
+                "details": r["details"],
+            }
+            for r in rows
+        ],
     })
 
+# GET /api/audit/archive/?from=YYYY-MM-DD&to=YYYY-MM-DD[&model=&action=&user=]
+# from/to are UTC dates (to inclusive) or ISO datetimes (to exclusive), at most archive.MAX_READ_DAYS apart
+@require_GET
+def audit_archive(request):
+    """
+    Streams archived (no longer in the database) audit entries logged in a time range, oldest first.
+    Only the archive's day files that overlap the range are read. Staff and admins only.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=HTTPStatus.UNAUTHORIZED)
+    if not (user.is_staff or user.role == User.Role.ADMIN):
+        return JsonResponse({"error": "Forbidden"}, status=HTTPStatus.FORBIDDEN)
+
+    def _bound(value, inclusive_day):
+        # dates first: parse_datetime would also accept a bare date as midnight
+        day = parse_date(value)
+        if day is not None:
+            return archive.day_start(day + timedelta(days=1) if inclusive_day else day)
+        when = parse_datetime(value)
+        if when is None:
+            raise ValueError(value)
+        return when if timezone.is_aware(when) else timezone.make_aware(when, dt_timezone.utc)
+
+    try:
+        start = _bound(request.GET.get("from") or "", inclusive_day=False)
+        end = _bound(request.GET.get("to") or "", inclusive_day=True)
+    except (ValueError, OverflowError):
+        return JsonResponse({"error": "from and to must be ISO dates or datetimes"}, status=HTTPStatus.BAD_REQUEST)
+    if end <= start:
+        return JsonResponse({"error": "to must be after from"}, status=HTTPStatus.BAD_REQUEST)
+    if end - start > timedelta(days=archive.MAX_READ_DAYS):
+        return JsonResponse({"error": f"The range may span at most {archive.MAX_READ_DAYS} days"},
+                            status=HTTPStatus.BAD_REQUEST)
+
+    entries = archive.read(
+        start, end,
+        model_name=request.GET.get("model") or None,
+        action=(request.GET.get("action") or "").upper() or None,
+        username=request.GET.get("user") or None,
+    )
+    return _stream_json("results", entries)
+
+# How long browsers may reuse the scale catalogue before revalidating it with the ETag
+AI_USE_SCALES_MAX_AGE = 60 * 60
+
+def _ai_use_scales_etag(request):
+    levels = scales.catalogue()
+    return hashlib.sha1(json.dumps(levels).encode()).hexdigest()
+
+# GET /api/ai-use-scales/
+@require_GET
+@cache_control(public=True, max_age=AI_USE_SCALES_MAX_AGE)
+@condition(etag_func=_ai_use_scales_etag)
+def ai_use_scales(request):
+    """
+    The AI use scale catalogue, [{"id", "name"}] ordered by id, for the builder's level pickers
+    """
+    return JsonResponse({"scales": scales.catalogue()})
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def update_ai_use_scale(request):
@@ -923,33 +1439,33 @@ def update_ai_use_scale(request):
             scale.name = name
             scale.save()
 
-            AuditLog.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                action="UPDATE",
-                model_name="AIUseScale",
-                object_id=scale.id,
-                details={"name": name},
-            )
+            audit.record(_acting_user(request), "UPDATE", "AIUseScale", scale.id, {"name": name})
         else:
             # Create new
             scale = AIUseScale.objects.create(name=name)
 
-            AuditLog.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                action="CREATE",
-                model_name="AIUseScale",
-                object_id=scale.id,
-                details={"name": name},
-            )
+            audit.record(_acting_user(request), "CREATE", "AIUseScale", scale.id, {"name": name})
 
         return Response({"success": True, "id": scale.id})
     except Exception as e:
         return Response({"error": str(e)}, status=400)
 
 
-# GET /api/templates/versions/?name=<template_name>
-@require_GET
-def list_template_versions(request):
+def _lineage_match(field: str, t0):
+    """
+    Matches templates whose subject field equals t0's, or any subject when t0 has none
+    (the listing only scopes by subject fields the starting template actually has)
+    """
+    return Q(**{f"subject__{field}": Subquery(t0.values(f"subject__{field}")[:1])}) | Q(
+        Exists(t0.filter(subject__isnull=True))
+    )
+
+def _template_versions_scope(request):
+    """
+    Resolves the version listing's query params into (queryset of matching templates, template name, error response).
+    With template_id the starting template is read inside the queryset (as subqueries), not fetched first;
+    name is then None and comes back with the rows.
+    """
     user = request.user
     name = request.GET.get("name")
     template_id = request.GET.get("template_id")
@@ -958,78 +1474,226 @@ def list_template_versions(request):
     semester = request.GET.get("semester")
     year = request.GET.get("year")
 
-    from .models import TemplateOwnership  
-    owner_scope_user = None  
-    subj_ctx = {"code": None, "semester": None, "year": None}
-
+    t0 = None
     if not name and template_id:
         try:
-            t0 = Template.objects.select_related("subject").get(id=int(template_id))
-        except (Template.DoesNotExist, ValueError):
-            return JsonResponse({"detail": "Template not found."}, status=404)
-
-        name = t0.name
-        owner_scope_user = getattr(t0, "ownerId", None)  # keep versions to this owner
+            t0 = Template.objects.filter(pk=int(template_id))
+        except ValueError:
+            return None, None, JsonResponse({"detail": "Template not found."}, status=404)
 
-        if t0.subject:
-            subj_ctx["code"] = getattr(t0.subject, "subjectCode", None)
-            subj_ctx["semester"] = getattr(t0.subject, "semester", None)
-            subj_ctx["year"] = getattr(t0.subject, "year", None)
-
-    if not name:
-        return JsonResponse({"detail": "Provide 'name' or 'template_id'."}, status=400)
+    if not name and t0 is None:
+        return None, None, JsonResponse({"detail": "Provide 'name' or 'template_id'."}, status=400)
 
     # The below code was generated by ChatGPT
     try:
-        sem_val = int(semester) if semester is not None else subj_ctx["semester"]
+        sem_val = int(semester) if semester is not None else None
     except (TypeError, ValueError):
-        return JsonResponse({"detail": "Invalid 'semester'."}, status=400)
+        return None, None, JsonResponse({"detail": "Invalid 'semester'."}, status=400)
 
     try:
-        year_val = int(year) if year is not None else subj_ctx["year"]
+        year_val = int(year) if year is not None else None
     except (TypeError, ValueError):
-        return JsonResponse({"detail": "Invalid 'year'."}, status=400)
-
-    code_val = subject_code if subject_code is not None else subj_ctx["code"]
+        return None, None, JsonResponse({"detail": "Invalid 'year'."}, status=400)
 
-    # Base queryset is all templates with this name
-    qs = Template.objects.select_related("subject").filter(name=name)
+    if t0 is not None:
+        # versions of the same template: same name and owner, same subject unless overridden
+        qs = Template.objects.filter(name=Subquery(t0.values("name")[:1]), ownerId=Subquery(t0.values("ownerId")[:1]))
+    else:
+        # Base queryset is all templates with this name
+        qs = Template.objects.filter(name=name)
 
     # Subject scoping
-    if code_val is not None:
-        qs = qs.filter(subject__subjectCode=code_val)
-    if sem_val is not None:
-        qs = qs.filter(subject__semester=sem_val)
-    if year_val is not None:
-        qs = qs.filter(subject__year=year_val)
-
-    if owner_scope_user is not None:
-        qs = qs.filter(ownerId=owner_scope_user)
-    else:
+    for field, value in (("subjectCode", subject_code), ("semester", sem_val), ("year", year_val)):
+        if value is not None:
+            qs = qs.filter(**{f"subject__{field}": value})
+        elif t0 is not None:
+            qs = qs.filter(_lineage_match(field, t0))
+
+    if t0 is None:
         owned_ids = TemplateOwnership.objects.filter(ownerId=user).values_list("templateId_id", flat=True)
         qs = qs.filter(id__in=owned_ids)
 
-    # Group by version and take the latest id for each version
-    latest_by_version = (
-        qs.values("version")
-          .annotate(latest_id=Max("id"))
-          .order_by("version")
-    )
+    return qs, name, None
+
+def _template_versions(request):
+    """
+    The version listing for a request as (rows, template name, error response), from one query:
+    the latest template per version, each row also carrying the lineage-wide figures the ETag
+    and the subject metadata need (window functions over every matching template).
+    Memoised on the request so the ETag function and the view share the query.
+    """
+    if not hasattr(request, "_template_versions"):
+        qs, name, error = _template_versions_scope(request)
+        rows = []
+        if error is None:
+            first = {"order_by": F("id").asc()}  # the subject metadata comes from the lowest id
+            rows = list(
+                qs.annotate(
+                    rank=Window(RowNumber(), partition_by=[F("version")], order_by=F("id").desc()),
+                    lineageCount=Window(Count("id")),
+                    lineageLatest=Window(Max("id")),
+                    lineageUpdated=Window(Max("updatedAt")),
+                    subjectCode=Window(FirstValue("subject__subjectCode"), **first),
+                    subjectSemester=Window(FirstValue("subject__semester"), **first),
+                    subjectYear=Window(FirstValue("subject__year"), **first),
+                )
+                .filter(rank=1)
+                .order_by("version")
+                .values(
+                    "id", "version", "name", "lineageCount", "lineageLatest", "lineageUpdated",
+                    "subjectCode", "subjectSemester", "subjectYear",
+                )
+            )
+            if name is None:
+                if rows:
+                    name = rows[0]["name"]
+                else:
+                    # nothing matched: tell a missing template apart from an empty lineage
+                    name = Template.objects.filter(pk=int(request.GET["template_id"])).values_list("name", flat=True).first()
+                    if name is None:
+                        error = JsonResponse({"detail": "Template not found."}, status=404)
+        request._template_versions = (rows, name, error)
+    return request._template_versions
+
+def _template_versions_etag(request):
+    """
+    Strong validator for a version listing: changes whenever a template in the lineage
+    is added, removed or touched. Read from the listing query itself.
+    """
+    rows, name, error = _template_versions(request)
+    if error is not None or not rows:
+        return None
+    stamp = rows[0]
+    raw = "|".join(str(v) for v in (
+        name, request.GET.urlencode(), getattr(request.user, "pk", None),
+        stamp["lineageUpdated"].isoformat(), stamp["lineageCount"], stamp["lineageLatest"],
+    ))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-    id_list = [row["latest_id"] for row in latest_by_version]
-    chosen = {t.version: t.id for t in Template.objects.filter(id__in=id_list)}
+# GET /api/templates/versions/?name=<template_name>
+@require_GET
+@condition(etag_func=_template_versions_etag)
+def list_template_versions(request):
+    rows, name, error = _template_versions(request)
+    if error is not None:
+        return error
 
-    versions = [{"templateId": chosen[v["version"]], "version": v["version"]}
-                for v in latest_by_version]
+    # rows hold the latest id for each version, in version order
+    versions = [{"templateId": row["id"], "version": row["version"]} for row in rows]
 
-    any_t = qs.first()
+    any_t = rows[0] if rows else {}
     meta = {
         "name": name,
         "subject": {
-            "code": getattr(any_t.subject, "subjectCode", None) if any_t and any_t.subject else None,
-            "semester": getattr(any_t.subject, "semester", None) if any_t and any_t.subject else None,
-            "year": getattr(any_t.subject, "year", None) if any_t and any_t.subject else None,
+            "code": any_t.get("subjectCode"),
+            "semester": any_t.get("subjectSemester"),
+            "year": any_t.get("subjectYear"),
         }
     }
 
     return JsonResponse({"meta": meta, "versions": versions}, status=200)
+
+# Template fields compared by the version diff (name, owner and subject are the same across a lineage)
+DIFFED_TEMPLATE_FIELDS = ("version", "scope", "description", "isPublishable", "isTemplate")
+# Item row fields compared for modified items (its id differs between versions by design)
+DIFFED_ITEM_FIELDS = (
+    "task", "aiUseScaleLevel__name", "instructionsToStudents", "examples", "aiGeneratedContent", "useAcknowledgement",
+)
+
+# What makes two items the same: their text (ItemContent hash), AI use level and acknowledgement flag
+ITEM_IDENTITY_FIELDS = ("content_id", "aiUseScaleLevel_id", "useAcknowledgement")
+
+def _field_changes(old: dict, new: dict, fields) -> dict:
+    return {f: {"from": old[f], "to": new[f]} for f in fields if old[f] != new[f]}
+
+def _diff_items(old_id: int, new_id: int) -> dict:
+    """
+    Item-level diff of two versions. Items are first paired on ITEM_IDENTITY_FIELDS, read
+    without their text; paired items are unchanged and never loaded. Only the rest are
+    loaded in full: those with the same task are reported as modified (with the changed
+    fields) and the others as removed or added.
+    """
+    keys = {old_id: [], new_id: []}
+    identities = (
+        TemplateItem.objects.filter(templateId__in=[old_id, new_id])
+        .order_by("id")
+        .values("id", "templateId", *ITEM_IDENTITY_FIELDS)
+    )
+    for row in identities:
+        keys[row["templateId"]].append(row)
+
+    new_by_key = {}
+    for row in keys[new_id]:
+        new_by_key.setdefault(tuple(row[f] for f in ITEM_IDENTITY_FIELDS), []).append(row["id"])
+    unchanged, old_left = 0, []
+    for row in keys[old_id]:
+        same = new_by_key.get(tuple(row[f] for f in ITEM_IDENTITY_FIELDS))
+        if same:
+            same.pop(0)
+            unchanged += 1
+        else:
+            old_left.append(row["id"])
+    new_left = sorted(pk for ids in new_by_key.values() for pk in ids)
+
+    rows = {}
+    if old_left or new_left:
+        changed = TemplateItem.objects.filter(pk__in=old_left + new_left).select_related("aiUseScaleLevel", "content")
+        rows = {item.id: _template_item_row(item) for item in changed}
+
+    new_by_task = {}
+    for pk in new_left:
+        new_by_task.setdefault(rows[pk]["task"], []).append(rows[pk])
+    modified, removed = [], []
+    for pk in old_left:
+        row = rows[pk]
+        match = new_by_task.get(row["task"])
+        if match:
+            new_row = match.pop(0)
+            modified.append({
+                "fromId": row["id"],
+                "toId": new_row["id"],
+                "task": row["task"],
+                "changes": _field_changes(row, new_row, DIFFED_ITEM_FIELDS),
+            })
+        else:
+            removed.append(row)
+    added = sorted((row for task_rows in new_by_task.values() for row in task_rows), key=itemgetter("id"))
+
+    return {"added": added, "removed": removed, "modified": modified, "unchanged": unchanged}
+
+# GET /api/templates/diff/?from=<templateId>&to=<templateId>
+# both templates must be versions in the same lineage (same owner, name and subject, as listed
+# by /api/templates/versions/)
+@require_GET
+def template_version_diff(request):
+    """
+    Changed template fields and item adds/removes/modifications between two versions of a template.
+    Diffs are cached under a key that includes both templates' updatedAt, so a pair is computed
+    once for as long as neither version is edited.
+    """
+    try:
+        from_id = int(request.GET.get("from"))
+        to_id = int(request.GET.get("to"))
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "from and to template ids are required"}, status=HTTPStatus.BAD_REQUEST)
+
+    templates = {t.id: t for t in Template.objects.filter(pk__in=[from_id, to_id])}
+    if from_id not in templates or to_id not in templates:
+        return JsonResponse({"error": "Template does not exist"}, status=HTTPStatus.NOT_FOUND)
+    old, new = templates[from_id], templates[to_id]
+    if (old.ownerId_id, old.name, old.subject_id) != (new.ownerId_id, new.name, new.subject_id):
+        return JsonResponse({"error": "Templates are not versions of the same template"}, status=HTTPStatus.BAD_REQUEST)
+
+    key = caches.template_diff_key(old, new)
+    diff = cache.get(key)
+    if diff is None:
+        old_fields = {f: getattr(old, f) for f in DIFFED_TEMPLATE_FIELDS}
+        new_fields = {f: getattr(new, f) for f in DIFFED_TEMPLATE_FIELDS}
+        diff = {
+            "from": {"templateId": old.id, "version": old.version},
+            "to": {"templateId": new.id, "version": new.version},
+            "fields": _field_changes(old_fields, new_fields, DIFFED_TEMPLATE_FIELDS),
+            "items": _diff_items(from_id, to_id),
+        }
+        cache.set(key, diff, caches.TEMPLATE_DIFF_TIMEOUT)
+    return JsonResponse(diff, status=HTTPStatus.OK)
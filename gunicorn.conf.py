@@ -0,0 +1,12 @@
+"""
+gunicorn settings, read from the working directory by both deployments in scripts/start.sh.
+"""
+import os
+
+
+def child_exit(server, worker):
+    # Lets prometheus_client's multiprocess mode forget the exited worker (ai_scale_app/metrics.py)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,52 @@
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_scale_app import snapshots  # noqa: E402
+
+# Restores the SQLite database from the latest snapshot in S3 (S3_BUCKET_NAME) or, with
+# SNAPSHOT_DIR set, a local directory, before the app starts. Skips the download when the
+# local copy already matches the snapshot's manifest. See ai_scale_app/snapshots.py.
+#
+# A failed restore (storage error, corrupt download) is retried RESTORE_RETRIES times and then
+# exits non-zero, which stops scripts/start.sh: booting on a stale or empty database would
+# serve wrong data, and its writes would be snapshotted over the good copy. The app only
+# starts without a restore when the backend holds no snapshot at all.
+DB_PATH = os.environ.get("DB_PATH", "db.sqlite3")
+RETRIES = int(os.environ.get("RESTORE_RETRIES", snapshots.DEFAULT_RETRIES))
+BACKOFF = float(os.environ.get("RESTORE_BACKOFF", snapshots.DEFAULT_BACKOFF))
+
+
+def restore(backend):
+    for attempt in range(1, RETRIES + 1):
+        try:
+            return snapshots.restore(DB_PATH, backend)
+        except Exception as e:
+            if attempt == RETRIES:
+                raise
+            delay = BACKOFF * 2 ** (attempt - 1)
+            print(f"Restore attempt {attempt} failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    backend = snapshots.backend_from_env()
+    if backend is None:
+        print("Neither S3_BUCKET_NAME nor SNAPSHOT_DIR is set, skipping restore.")
+        sys.exit(0)
+    try:
+        result = restore(backend)
+    except Exception as e:
+        print(f"Error restoring database, not starting: {e}")
+        sys.exit(1)
+    if result["status"] == "restored":
+        print(f"Restored {DB_PATH} ({result['size'] / 1e6:.1f} MB) in {result['seconds']:.2f}s")
+    elif result["status"] == "current":
+        print(f"{DB_PATH} already matches the latest snapshot; checked in {result['seconds']:.2f}s")
+    else:
+        print(f"No database snapshot found; checked in {result['seconds']:.2f}s")
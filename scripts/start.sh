@@ -3,9 +3,13 @@ set -e
 
 echo "Starting backend..."
 
-# Step 1: Try to download the database file from S3
-echo "Downloading database from S3..."
-aws s3 cp s3://$S3_BUCKET_NAME/db.sqlite3 ./db.sqlite3 || echo "No existing db.sqlite3 found on S3"
+# Step 1: Restore the database from its latest S3 snapshot (SQLite only; DATABASE_URL points at a server)
+# Skips the download when the local copy is already current, and reports how long it took
+# A snapshot that exists but cannot be restored stops the boot here (set -e) rather than starting on a stale database
+if [ -z "$DATABASE_URL" ]; then
+  echo "Restoring database from S3..."
+  python scripts/restore_db.py
+fi
 
 # Step 2: Apply migrations
 echo "Applying Django migrations..."
@@ -15,10 +19,28 @@ python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
-# Step 4: Start background watcher to upload database on changes
-echo "Starting DB watcher..."
-python scripts/watch_db.py &
+# Step 4: Start background watcher to upload database on changes (SQLite only)
+if [ -z "$DATABASE_URL" ]; then
+  echo "Starting DB watcher..."
+  python scripts/watch_db.py &
+fi
 
 # Step 5: Launch the Django app
-echo "Starting Gunicorn..."
-gunicorn api.wsgi:application --bind 0.0.0.0:$PORT
+# Workers write request metrics to per-process files here and /metrics/ sums them (ai_scale_app/metrics.py);
+# they are cleared on start so counters begin at zero with the new deployment
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/ai_scale_metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# SERVER_MODE=asgi serves api.asgi through uvicorn workers: one event loop per worker, with the
+# (sync) views run in Django's thread and long summaries streamed without holding a worker. WSGI
+# stays the default; it served the read endpoints faster in scripts/bench_asgi.py. Persistent database
+# connections are not safe across the event loop's threads, so CONN_MAX_AGE defaults to 0 there.
+if [ "$SERVER_MODE" = "asgi" ]; then
+  echo "Starting Gunicorn (ASGI, uvicorn workers)..."
+  export DB_CONN_MAX_AGE="${DB_CONN_MAX_AGE:-0}"
+  gunicorn api.asgi:application -k uvicorn_worker.UvicornWorker --bind 0.0.0.0:$PORT
+else
+  echo "Starting Gunicorn..."
+  gunicorn api.wsgi:application --bind 0.0.0.0:$PORT
+fi
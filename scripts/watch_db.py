@@ -1,37 +1,67 @@
-import time
+import logging
 import os
-import boto3
+import signal
+import sys
+import threading
+from pathlib import Path
+
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-BUCKET_NAME = os.environ.get("S3_BUCKET_NAME", "")
-DB_PATH = "db.sqlite3"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_scale_app import snapshots  # noqa: E402
+
+# Watches the SQLite database and keeps a consistent, compressed snapshot of it in S3
+# (S3_BUCKET_NAME) or, with SNAPSHOT_DIR set, in a local directory. See ai_scale_app/snapshots.py.
+DB_PATH = os.environ.get("DB_PATH", "db.sqlite3")
+DEBOUNCE = float(os.environ.get("SNAPSHOT_DEBOUNCE", snapshots.DEFAULT_DEBOUNCE))
+MAX_DELAY = float(os.environ.get("SNAPSHOT_MAX_DELAY", snapshots.DEFAULT_MAX_DELAY))
 
-s3 = boto3.client("s3")
 
 class DBChangeHandler(FileSystemEventHandler):
-    def on_modified(self, event):
-        if event.src_path.endswith(DB_PATH):
-            print("Database changed. Uploading to S3...")
-            try:
-                s3.upload_file(DB_PATH, BUCKET_NAME, DB_PATH)
-                print("Database uploaded successfully.")
-            except Exception as e:
-                print(f"Error uploading database: {e}")
+    """
+    Passes changes to the database file or its WAL on to the snapshotter, which coalesces them
+    """
+    def __init__(self, snapshotter):
+        self.snapshotter = snapshotter
+        self.names = {os.path.basename(DB_PATH), os.path.basename(DB_PATH) + "-wal"}
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+            return
+        paths = (event.src_path, getattr(event, "dest_path", ""))
+        if any(os.path.basename(path) in self.names for path in paths if path):
+            self.snapshotter.notify()
+
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    backend = snapshots.backend_from_env()
     if not os.path.exists(DB_PATH):
         print("No db.sqlite3 found, skipping watcher.")
+    elif backend is None:
+        print("Neither S3_BUCKET_NAME nor SNAPSHOT_DIR is set, skipping watcher.")
     else:
         print("Watching for database changes...")
-        event_handler = DBChangeHandler()
+        snapshotter = snapshots.Snapshotter(DB_PATH, backend, debounce=DEBOUNCE, max_delay=MAX_DELAY)
+        snapshotter.start()
+        # Bring the stored snapshot up to date with whatever is here now (e.g. migrations), but only
+        # when this database was restored from it. One that is not (no snapshot yet, or a restore
+        # that failed) waits for its first write, so an empty database never replaces a good snapshot.
+        if snapshots.is_restored_copy(DB_PATH, backend):
+            snapshotter.notify()
+
         observer = Observer()
-        observer.schedule(event_handler, ".", recursive=False)
+        observer.schedule(DBChangeHandler(snapshotter), os.path.dirname(os.path.abspath(DB_PATH)), recursive=False)
         observer.start()
 
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
         try:
-            while True:
-                time.sleep(10)
+            stop.wait()
         except KeyboardInterrupt:
-            observer.stop()
+            pass
+        observer.stop()
         observer.join()
+        snapshotter.stop()  # uploads changes still waiting out the debounce
@@ -9,7 +9,7 @@ import { Plus, Trash2, Settings, ArrowLeft} from 'lucide-react';
 import { Label } from './label';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from './dialog';
 import AITemplateRepository from './AITemplateRepository';
-import { useTemplateDetails, createOrUpdateTemplateAction, addTemplateItemAction } from './api';
+import { useTemplateDetails, createOrUpdateTemplateAction, saveTemplateItems, fetchAIUseScales, type AIUseScale } from './api';
 import { useSearchParams } from "next/navigation";
 import { useAuth } from "../authentication/auth";
 import { useRouter } from "next/navigation";
@@ -79,6 +79,12 @@ export default function AIGuidelinesBuilder() {
 
   useEffect(() => { refresh(); }, []); 
 
+  // Known AI use levels, offered as suggestions when naming a level
+  const [scaleCatalogue, setScaleCatalogue] = useState<AIUseScale[]>([]);
+  useEffect(() => {
+    fetchAIUseScales().then(setScaleCatalogue).catch((e) => console.error("Failed to load AI use scales:", e));
+  }, []);
+
   useEffect(() => {
     if (user?.username) setUsername(user.username);
   }, [user]);
@@ -415,29 +421,24 @@ export default function AIGuidelinesBuilder() {
             setVersion(newVersion);
 
             const createdNewVersion = !prevId || newId !== prevId || newVersion !== prevVersion;
-            let levelsToAdd = aiUseLevels;
 
-            if (!createdNewVersion) {
-              const payloadIds = new Set((payload?.template_items ?? []).map((it: any) => String(it.id)));
-              const isNewLevel = (lvl: { id: string | number }) => !payloadIds.has(String(lvl.id));
-              levelsToAdd = aiUseLevels.filter(isNewLevel);
-            }
-
-            if (levelsToAdd.length > 0) {
-              const addItem = addTemplateItemAction(newId);
-              await Promise.all(
-                levelsToAdd.map((level) =>
-                  addItem({
-                    task: level.task ?? "NA",
-                    aiUseScaleLevel_name: level.aiUseScaleLevel_name ?? "NA",
-                    instructionsToStudents: level.instructions ?? "NA",
-                    examples: level.examples ?? "NA",
-                    aiGeneratedContent: level.aiGeneratedContent ?? "NA",
-                    useAcknowledgement: !!level.acknowledgement,
-                  })
-                )
-              );
-            }
+            // Existing items keep their id (and are updated) when saving over the same version;
+            // a new version gets fresh copies of every level
+            const payloadIds = new Set((payload?.template_items ?? []).map((it: any) => String(it.id)));
+            const keepsId = (lvl: { id: string | number }) => !createdNewVersion && payloadIds.has(String(lvl.id));
+
+            await saveTemplateItems(
+              newId,
+              aiUseLevels.map((level) => ({
+                ...(keepsId(level) ? { id: Number(level.id) } : {}),
+                task: level.task ?? "NA",
+                aiUseScaleLevel_name: level.aiUseScaleLevel_name ?? "NA",
+                instructionsToStudents: level.instructions ?? "NA",
+                examples: level.examples ?? "NA",
+                aiGeneratedContent: level.aiGeneratedContent ?? "NA",
+                useAcknowledgement: !!level.acknowledgement,
+              }))
+            );
 
             // Updating URL (stay on builder) so a manual refresh loads the saved template
             const currentId = searchParams.get("template_id");
@@ -745,6 +746,7 @@ export default function AIGuidelinesBuilder() {
                     {aiUseLevels.map((level) => (
                       <div key={level.id} className="flex items-center gap-3 p-3 border rounded">
                         <Input
+                          list="ai-use-scale-catalogue"
                           value={level.aiUseScaleLevel_name}
                           onChange={(e) => {updateAIUseLevel(level.id, 'aiUseScaleLevel_name', e.target.value); markDirty(); }}
                           placeholder="Level name"
@@ -761,6 +763,12 @@ export default function AIGuidelinesBuilder() {
                       </div>
                     ))}
 
+                    <datalist id="ai-use-scale-catalogue">
+                      {scaleCatalogue.map((scale) => (
+                        <option key={scale.id} value={scale.name} />
+                      ))}
+                    </datalist>
+
                     <Button onClick={addAIUseLevel} variant="outline" size="sm">
                       <Plus className="h-4 w-4 mr-2" />
                       Add AI Use Level
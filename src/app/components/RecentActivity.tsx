@@ -1,33 +1,70 @@
 "use client";
 
-import { useEffect, useState } from "react";
-import { Clock, User, BookOpen, FileText } from "lucide-react";
+import { useCallback, useEffect, useState } from "react";
+import { Clock, User, BookOpen, FileText, Layers } from "lucide-react";
 
-interface RecentActivityData {
-  recentUsers: { username: string; date_joined: string }[];
-  recentSubjects: { name: string; subjectCode: string; year: number; semester: number }[];
-  recentTemplates: { name: string; version: number }[];
+interface ActivityEntry {
+  id: number;
+  timestamp: string;
+  user: string | null;
+  action: "CREATE" | "UPDATE" | "DELETE";
+  model: string;
+  objectId: number;
+  details: Record<string, unknown> | null;
+}
+
+interface ActivityPage {
+  limit: number;
+  nextCursor: string | null;
+  results: ActivityEntry[];
+}
+
+const ACTIVITY_URL = "http://127.0.0.1:8000/recent-activity/";
+
+const ACTION_LABELS: Record<ActivityEntry["action"], string> = {
+  CREATE: "created",
+  UPDATE: "updated",
+  DELETE: "deleted",
+};
+
+function modelIcon(model: string) {
+  if (model === "User") return <User className="h-4 w-4 text-blue-500" />;
+  if (model === "Subject") return <BookOpen className="h-4 w-4 text-green-500" />;
+  if (model === "Template") return <FileText className="h-4 w-4 text-purple-500" />;
+  return <Layers className="h-4 w-4 text-gray-500" />;
+}
+
+function describe(entry: ActivityEntry) {
+  const name = entry.details && typeof entry.details.name === "string" ? ` "${entry.details.name}"` : "";
+  return `${entry.user ?? "Someone"} ${ACTION_LABELS[entry.action] ?? entry.action.toLowerCase()} ${entry.model}${name}`;
 }
 
 export default function RecentActivity() {
-  const [data, setData] = useState<RecentActivityData | null>(null);
+  const [entries, setEntries] = useState<ActivityEntry[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
 
-  useEffect(() => {
-    async function fetchData() {
-      try {
-        const res = await fetch("http://127.0.0.1:8000/recent-activity/");
-        const json = await res.json();
-        setData(json);
-      } catch (err) {
-        console.error("Failed to fetch recent activity:", err);
-      } finally {
-        setLoading(false);
-      }
+  // Fetches one page of the feed; with a cursor the page is appended to what is shown
+  const fetchPage = useCallback(async (cursor: string | null) => {
+    setLoading(true);
+    try {
+      const params = new URLSearchParams({ limit: "10" });
+      if (cursor) params.set("cursor", cursor);
+      const res = await fetch(`${ACTIVITY_URL}?${params.toString()}`);
+      const page: ActivityPage = await res.json();
+      setEntries((prev) => (cursor ? [...prev, ...page.results] : page.results));
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to fetch recent activity:", err);
+    } finally {
+      setLoading(false);
     }
-    fetchData();
   }, []);
 
+  useEffect(() => {
+    fetchPage(null);
+  }, [fetchPage]);
+
   return (
     <div className="border rounded-xl shadow-sm bg-white p-6 transition-all hover:shadow-md">
       <div className="flex items-center justify-between mb-4">
@@ -38,84 +75,38 @@ export default function RecentActivity() {
         <p className="text-xs text-gray-500">{new Date().toLocaleDateString()}</p>
       </div>
 
-      {loading ? (
+      {loading && entries.length === 0 ? (
         <div className="text-sm text-gray-500 py-4">Loading recent updates…</div>
+      ) : entries.length === 0 ? (
+        <p className="text-gray-400 text-xs">No recent activity</p>
       ) : (
-        <div className="space-y-6 text-sm">
-          {/* Users */}
-          <div>
-            <h3 className="text-sm font-semibold text-gray-700 mb-2 flex items-center gap-2">
-              <User className="h-4 w-4 text-blue-500" />
-              New Users
-            </h3>
-            {data?.recentUsers?.length ? (
-              <ul className="space-y-1">
-                {data.recentUsers.map((u, i) => (
-                  <li
-                    key={i}
-                    className="flex justify-between items-center py-1.5 px-2 rounded-md hover:bg-gray-50 transition"
-                  >
-                    <span className="font-medium text-gray-800">{u.username}</span>
-                    <span className="text-xs text-gray-500">
-                      {new Date(u.date_joined).toLocaleDateString()}
-                    </span>
-                  </li>
-                ))}
-              </ul>
-            ) : (
-              <p className="text-gray-400 text-xs pl-6">No new users</p>
-            )}
-          </div>
-
-          {/* Subjects */}
-          <div>
-            <h3 className="text-sm font-semibold text-gray-700 mb-2 flex items-center gap-2">
-              <BookOpen className="h-4 w-4 text-green-500" />
-              Recent Subjects
-            </h3>
-            {data?.recentSubjects?.length ? (
-              <ul className="space-y-1">
-                {data.recentSubjects.map((s, i) => (
-                  <li
-                    key={i}
-                    className="flex justify-between items-center py-1.5 px-2 rounded-md hover:bg-gray-50 transition"
-                  >
-                    <span className="font-medium text-gray-800">
-                      {s.name} ({s.subjectCode})
-                    </span>
-                    <span className="text-xs text-gray-500">
-                      {s.year} S{s.semester}
-                    </span>
-                  </li>
-                ))}
-              </ul>
-            ) : (
-              <p className="text-gray-400 text-xs pl-6">No new subjects</p>
-            )}
-          </div>
-
-          {/* Templates */}
-          <div>
-            <h3 className="text-sm font-semibold text-gray-700 mb-2 flex items-center gap-2">
-              <FileText className="h-4 w-4 text-purple-500" />
-              Recent Templates
-            </h3>
-            {data?.recentTemplates?.length ? (
-              <ul className="space-y-1">
-                {data.recentTemplates.map((t, i) => (
-                  <li
-                    key={i}
-                    className="flex justify-between items-center py-1.5 px-2 rounded-md hover:bg-gray-50 transition"
-                  >
-                    <span className="font-medium text-gray-800">{t.name}</span>
-                    <span className="text-xs text-gray-500">v{t.version}</span>
-                  </li>
-                ))}
-              </ul>
-            ) : (
-              <p className="text-gray-400 text-xs pl-6">No recent templates</p>
-            )}
-          </div>
+        <div className="space-y-3 text-sm">
+          <ul className="space-y-1">
+            {entries.map((entry) => (
+              <li
+                key={entry.id}
+                className="flex justify-between items-center py-1.5 px-2 rounded-md hover:bg-gray-50 transition"
+              >
+                <span className="flex items-center gap-2 font-medium text-gray-800">
+                  {modelIcon(entry.model)}
+                  {describe(entry)}
+                </span>
+                <span className="text-xs text-gray-500">
+                  {new Date(entry.timestamp).toLocaleString()}
+                </span>
+              </li>
+            ))}
+          </ul>
+          {nextCursor && (
+            <button
+              type="button"
+              onClick={() => fetchPage(nextCursor)}
+              disabled={loading}
+              className="text-xs text-blue-600 hover:underline disabled:opacity-50"
+            >
+              {loading ? "Loading…" : "Show older activity"}
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -255,6 +255,77 @@ export function addTemplateItemAction(templateId: number) {
 
 
 
+export type SavedItem = NewItem & { id?: number };
+
+// Saves the template's complete item list in one request: items with an id are updated,
+// items without one are created and any other existing items are deleted
+export async function saveTemplateItems(templateId: number, items: SavedItem[]): Promise<void> {
+  let csrftoken = Cookies.get("csrftoken");
+  if (!csrftoken) {
+    await fetch(`${API_BACKEND_URL}/token/`, {
+      method: "GET",
+      credentials: "include",
+    });
+    csrftoken = Cookies.get("csrftoken");
+  }
+
+  const res = await fetch(`${API_BACKEND_URL}/templateitem/bulk_update/`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...(csrftoken ? { "X-CSRFToken": csrftoken } : {}),
+      "X-Requested-With": "XMLHttpRequest",
+    },
+    credentials: "include",
+    body: JSON.stringify({ templateId, items }),
+  });
+
+  const body = await res.json().catch(() => ({}));
+  if (!res.ok || !body?.success) {
+    throw new Error(body?.error ?? `HTTP ${res.status}`);
+  }
+}
+
+export type AIUseScale = { id: number; name: string };
+
+// AI use scale catalogue; served with long-lived cache headers so the browser usually answers it
+export async function fetchAIUseScales(): Promise<AIUseScale[]> {
+  const res = await fetch(`${API_BACKEND_URL}/api/ai-use-scales/`, {
+    method: "GET",
+    credentials: "include",
+  });
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  const body = await parseJSON<{ scales?: AIUseScale[] }>(res);
+  return body.scales ?? [];
+}
+
+type TemplateItemRow = TemplateDetails["template_items"][number];
+type FieldChange<T = unknown> = { from: T; to: T };
+
+export type TemplateDiff = {
+  from: { templateId: number; version: number };
+  to: { templateId: number; version: number };
+  fields: Record<string, FieldChange>;
+  items: {
+    added: TemplateItemRow[];
+    removed: TemplateItemRow[];
+    modified: { fromId: number; toId: number; task: string; changes: Record<string, FieldChange> }[];
+    unchanged: number;
+  };
+};
+
+// Changes between two versions of a template, computed (and cached) by the backend
+export async function fetchTemplateDiff(fromId: number, toId: number): Promise<TemplateDiff> {
+  const params = new URLSearchParams({ from: String(fromId), to: String(toId) });
+  const res = await fetch(`${API_BACKEND_URL}/api/templates/diff/?${params.toString()}`, {
+    method: "GET",
+    credentials: "include",
+  });
+  const body = await parseJSON<TemplateDiff & { error?: string }>(res);
+  if (!res.ok) throw new Error(body?.error ?? `HTTP ${res.status}`);
+  return body;
+}
+
 export function deleteTemplateAction(
   templateId: number,
   onSuccess: () => void,